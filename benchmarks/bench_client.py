@@ -0,0 +1,70 @@
+"""Benchmark for ESIOS client connection reuse.
+
+Measures per-request latency of repeated ``fetch_price_rows`` calls against the
+local fake ESIOS server, opening a fresh HTTP client for every request (the
+previous behaviour) versus one pooled keep-alive client.
+
+Usage:
+    python benchmarks/bench_client.py --requests 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+
+from fake_esios import serve
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.ingestion.client import EsiosClient
+
+WINDOW_START = datetime(2025, 1, 1, tzinfo=UTC)
+WINDOW_END = WINDOW_START + timedelta(days=1)
+
+
+async def fresh_client_per_request(count: int) -> list[float]:
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        async with EsiosClient() as client:
+            await client.fetch_price_rows(1001, 8741, WINDOW_START, WINDOW_END)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def pooled_client(count: int) -> list[float]:
+    latencies = []
+    async with EsiosClient() as client:
+        for _ in range(count):
+            started = time.perf_counter()
+            await client.fetch_price_rows(1001, 8741, WINDOW_START, WINDOW_END)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{name:<10} n={len(ms):<5} mean={statistics.mean(ms):7.2f}ms  "
+        f"p50={statistics.median(ms):7.2f}ms  p95={p95:7.2f}ms"
+    )
+
+
+async def main(count: int) -> None:
+    report("fresh", await fresh_client_per_request(count))
+    report("pooled", await pooled_client(count))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode")
+    args = parser.parse_args()
+
+    with serve() as base_url:
+        settings.ESIOS_BASE_URL = base_url
+        # Measure connection handling, not the API rate limiter
+        settings.ESIOS_RATE_LIMIT = 1e9
+        settings.ESIOS_RATE_BURST = args.requests
+        asyncio.run(main(args.requests))
@@ -0,0 +1,116 @@
+"""Benchmark for CLI startup time.
+
+Runs ``python -X importtime -c "import esios_ingestor.main"`` and the
+``esios --help`` / ``esios prices --help`` commands in fresh interpreters, and
+reports the median wall-clock time of each plus the slowest top-level imports.
+Commands that never touch the database or the ESIOS API should not pay for
+FastAPI, SQLAlchemy, httpx or the settings; this keeps that in check.
+
+Usage:
+    python benchmarks/bench_import.py --runs 10
+    python benchmarks/bench_import.py --json results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+from importlib.metadata import version
+
+COMMANDS = {
+    "python (baseline)": [sys.executable, "-c", "pass"],
+    "import": [sys.executable, "-c", "import esios_ingestor.main"],
+    "esios --help": [sys.executable, "-m", "esios_ingestor.main", "--help"],
+    "esios prices --help": [sys.executable, "-m", "esios_ingestor.main", "prices", "--help"],
+}
+
+
+def time_command(argv: list[str], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def import_times(code: str) -> dict[str, float]:
+    """Cumulative import time per top-level package while running `code`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    packages: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        _, _, fields = line.partition("import time:")
+        try:
+            _, cumulative, name = fields.split("|")
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), cumulative_us / 1e6)
+    return packages
+
+
+def slowest_imports(count: int) -> list[tuple[str, float]]:
+    """Third-party packages loaded by ``import esios_ingestor.main``, slowest first."""
+    # Skip what the interpreter loads on its own (site hooks, .pth files)
+    startup = import_times("pass")
+    packages = {
+        package: seconds
+        for package, seconds in import_times("import esios_ingestor.main").items()
+        if package not in startup
+        and package not in sys.stdlib_module_names
+        and not package.startswith("_")
+        and package != "esios_ingestor"
+    }
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def run(args: argparse.Namespace) -> dict:
+    return {
+        "benchmark": "import",
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "esios_ingestor": version("esios-ingestor"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "seconds": {
+            name: round(time_command(argv, args.runs), 3) for name, argv in COMMANDS.items()
+        },
+        "slowest_imports": {name: round(seconds, 4) for name, seconds in slowest_imports(args.top)},
+    }
+
+
+def report(results: dict) -> None:
+    print(f"Median of {results['runs']} runs (fresh interpreter each):")
+    for name, seconds in results["seconds"].items():
+        print(f"  {name:<22} {seconds * 1000:>8.0f} ms")
+    print("Slowest third-party imports of esios_ingestor.main:")
+    for name, seconds in results["slowest_imports"].items():
+        print(f"  {name:<22} {seconds * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command")
+    parser.add_argument("--top", type=int, default=8, help="Number of slowest imports to list")
+    parser.add_argument("--json", default=None, help="Write results as JSON here ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run(args)
+    report(results)
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
@@ -0,0 +1,194 @@
+"""End-to-end ingestion benchmark.
+
+Runs ``ingest_data`` over N years of synthetic history for M zones, served by
+the local fake ESIOS API (in its own process), into Postgres. Reports the
+wall-clock time, rows/s and peak RSS of the ingesting process, plus how busy
+time splits across the stages of each window:
+
+* fetch – HTTP request and response body (``EsiosClient.fetch_raw``)
+* parse – JSON decode and validation (``parse_price_rows``)
+* write – bulk upsert with rollups (``upsert_prices``)
+
+Windows run concurrently, so stage times are summed across workers and can
+add up to more than the wall-clock time. Benchmark rows use a synthetic
+indicator and are deleted before and after the run; empty monthly partitions
+created for the range are kept.
+
+With ``--json`` the results are also written as JSON (``-`` for stdout) so
+runs can be compared across releases.
+
+Usage:
+    python benchmarks/bench_ingest.py --years 2 --zones 5 --json results.json
+    python benchmarks/bench_ingest.py --years 1 --step-minutes 15
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from importlib.metadata import version
+
+from fake_esios import serve_process
+from sqlalchemy import text
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import get_engine
+from esios_ingestor.ingestion import client as client_module
+from esios_ingestor.ingestion import service
+from esios_ingestor.ingestion.client import EsiosClient
+from esios_ingestor.schemas import Series
+
+BENCH_INDICATOR_ID = -1001
+FIRST_ZONE_ID = 8741
+START = datetime(2015, 1, 1, tzinfo=UTC)
+
+stage_seconds: dict[str, float] = defaultdict(float)
+
+
+def timed_async(stage: str, func):
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            stage_seconds[stage] += time.perf_counter() - started
+
+    return wrapper
+
+
+def timed(stage: str, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stage_seconds[stage] += time.perf_counter() - started
+
+    return wrapper
+
+
+async def delete_bench_rows() -> None:
+    async with get_engine().begin() as conn:
+        for table in (
+            "electricity_prices",
+            "price_daily_rollups",
+            "price_hour_of_day_rollups",
+            "series_watermarks",
+        ):
+            await conn.execute(
+                text(f"DELETE FROM {table} WHERE indicator_id = :indicator_id"),
+                {"indicator_id": BENCH_INDICATOR_ID},
+            )
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+async def run(args: argparse.Namespace) -> dict:
+    series = [Series(BENCH_INDICATOR_ID, FIRST_ZONE_ID + i) for i in range(args.zones)]
+    end = START.replace(year=START.year + args.years) - timedelta(seconds=1)
+
+    await delete_bench_rows()
+    rss_before = peak_rss_mb()
+
+    client_module.parse_price_rows = timed("parse", client_module.parse_price_rows)
+    # ingest_window and write_prices both look it up in the module, so both are timed
+    service.upsert_prices = timed_async("write", service.upsert_prices)
+
+    try:
+        async with EsiosClient() as client:
+            client.fetch_raw = timed_async("fetch", client.fetch_raw)
+            started = time.perf_counter()
+            inserted, skipped = await service.ingest_data(
+                START,
+                end,
+                window_days=args.window_days,
+                concurrency=args.concurrency,
+                client=client,
+                series=series,
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        await delete_bench_rows()
+        await get_engine().dispose()
+
+    if missing := {"fetch", "parse", "write"} - stage_seconds.keys():
+        # A renamed or bypassed function would otherwise just vanish from the report
+        raise RuntimeError(f"Stages never timed: {', '.join(sorted(missing))}")
+    busy = sum(stage_seconds.values())
+    return {
+        "benchmark": "ingest",
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "esios_ingestor": version("esios-ingestor"),
+        "python": platform.python_version(),
+        "params": {
+            "years": args.years,
+            "zones": args.zones,
+            "step_minutes": args.step_minutes,
+            "window_days": args.window_days or settings.INGESTION_WINDOW_DAYS,
+            "concurrency": args.concurrency or settings.INGESTION_CONCURRENCY,
+            "batch_size": settings.INGESTION_BATCH_SIZE,
+        },
+        "rows": inserted + skipped,
+        "inserted": inserted,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round((inserted + skipped) / elapsed),
+        "stages": {
+            stage: {"seconds": round(seconds, 3), "share": round(seconds / busy, 3)}
+            for stage, seconds in sorted(stage_seconds.items())
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "baseline_rss_mb": round(rss_before, 1),
+    }
+
+
+def report(results: dict) -> None:
+    params = results["params"]
+    print(
+        f"{params['years']} years x {params['zones']} zones every {params['step_minutes']} min, "
+        f"{params['window_days']}-day windows, concurrency {params['concurrency']}"
+    )
+    print(
+        f"{results['rows']:,} rows in {results['seconds']:.2f}s "
+        f"({results['rows_per_second']:,} rows/s), peak RSS {results['peak_rss_mb']:.0f} MB "
+        f"(baseline {results['baseline_rss_mb']:.0f} MB)"
+    )
+    for stage, timing in results["stages"].items():
+        print(f"  {stage:<6} {timing['seconds']:>8.2f}s  {timing['share']:>6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=2, help="Years of history per zone")
+    parser.add_argument("--zones", type=int, default=5, help="Number of geo zones")
+    parser.add_argument(
+        "--step-minutes", type=int, default=60, help="Spacing between points (15 for quarter-hour)"
+    )
+    parser.add_argument("--window-days", type=int, default=None, help="Override window size")
+    parser.add_argument("--concurrency", type=int, default=None, help="Override concurrency")
+    parser.add_argument("--json", default=None, help="Write results as JSON here ('-' for stdout)")
+    args = parser.parse_args()
+
+    with serve_process(args.step_minutes) as base_url:
+        settings.ESIOS_BASE_URL = base_url
+        # Measure the pipeline, not the API rate limiter
+        settings.ESIOS_RATE_LIMIT = 1e9
+        settings.ESIOS_RATE_BURST = 1000
+        results = asyncio.run(run(args))
+
+    report(results)
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
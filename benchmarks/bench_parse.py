@@ -0,0 +1,66 @@
+"""Benchmark for decoding ESIOS payloads.
+
+Compares the full ``EsiosResponse`` model tree against the lean
+``parse_price_rows`` path on a synthetic quarter-hour payload, reporting time
+and peak Python allocations per decode.
+
+Usage:
+    python benchmarks/bench_parse.py --days 365
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+from fake_esios import generate_values
+
+from esios_ingestor.schemas import EsiosResponse, parse_price_rows
+
+
+def make_body(days: int) -> bytes:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    values = generate_values(start, start + timedelta(days=days), [8741], timedelta(minutes=15))
+    payload = {
+        "indicator": {
+            "name": "PVPC",
+            "short_name": "PVPC",
+            "id": 1001,
+            "composited": False,
+            "step_type": "linear",
+            "disaggregated": True,
+            "values": values,
+        }
+    }
+    return json.dumps(payload).encode()
+
+
+def full_model(body: bytes) -> list:
+    data = EsiosResponse(**json.loads(body))
+    return [(item.datetime_utc, item.value, item.geo_id) for item in data.indicator.values]
+
+
+def measure(name: str, decode, body: bytes, repeat: int = 3) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = decode(body)
+    elapsed = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    decode(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<6} {len(rows):>8} rows  {elapsed * 1000:8.1f}ms  peak {peak / 1e6:6.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="Days of quarter-hour values")
+    args = parser.parse_args()
+
+    body = make_body(args.days)
+    print(f"payload {len(body) / 1e6:.1f}MB")
+    measure("full", full_model, body)
+    measure("lean", parse_price_rows, body)
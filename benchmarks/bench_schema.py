@@ -0,0 +1,214 @@
+"""Benchmark for the price table storage layout.
+
+Loads the same synthetic multi-zone history into the legacy layout (surrogate
+``id`` primary key, unique natural key, separate timestamp and zone/timestamp
+btrees, one heap) and into the compact ``ElectricityPrice`` layout (natural
+primary key, smallint zone, monthly partitions). Reports insert throughput
+through a batched ``INSERT ... SELECT FROM unnest(...)`` (one commit per
+batch, like ingestion windows), table and index size after loading, and the
+median time of the default ``/prices`` page: the latest rows across zones,
+ordered by (timestamp, zone_id).
+
+Everything is created in a scratch schema that is dropped afterwards.
+
+Usage:
+    python benchmarks/bench_schema.py --years 10 --zones 5
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import (
+    ARRAY,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    Table,
+    UniqueConstraint,
+    bindparam,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert
+
+from esios_ingestor.core.database import get_engine
+from esios_ingestor.core.partitions import add_months, month_start
+from esios_ingestor.models.price import ElectricityPrice
+
+SCHEMA = "bench_schema"
+BENCH_INDICATOR_ID = 1001
+BATCH_SIZE = 10000
+
+metadata = MetaData(schema=SCHEMA)
+
+legacy = Table(
+    "legacy_prices",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("timestamp", DateTime(timezone=True), nullable=False),
+    Column("price", Float, nullable=False),
+    Column("zone_id", Integer, nullable=False),
+    Column("indicator_id", Integer, nullable=False),
+    UniqueConstraint("indicator_id", "zone_id", "timestamp"),
+    Index("legacy_ix_id", "id"),
+    Index("legacy_ix_timestamp", "timestamp"),
+    Index("legacy_idx_zone_timestamp", "zone_id", "timestamp"),
+)
+
+compact = ElectricityPrice.__table__.to_metadata(metadata, name="compact_prices")
+
+
+def make_columns(years: int, zones: int, step: timedelta):
+    start = datetime(2015, 1, 1, tzinfo=UTC)
+    end = start.replace(year=start.year + years)
+    timestamps = []
+    current = start
+    while current < end:
+        timestamps.append(current)
+        current += step
+
+    for zone_id in range(8741, 8741 + zones):
+        for offset in range(0, len(timestamps), BATCH_SIZE):
+            batch = timestamps[offset : offset + BATCH_SIZE]
+            yield batch, [50.0 + (ts.hour + zone_id) % 24 for ts in batch], [zone_id] * len(batch)
+
+
+def upsert_statement(table: Table):
+    source = (
+        func.unnest(
+            bindparam("timestamps", type_=ARRAY(DateTime(timezone=True))),
+            bindparam("prices", type_=ARRAY(Float)),
+            bindparam("zone_ids", type_=ARRAY(SmallInteger)),
+        )
+        .table_valued("timestamp", "price", "zone_id")
+        .render_derived()
+    )
+    return (
+        insert(table)
+        .from_select(
+            ["indicator_id", "timestamp", "price", "zone_id"],
+            select(
+                bindparam("indicator_id", type_=Integer),
+                source.c.timestamp,
+                source.c.price,
+                source.c.zone_id,
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["indicator_id", "zone_id", "timestamp"])
+    )
+
+
+async def create_layouts(years: int) -> None:
+    async with get_engine().begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(metadata.create_all)
+
+        month = month_start(datetime(2015, 1, 1, tzinfo=UTC))
+        for _ in range(years * 12):
+            following = add_months(month, 1)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {SCHEMA}.compact_prices_p{month:%Y%m} "
+                    f"PARTITION OF {SCHEMA}.compact_prices "
+                    f"FOR VALUES FROM ('{month} 00:00+00') TO ('{following} 00:00+00')"
+                )
+            )
+            month = following
+
+
+async def load(table: Table, batches) -> tuple[int, float]:
+    stmt = upsert_statement(table)
+    rows = 0
+    started = time.perf_counter()
+
+    for timestamps, prices, zone_ids in batches:
+        async with get_engine().begin() as conn:
+            await conn.execute(
+                stmt,
+                {
+                    "indicator_id": BENCH_INDICATOR_ID,
+                    "timestamps": timestamps,
+                    "prices": prices,
+                    "zone_ids": zone_ids,
+                },
+            )
+        rows += len(timestamps)
+
+    return rows, time.perf_counter() - started
+
+
+async def latest_page_ms(table: Table, runs: int = 50) -> float:
+    query = (
+        select(table.c.zone_id, table.c.timestamp, table.c.price)
+        .where(table.c.indicator_id == BENCH_INDICATOR_ID)
+        .order_by(table.c.timestamp.desc(), table.c.zone_id.desc())
+        .limit(25)
+    )
+    timings = []
+    async with get_engine().connect() as conn:
+        for _ in range(runs):
+            started = time.perf_counter()
+            (await conn.execute(query)).all()
+            timings.append(time.perf_counter() - started)
+    return sorted(timings)[runs // 2] * 1000
+
+
+async def sizes(table: Table) -> tuple[int, int]:
+    async with get_engine().connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT sum(pg_table_size(oid))::bigint, sum(pg_indexes_size(oid))::bigint "
+                "FROM pg_class "
+                "WHERE relkind = 'r' AND oid IN ("
+                "SELECT relid FROM pg_partition_tree(CAST(:table AS regclass)) "
+                "UNION SELECT CAST(:table AS regclass))"
+            ),
+            {"table": f"{SCHEMA}.{table.name}"},
+        )
+        return result.one()
+
+
+async def main(years: int, zones: int, step_minutes: int) -> None:
+    step = timedelta(minutes=step_minutes)
+    await create_layouts(years)
+
+    try:
+        print(
+            f"{'layout':<8} {'rows':>10} {'rows/s':>10} {'table':>10} {'indexes':>10} "
+            f"{'total':>10} {'page':>9}"
+        )
+        for name, table in (("legacy", legacy), ("compact", compact)):
+            rows, elapsed = await load(table, make_columns(years, zones, step))
+            async with get_engine().connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.{table.name}"))
+            table_bytes, index_bytes = await sizes(table)
+            page_ms = await latest_page_ms(table)
+            print(
+                f"{name:<8} {rows:>10,} {rows / elapsed:>10,.0f} "
+                f"{table_bytes / 1e6:>8.1f}MB {index_bytes / 1e6:>8.1f}MB "
+                f"{(table_bytes + index_bytes) / 1e6:>8.1f}MB {page_ms:>7.2f}ms"
+            )
+    finally:
+        async with get_engine().begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=10, help="Years of history per zone")
+    parser.add_argument("--zones", type=int, default=5, help="Number of geo zones")
+    parser.add_argument(
+        "--step-minutes", type=int, default=60, help="Spacing between points (15 for quarter-hour)"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.years, args.zones, args.step_minutes))
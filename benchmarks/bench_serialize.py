@@ -0,0 +1,78 @@
+"""Benchmark for encoding `/prices` responses.
+
+Compares the previous path (``ElectricityPrice`` instances validated one by
+one into ``PriceResponse`` and run through ``jsonable_encoder``) against the
+tuple rows encoded straight to bytes, as a list of objects and as columns,
+reporting time and peak Python allocations per response for growing limits.
+The JSON encoder is orjson when installed, the standard library otherwise.
+
+Usage:
+    python benchmarks/bench_serialize.py --limits 100 1000 5000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.web import cache
+from esios_ingestor.web.routes import PriceResponse, _encode_prices
+
+INDICATOR_ID = 1001
+
+
+def make_rows(count: int) -> list[tuple[int, datetime, float]]:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return [(8741, start + timedelta(minutes=15 * i), 50.0 + i % 97 / 7) for i in range(count)]
+
+
+def orm_pydantic(rows: list[tuple[int, datetime, float]]) -> bytes:
+    prices = [
+        ElectricityPrice(timestamp=timestamp, price=price, zone_id=zone, indicator_id=INDICATOR_ID)
+        for zone, timestamp, price in rows
+    ]
+    content = [PriceResponse.model_validate(price) for price in prices]
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+def tuple_rows(rows: list[tuple[int, datetime, float]]) -> bytes:
+    return _encode_prices(rows, INDICATOR_ID, "rows")
+
+
+def tuple_columns(rows: list[tuple[int, datetime, float]]) -> bytes:
+    return _encode_prices(rows, INDICATOR_ID, "columns")
+
+
+def measure(name: str, encode, rows: list, repeat: int) -> None:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = encode(rows)
+    elapsed = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    encode(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<14} {len(rows):>6} rows  {elapsed * 1000:8.2f}ms  "
+        f"peak {peak / 1e6:6.2f}MB  body {len(body) / 1e3:8.1f}kB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20, help="Encodes per measurement")
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if cache.orjson is not None else 'json (stdlib)'}")
+    for limit in args.limits:
+        rows = make_rows(limit)
+        measure("orm+pydantic", orm_pydantic, rows, args.repeat)
+        measure("tuples", tuple_rows, rows, args.repeat)
+        measure("columns", tuple_columns, rows, args.repeat)
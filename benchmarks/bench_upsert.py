@@ -0,0 +1,81 @@
+"""Benchmark for the ingestion write stage.
+
+Compares the legacy one-INSERT-per-row path against the batched
+``write_prices`` upsert used by ``ingest_data`` (which also maintains the
+rollup tables). Rows are written to a synthetic zone inside a
+transaction that is rolled back, so the benchmark leaves the database untouched.
+
+Usage:
+    python benchmarks/bench_upsert.py --rows 8760
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.dialects.postgresql import insert
+
+from esios_ingestor.core.database import Base, get_engine, get_sessionmaker
+from esios_ingestor.core.partitions import ensure_partitions, month_start
+from esios_ingestor.ingestion.service import write_prices
+from esios_ingestor.models.price import ElectricityPrice
+
+BENCH_ZONE_ID = -1
+BENCH_INDICATOR_ID = 1001
+
+
+def make_rows(count: int) -> list[tuple[datetime, float, int]]:
+    start = datetime(2000, 1, 1, tzinfo=UTC)
+    return [(start + timedelta(hours=i), 50.0 + i % 24, BENCH_ZONE_ID) for i in range(count)]
+
+
+async def per_row(session, rows: list[tuple[datetime, float, int]]) -> None:
+    for timestamp, price, zone_id in rows:
+        stmt = (
+            insert(ElectricityPrice)
+            .values(
+                indicator_id=BENCH_INDICATOR_ID, timestamp=timestamp, price=price, zone_id=zone_id
+            )
+            .on_conflict_do_nothing(index_elements=["indicator_id", "zone_id", "timestamp"])
+        )
+        await session.execute(stmt)
+
+
+async def batched(session, rows: list[tuple[datetime, float, int]]) -> None:
+    await write_prices(session, BENCH_INDICATOR_ID, rows)
+
+
+async def measure(name: str, writer, rows: list[tuple[datetime, float, int]]) -> float:
+    async with get_sessionmaker()() as session:
+        started = time.perf_counter()
+        await writer(session, rows)
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+
+    rate = len(rows) / elapsed
+    print(f"{name:<10} {len(rows):>8} rows  {elapsed:8.3f}s  {rate:>12,.0f} rows/s")
+    return rate
+
+
+async def main(rows_count: int) -> None:
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rows = make_rows(rows_count)
+    await ensure_partitions(get_engine(), {month_start(timestamp) for timestamp, _, _ in rows})
+
+    before = await measure("per-row", per_row, rows)
+    after = await measure("batched", batched, rows)
+    print(f"speedup    {after / before:.1f}x")
+
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, default=8760, help="Rows to write (default: 1 year hourly)"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
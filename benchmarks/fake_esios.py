@@ -0,0 +1,127 @@
+"""Local stand-in for the ESIOS API used by the benchmarks.
+
+Serves ``GET /indicators/{indicator_id}`` with synthetic values for every
+requested geo id between ``start_date`` and ``end_date``, in the same JSON
+shape the real API returns.
+"""
+
+import math
+import multiprocessing
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+
+import uvicorn
+from fastapi import FastAPI, Query
+
+GEO_NAMES = {8741: "Península", 8742: "Canarias", 8743: "Baleares", 8744: "Ceuta", 8745: "Melilla"}
+
+
+def generate_values(
+    start: datetime, end: datetime, geo_ids: list[int], step: timedelta
+) -> list[dict]:
+    values = []
+    current = start.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    while current <= end:
+        hour = current.hour + current.minute / 60
+        for geo_id in geo_ids:
+            price = 100.0 + 40.0 * math.sin(hour / 24 * 2 * math.pi) + geo_id % 7
+            values.append(
+                {
+                    "value": round(price, 2),
+                    "datetime": current.isoformat(),
+                    "datetime_utc": current.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "tz_time": current.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                    "geo_id": geo_id,
+                    "geo_name": GEO_NAMES.get(geo_id, str(geo_id)),
+                }
+            )
+        current += step
+    return values
+
+
+def create_app(step_minutes: int = 60) -> FastAPI:
+    app = FastAPI(title="Fake ESIOS")
+    step = timedelta(minutes=step_minutes)
+
+    @app.get("/indicators/{indicator_id}")
+    async def indicator(
+        indicator_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        geo_ids: list[int] = Query([8741], alias="geo_ids[]"),
+    ):
+        return {
+            "indicator": {
+                "name": "Fake indicator",
+                "short_name": "Fake",
+                "id": indicator_id,
+                "composited": False,
+                "step_type": "linear",
+                "disaggregated": True,
+                "values": generate_values(start_date, end_date, geo_ids, step),
+            }
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(step_minutes: int = 60):
+    """Run the fake API in a background thread and yield its base URL."""
+    port = _free_port()
+    config = uvicorn.Config(
+        create_app(step_minutes), host="127.0.0.1", port=port, log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def _run(port: int, step_minutes: int) -> None:
+    uvicorn.run(create_app(step_minutes), host="127.0.0.1", port=port, log_level="warning")
+
+
+@contextmanager
+def serve_process(step_minutes: int = 60):
+    """
+    Run the fake API in a separate process and yield its base URL.
+
+    Keeps payload generation off the measuring process, so its CPU time and
+    memory do not show up in the results.
+    """
+    port = _free_port()
+    process = multiprocessing.Process(target=_run, args=(port, step_minutes), daemon=True)
+    process.start()
+
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            if not process.is_alive():
+                raise RuntimeError("Fake ESIOS server failed to start") from None
+            time.sleep(0.05)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,15 @@
+-- migrations/002_add_indicator_id.sql
+-- Store the ESIOS indicator with every price so several indicators can share the table.
+-- Existing rows were all ingested from indicator 1001 (PVPC).
+ALTER TABLE electricity_prices ADD COLUMN IF NOT EXISTS indicator_id INTEGER;
+UPDATE electricity_prices SET indicator_id = 1001 WHERE indicator_id IS NULL;
+ALTER TABLE electricity_prices ALTER COLUMN indicator_id SET NOT NULL;
+
+-- Uniqueness is now per (indicator, zone, timestamp); the column order also serves
+-- per-series range scans and max(timestamp) lookups.
+ALTER TABLE electricity_prices DROP CONSTRAINT IF EXISTS uq_price_timestamp_zone;
+ALTER TABLE electricity_prices DROP CONSTRAINT IF EXISTS uq_price_indicator_zone_timestamp;
+ALTER TABLE electricity_prices
+    ADD CONSTRAINT uq_price_indicator_zone_timestamp UNIQUE (indicator_id, zone_id, timestamp);
+
+ANALYZE electricity_prices;
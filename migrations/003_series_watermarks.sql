@@ -0,0 +1,19 @@
+-- migrations/003_series_watermarks.sql
+-- Per-series coverage bounds maintained by ingestion (replaces max(timestamp) over the table)
+CREATE TABLE IF NOT EXISTS series_watermarks (
+    indicator_id INTEGER NOT NULL,
+    zone_id INTEGER NOT NULL,
+    first_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (indicator_id, zone_id)
+);
+
+-- Seed from existing data
+INSERT INTO series_watermarks (indicator_id, zone_id, first_timestamp, last_timestamp)
+SELECT indicator_id, zone_id, min(timestamp), max(timestamp)
+FROM electricity_prices
+GROUP BY indicator_id, zone_id
+ON CONFLICT (indicator_id, zone_id) DO UPDATE
+SET first_timestamp = LEAST(series_watermarks.first_timestamp, EXCLUDED.first_timestamp),
+    last_timestamp = GREATEST(series_watermarks.last_timestamp, EXCLUDED.last_timestamp);
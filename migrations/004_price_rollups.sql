@@ -0,0 +1,48 @@
+-- migrations/004_price_rollups.sql
+-- Daily and hour-of-day rollups maintained by ingestion and read by /prices/stats
+CREATE TABLE IF NOT EXISTS price_daily_rollups (
+    indicator_id INTEGER NOT NULL,
+    zone_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    price_sum DOUBLE PRECISION NOT NULL,
+    price_count INTEGER NOT NULL,
+    price_min DOUBLE PRECISION NOT NULL,
+    price_max DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (indicator_id, zone_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS price_hour_of_day_rollups (
+    indicator_id INTEGER NOT NULL,
+    zone_id INTEGER NOT NULL,
+    month DATE NOT NULL,
+    hour SMALLINT NOT NULL,
+    price_sum DOUBLE PRECISION NOT NULL,
+    price_count INTEGER NOT NULL,
+    price_min DOUBLE PRECISION NOT NULL,
+    price_max DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (indicator_id, zone_id, month, hour)
+);
+
+-- Rebuild from existing data (idempotent: recomputes every group from scratch)
+INSERT INTO price_daily_rollups
+SELECT indicator_id, zone_id, (timestamp AT TIME ZONE 'UTC')::date,
+       sum(price), count(*), min(price), max(price)
+FROM electricity_prices
+GROUP BY 1, 2, 3
+ON CONFLICT (indicator_id, zone_id, day) DO UPDATE
+SET price_sum = EXCLUDED.price_sum,
+    price_count = EXCLUDED.price_count,
+    price_min = EXCLUDED.price_min,
+    price_max = EXCLUDED.price_max;
+
+INSERT INTO price_hour_of_day_rollups
+SELECT indicator_id, zone_id, date_trunc('month', timestamp AT TIME ZONE 'UTC')::date,
+       extract(hour FROM timestamp AT TIME ZONE 'UTC')::smallint,
+       sum(price), count(*), min(price), max(price)
+FROM electricity_prices
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (indicator_id, zone_id, month, hour) DO UPDATE
+SET price_sum = EXCLUDED.price_sum,
+    price_count = EXCLUDED.price_count,
+    price_min = EXCLUDED.price_min,
+    price_max = EXCLUDED.price_max;
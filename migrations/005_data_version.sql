@@ -0,0 +1,10 @@
+-- migrations/005_data_version.sql
+-- Single-row counter bumped by ingestion; read API caches are invalidated when it changes
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
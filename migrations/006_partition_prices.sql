@@ -0,0 +1,68 @@
+-- migrations/006_partition_prices.sql
+-- Convert electricity_prices into a table range-partitioned by UTC month.
+-- Partitions are named electricity_prices_pYYYYMM; the app creates future ones on demand.
+-- The primary key becomes (id, timestamp) because it must include the partition key.
+DO $$
+DECLARE
+    first_month DATE;
+    last_month DATE;
+    month DATE;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'electricity_prices'::regclass) = 'p' THEN
+        RAISE NOTICE 'electricity_prices is already partitioned';
+        RETURN;
+    END IF;
+
+    ALTER TABLE electricity_prices RENAME TO electricity_prices_unpartitioned;
+    ALTER TABLE electricity_prices_unpartitioned
+        RENAME CONSTRAINT uq_price_indicator_zone_timestamp TO uq_price_unpartitioned;
+    ALTER INDEX electricity_prices_pkey RENAME TO electricity_prices_unpartitioned_pkey;
+    DROP INDEX IF EXISTS idx_timestamp_brin;
+
+    CREATE TABLE electricity_prices (
+        id INTEGER NOT NULL DEFAULT nextval('electricity_prices_id_seq'),
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        price DOUBLE PRECISION NOT NULL,
+        zone_id INTEGER NOT NULL,
+        indicator_id INTEGER NOT NULL,
+        PRIMARY KEY (id, timestamp),
+        CONSTRAINT uq_price_indicator_zone_timestamp UNIQUE (indicator_id, zone_id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    ALTER SEQUENCE electricity_prices_id_seq OWNED BY electricity_prices.id;
+
+    SELECT date_trunc('month', min(timestamp) AT TIME ZONE 'UTC')::date,
+           date_trunc('month', max(timestamp) AT TIME ZONE 'UTC')::date
+    INTO first_month, last_month
+    FROM electricity_prices_unpartitioned;
+
+    month := LEAST(COALESCE(first_month, CURRENT_DATE), date_trunc('month', now() AT TIME ZONE 'UTC')::date);
+    WHILE month <= GREATEST(
+        COALESCE(last_month, CURRENT_DATE),
+        (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months')::date
+    ) LOOP
+        EXECUTE format(
+            'CREATE TABLE electricity_prices_p%s PARTITION OF electricity_prices '
+            'FOR VALUES FROM (%L) TO (%L)',
+            to_char(month, 'YYYYMM'),
+            month || ' 00:00:00+00',
+            (month + interval '1 month')::date || ' 00:00:00+00'
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+
+    INSERT INTO electricity_prices (id, timestamp, price, zone_id, indicator_id)
+    SELECT id, timestamp, price, zone_id, indicator_id FROM electricity_prices_unpartitioned;
+
+    DROP TABLE electricity_prices_unpartitioned;
+END $$;
+
+-- Redundant with the unique (indicator_id, zone_id, timestamp) index and partition pruning
+DROP INDEX IF EXISTS idx_zone_timestamp;
+DROP INDEX IF EXISTS ix_electricity_prices_timestamp;
+DROP INDEX IF EXISTS ix_electricity_prices_id;
+
+-- BRIN per partition for time-range scans inside a month (cheap to maintain)
+CREATE INDEX IF NOT EXISTS idx_timestamp_brin
+ON electricity_prices USING BRIN(timestamp) WITH (pages_per_range = 128);
+
+ANALYZE electricity_prices;
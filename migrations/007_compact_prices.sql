@@ -0,0 +1,68 @@
+-- migrations/007_compact_prices.sql
+-- Compact price layout: no surrogate id, (indicator_id, zone_id, timestamp) as the
+-- primary key (the only btree), smallint zone, fixed-width columns ordered to avoid
+-- alignment padding. The table is rebuilt partition by partition in key order, so it
+-- needs free space for a second copy while it runs.
+DO $$
+DECLARE
+    part RECORD;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'electricity_prices'
+          AND column_name = 'id'
+    ) THEN
+        RAISE NOTICE 'electricity_prices already uses the compact layout';
+        RETURN;
+    END IF;
+
+    CREATE TABLE electricity_prices_compact (
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        price DOUBLE PRECISION NOT NULL,
+        indicator_id INTEGER NOT NULL,
+        zone_id SMALLINT NOT NULL,
+        CONSTRAINT electricity_prices_compact_pkey PRIMARY KEY (indicator_id, zone_id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+
+    FOR part IN
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'electricity_prices'::regclass
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF electricity_prices_compact %s',
+            part.relname || '_compact', part.bound
+        );
+    END LOOP;
+
+    INSERT INTO electricity_prices_compact (timestamp, price, indicator_id, zone_id)
+    SELECT timestamp, price, indicator_id, zone_id
+    FROM electricity_prices
+    ORDER BY indicator_id, zone_id, timestamp;
+
+    -- Also drops the old partitions and the id sequence
+    DROP TABLE electricity_prices;
+
+    ALTER TABLE electricity_prices_compact RENAME TO electricity_prices;
+    ALTER INDEX electricity_prices_compact_pkey RENAME TO electricity_prices_pkey;
+
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'electricity_prices'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I RENAME TO %I', part.relname, left(part.relname, -length('_compact'))
+        );
+        EXECUTE format(
+            'ALTER INDEX %I RENAME TO %I',
+            part.relname || '_pkey', left(part.relname, -length('_compact')) || '_pkey'
+        );
+    END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_timestamp_brin
+ON electricity_prices USING BRIN(timestamp) WITH (pages_per_range = 128);
+
+ANALYZE electricity_prices;
@@ -0,0 +1,11 @@
+-- migrations/008_ingestion_cycles.sql
+-- One row per scheduled slot of `esios daemon`; replicas skip slots that already succeeded
+CREATE TABLE IF NOT EXISTS ingestion_cycles (
+    slot TIMESTAMP WITH TIME ZONE PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    replica VARCHAR(255) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    inserted INTEGER,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    finished_at TIMESTAMP WITH TIME ZONE
+);
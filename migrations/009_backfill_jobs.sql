@@ -0,0 +1,28 @@
+-- migrations/009_backfill_jobs.sql
+-- `esios backfill` jobs; a job's progress is the set of windows stored with their prices
+CREATE TABLE IF NOT EXISTS backfill_jobs (
+    id SERIAL PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    start_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    end_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    window_days INTEGER NOT NULL,
+    series JSONB NOT NULL,
+    total_windows INTEGER NOT NULL,
+    replica VARCHAR(255),
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS backfill_windows (
+    job_id INTEGER NOT NULL REFERENCES backfill_jobs (id) ON DELETE CASCADE,
+    indicator_id INTEGER NOT NULL,
+    zone_id INTEGER NOT NULL,
+    start TIMESTAMP WITH TIME ZONE NOT NULL,
+    "end" TIMESTAMP WITH TIME ZONE NOT NULL,
+    inserted INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    PRIMARY KEY (job_id, indicator_id, zone_id, start)
+);
@@ -0,0 +1,3 @@
+-- migrations/010_series_verified_through.sql
+-- Auto-ingest scans for holes only after this point; holes below it were fetched and came back empty
+ALTER TABLE series_watermarks ADD COLUMN IF NOT EXISTS verified_through TIMESTAMP WITH TIME ZONE;
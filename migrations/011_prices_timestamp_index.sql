@@ -0,0 +1,7 @@
+-- migrations/011_prices_timestamp_index.sql
+-- /prices without zone_id pages by (timestamp, zone_id) within an indicator. The primary key
+-- leads with zone_id, so without this index every page scans and sorts all partitions.
+CREATE INDEX IF NOT EXISTS idx_indicator_timestamp_zone
+ON electricity_prices (indicator_id, timestamp, zone_id);
+
+ANALYZE electricity_prices;
@@ -0,0 +1,116 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import DateTime, Interval, Row, Select, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.models.price import ElectricityPrice
+
+BUCKETS = {
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+    "1w": timedelta(weeks=1),
+}
+
+Bucket = Literal["15m", "1h", "1d", "1w"]
+
+AGGREGATE_COLUMNS = ("bucket", "zone_id", "open", "high", "low", "close", "avg", "count")
+
+# A Monday at UTC midnight: days start at 00:00 UTC and weeks on Monday
+BUCKET_ORIGIN = datetime(2000, 1, 3, tzinfo=UTC)
+
+
+class BucketError(ValueError):
+    """Unknown bucket size, or a range spanning too many buckets."""
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # Naive datetimes are read as UTC, as everywhere else in the API
+    return timestamp.replace(tzinfo=UTC) if timestamp.tzinfo is None else timestamp
+
+
+def bucket_start(timestamp: datetime, bucket: str) -> datetime:
+    """Start of the bucket holding `timestamp`."""
+    timestamp = _as_utc(timestamp)
+    return timestamp - (timestamp - BUCKET_ORIGIN) % BUCKETS[bucket]
+
+
+def check_bucket_range(
+    bucket: str, start_date: datetime, end_date: datetime, max_buckets: int
+) -> None:
+    if bucket not in BUCKETS:
+        raise BucketError(f"Unknown bucket '{bucket}' (use {', '.join(BUCKETS)})")
+    start_date, end_date = _as_utc(start_date), _as_utc(end_date)
+    if end_date < start_date:
+        raise BucketError("end_date must not be before start_date")
+
+    buckets = (end_date - bucket_start(start_date, bucket)) // BUCKETS[bucket] + 1
+    if buckets > max_buckets:
+        raise BucketError(
+            f"Range spans {buckets} {bucket} buckets (at most {max_buckets}); "
+            "use a larger bucket or a shorter range"
+        )
+
+
+def aggregate_query(
+    indicator_id: int,
+    bucket: str,
+    start_date: datetime,
+    end_date: datetime | None = None,
+    zone_id: int | None = None,
+) -> Select:
+    """
+    Open, high, low, close, average and count of prices per (zone_id, bucket).
+
+    The reduction runs in Postgres (`date_bin` on the timestamp), so the
+    result has one row per bucket however many prices fall into it. The
+    range starts at the beginning of the bucket holding `start_date`; a
+    bucket cut by `end_date` only aggregates the prices up to it.
+    """
+    width = literal(BUCKETS[bucket], Interval)
+    origin = literal(BUCKET_ORIGIN, DateTime(timezone=True))
+    bucket_column = func.date_bin(width, ElectricityPrice.timestamp, origin).label("bucket")
+    price, timestamp = ElectricityPrice.price, ElectricityPrice.timestamp
+
+    query = (
+        select(
+            bucket_column,
+            ElectricityPrice.zone_id,
+            array_agg(aggregate_order_by(price, timestamp.asc()))[1].label("open"),
+            func.max(price).label("high"),
+            func.min(price).label("low"),
+            array_agg(aggregate_order_by(price, timestamp.desc()))[1].label("close"),
+            func.avg(price).label("avg"),
+            func.count().label("count"),
+        )
+        .where(
+            ElectricityPrice.indicator_id == indicator_id,
+            ElectricityPrice.timestamp >= bucket_start(start_date, bucket),
+        )
+        .group_by(ElectricityPrice.zone_id, bucket_column)
+        .order_by(ElectricityPrice.zone_id, bucket_column)
+    )
+
+    if zone_id is not None:
+        query = query.where(ElectricityPrice.zone_id == zone_id)
+    if end_date is not None:
+        query = query.where(ElectricityPrice.timestamp <= end_date)
+    return query
+
+
+async def aggregate_prices(
+    session: AsyncSession,
+    indicator_id: int,
+    bucket: str,
+    start_date: datetime,
+    end_date: datetime | None = None,
+    zone_id: int | None = None,
+) -> Sequence[Row]:
+    """Rows of AGGREGATE_COLUMNS, ordered by (zone_id, bucket)."""
+    result = await session.execute(
+        aggregate_query(indicator_id, bucket, start_date, end_date, zone_id)
+    )
+    return result.all()
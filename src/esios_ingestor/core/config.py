@@ -1,3 +1,7 @@
+from functools import cache
+from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,13 +14,116 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
 
-    ESIOS_API_KEY: str
+    # Connection pool of the primary engine (ingestion and other writes)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # Read-only sessions (API routes, read commands) get their own pool, on a
+    # streaming replica when POSTGRES_REPLICA_HOST is set and on the primary otherwise
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None  # Defaults to POSTGRES_PORT
+    DB_READ_POOL_SIZE: int = 10
+    DB_READ_MAX_OVERFLOW: int = 20
+    DB_REPLICA_CHECK_TIMEOUT: float = 2.0  # Readiness routes reads to the primary past this
+    DB_REPLICA_CHECK_SECONDS: float = 10.0  # How often each API process re-checks the replica
+    # Statements slower than this are logged with their SQL; None disables the log
+    DB_SLOW_QUERY_SECONDS: float | None = 1.0
+
+    # Only needed by commands that call ESIOS (ingest, daemon); read-only commands run without it
+    ESIOS_API_KEY: str | None = None
+    ESIOS_BASE_URL: str = "https://api.esios.ree.es"
+
+    # (indicator_id, geo_id) pairs to ingest, as JSON: [[1001, 8741], [1001, 8742]]
+    ESIOS_SERIES: list[tuple[int, int]] = [(1001, 8741)]
+    # Indicator served by the read API and CLI when none is requested (1001 = PVPC)
+    ESIOS_DEFAULT_INDICATOR: int = 1001
+
+    # Token bucket shared by all ESIOS requests; 429 Retry-After pauses it
+    ESIOS_RATE_LIMIT: float = 5.0
+    ESIOS_RATE_BURST: int = 5
+    ESIOS_RETRY_AFTER_DEFAULT: float = 30.0
+
+    # Pooled HTTP client used for every ESIOS request
+    ESIOS_TIMEOUT: float = 10.0
+    ESIOS_CONNECT_TIMEOUT: float = 5.0
+    ESIOS_MAX_CONNECTIONS: int = 10
+    ESIOS_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    ESIOS_KEEPALIVE_EXPIRY: float = 30.0
+    ESIOS_HTTP2: bool = False  # requires the h2 package (pip install "httpx[http2]")
 
     LOG_LEVEL: str = "INFO"
 
+    # Rows sent per bulk upsert statement
+    INGESTION_BATCH_SIZE: int = 10000
+    # Long ranges are split into windows of this size, fetched concurrently
+    INGESTION_WINDOW_DAYS: int = 31
+    INGESTION_CONCURRENCY: int = 4
+    # How often `esios backfill` logs progress and checks for cancellation, in seconds
+    BACKFILL_PROGRESS_SECONDS: float = 10.0
+    # Expected spacing between points of a series; larger jumps are reported as gaps
+    INGESTION_STEP_MINUTES: int = 60
+
+    # Gzipped raw ESIOS responses, content-addressed, for `esios replay`; None disables it
+    ARCHIVE_DIR: Path | None = None
+    # Windows archived this long after their end are final and served from the archive
+    ARCHIVE_SETTLE_DAYS: int = 3
+
+    # Ingestion daemon (esios daemon). PVPC for the next day is published around
+    # 20:15 Madrid time; later slots catch late publications and refresh the day.
+    DAEMON_TIMEZONE: str = "Europe/Madrid"
+    DAEMON_RUN_TIMES: list[str] = ["20:30", "21:30", "23:30", "08:00"]  # HH:MM, as JSON
+    DAEMON_JITTER_SECONDS: float = 60.0
+    DAEMON_BACKOFF_BASE: float = 30.0  # First retry delay after a failed run; doubles per failure
+    DAEMON_BACKOFF_MAX: float = 900.0
+    DAEMON_SHUTDOWN_GRACE: float = 30.0  # Time a running cycle gets to finish on SIGTERM
+
+    # Monthly partitions of electricity_prices
+    PARTITION_PREMAKE_MONTHS: int = 3  # Future months created ahead of time
+    RETENTION_MONTHS: int | None = (
+        None  # Months of raw prices kept (current included); None keeps all
+    )
+    RETENTION_ACTION: Literal["detach", "drop"] = "detach"
+
+    # Rows per server-side cursor fetch (and per Parquet row group) in exports
+    EXPORT_BATCH_SIZE: int = 10000
+
+    # Most buckets one /prices/aggregate request may span
+    AGGREGATE_MAX_BUCKETS: int = 10000
+
+    # Read API response cache (invalidated by the ingestion data version)
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_MAX_AGE: int = 5  # Cache-Control max-age sent to clients, in seconds
+    CACHE_VERSION_TTL: float = 1.0  # How long the data version is trusted before re-reading it
+    # Days of every series kept in memory to answer recent /prices reads; 0 disables
+    HOT_CACHE_DAYS: int = 7
+
+    # /prices/stream: Server-Sent Events fed by one LISTEN connection per process
+    STREAM_QUEUE_SIZE: int = 64  # Events buffered per subscriber before it is dropped as too slow
+    STREAM_REPLAY_EVENTS: int = 256  # Recent events replayed to clients sending Last-Event-ID
+    STREAM_MAX_SUBSCRIBERS: int = 10000
+    STREAM_KEEPALIVE_SECONDS: float = 15.0
+
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def READ_DATABASE_URL(self) -> str:
+        if not self.POSTGRES_REPLICA_HOST:
+            return self.DATABASE_URL
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{port}/{self.POSTGRES_DB}"
+
+
+@cache
+def get_settings() -> Settings:
+    """Settings, read from the environment and .env on first use."""
+    return Settings()
+
 
-settings = Settings()
+def __getattr__(name: str):
+    # `from esios_ingestor.core.config import settings` builds them on first import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
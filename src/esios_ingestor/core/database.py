@@ -1,20 +1,287 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import asyncio
+import logging
+import re
+import time
+from functools import cache, lru_cache
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from esios_ingestor.core.config import settings
-
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_timeout=30,
+from esios_ingestor.core.config import get_settings
+from esios_ingestor.core.metrics import (
+    DB_POOL_COLLECTOR,
+    DB_POOL_TIMEOUTS_TOTAL,
+    DB_POOL_WAIT_SECONDS,
+    DB_QUERY_SECONDS,
+    DB_SLOW_QUERIES_TOTAL,
+    observe_pool,
 )
 
-AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel carrying newly inserted price ranges (see ingestion.service.notify_prices)
+PRICES_CHANNEL = "esios_prices"
+
+_DML_TARGET = re.compile(r"\b(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+([\w.\"]+)", re.IGNORECASE)
+_SELECT_SOURCE = re.compile(r"\bFROM\s+([\w.\"]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def statement_name(statement: str) -> str:
+    """
+    Low-cardinality metric label for a SQL statement, e.g. "select electricity_prices".
+
+    Data-modifying statements (also inside a WITH) are named after their first
+    target table, queries after the first table they read.
+    """
+    words = statement.split(None, 1)
+    if not words:
+        return "empty"
+    verb = words[0].lower()
+
+    if verb in ("with", "insert", "update", "delete"):
+        match = _DML_TARGET.search(statement)
+        if match:
+            return f"{match[1].split()[0].lower()} {match[2].strip('"')}"
+
+    if verb in ("with", "select"):
+        match = _SELECT_SOURCE.search(statement)
+        return f"select {match[1].strip('"')}" if match else "select"
+
+    return verb
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long checkouts wait, and checkout timeouts."""
+
+    def connect(self):
+        pool = self._orig_logging_name or "default"
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS_TOTAL.labels(pool=pool).inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(pool=pool).observe(time.perf_counter() - started)
+            observe_pool(pool, self)
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        observe_pool(self._orig_logging_name or "default", self)
+
+
+def instrument_engine(engine: AsyncEngine, pool_name: str) -> None:
+    """Export statement latency and pool usage of `engine`, and log slow statements."""
+    sync_engine = engine.sync_engine
+
+    # Read through the engine: dispose() replaces its pool
+    DB_POOL_COLLECTOR.pools[pool_name] = lambda: sync_engine.pool
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        name = statement_name(statement)
+        DB_QUERY_SECONDS.labels(statement=name).observe(elapsed)
+
+        threshold = get_settings().DB_SLOW_QUERY_SECONDS
+        if threshold is not None and elapsed >= threshold:
+            DB_SLOW_QUERIES_TOTAL.labels(statement=name).inc()
+            logger.warning(f"Slow query ({name}) took {elapsed:.3f}s: {statement[:500]}")
+
+    def handle_error(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
+
+
+def _create_engine(
+    url: str, pool_name: str, pool_size: int, max_overflow: int, **options
+) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=pool_name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        pool_timeout=get_settings().DB_POOL_TIMEOUT,
+        **options,
+    )
+    instrument_engine(engine, pool_name)
+    return engine
+
+
+@cache
+def get_engine() -> AsyncEngine:
+    """Primary engine, for ingestion and anything else that writes. Created on first use."""
+    settings = get_settings()
+    return _create_engine(
+        settings.DATABASE_URL, "primary", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    )
+
+
+@cache
+def get_read_engine() -> AsyncEngine:
+    """
+    Engine for read-only sessions, with its own pool.
+
+    Points at the replica when POSTGRES_REPLICA_HOST is set, at the primary
+    otherwise; either way long ingestion transactions cannot starve reads of
+    connections. Transactions are read-only.
+    """
+    settings = get_settings()
+    options = {}
+    if settings.POSTGRES_REPLICA_HOST:
+        # Connecting to a dead replica fails fast, so reads fail over quickly
+        options["connect_args"] = {"timeout": settings.DB_REPLICA_CHECK_TIMEOUT}
+    return _create_engine(
+        settings.READ_DATABASE_URL,
+        "replica" if settings.POSTGRES_REPLICA_HOST else "read",
+        settings.DB_READ_POOL_SIZE,
+        settings.DB_READ_MAX_OVERFLOW,
+        execution_options={"postgresql_readonly": True},
+        **options,
+    )
+
+
+@cache
+def _primary_reader() -> AsyncEngine:
+    # Read-only view of the primary pool, used while the replica is down
+    return get_engine().execution_options(postgresql_readonly=True)
+
+
+@cache
+def _sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+class ReadRouter:
+    """
+    Picks the engine behind read-only sessions.
+
+    Reads go to the read engine. When a request cannot connect to a
+    configured replica, or a check finds it unreachable, they fail over to
+    the primary until a later check reaches the replica again. Each API
+    process runs the check every DB_REPLICA_CHECK_SECONDS (and on `/ready`),
+    since the routing state is per process.
+    """
+
+    def __init__(self):
+        self.failed_over = False
+
+    def engine(self) -> AsyncEngine:
+        return _primary_reader() if self.failed_over else get_read_engine()
+
+    def fail_over(self, error: BaseException) -> None:
+        if not self.failed_over:
+            logger.warning(f"Replica unreachable ({error!r}); serving reads from the primary.")
+            self.failed_over = True
+
+    async def session(self) -> AsyncSession:
+        """
+        A read-only session whose connection is already checked out.
+
+        Checkouts ping the connection, so a replica that went down since the
+        last check is noticed here: reads fail over to the primary at once
+        instead of failing until the next check.
+        """
+        session = _sessionmaker(self.engine())()
+        if self.failed_over or not get_settings().POSTGRES_REPLICA_HOST:
+            return session
+        try:
+            await session.connection()
+        except (OSError, TimeoutError, exc.DBAPIError) as e:
+            await session.close()
+            self.fail_over(e)
+            session = _sessionmaker(self.engine())()
+        return session
+
+    async def check(self) -> str:
+        """
+        Ping the read path and fail over (or back) as needed.
+
+        Returns:
+            "replica" or "primary", where reads are served from now on.
+
+        Raises:
+            Whatever the primary raises if it is unreachable as well.
+        """
+        settings = get_settings()
+        if not settings.POSTGRES_REPLICA_HOST:
+            await _ping(get_read_engine())
+            return "primary"
+
+        try:
+            await asyncio.wait_for(_ping(get_read_engine()), settings.DB_REPLICA_CHECK_TIMEOUT)
+        except Exception as e:
+            await _ping(get_engine())
+            self.fail_over(e)
+            return "primary"
+
+        if self.failed_over:
+            logger.info("Replica reachable again; serving reads from it.")
+            self.failed_over = False
+        return "replica"
+
+    async def run_checks(self, interval: float) -> None:
+        """Run `check` every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.warning("Read path check failed; primary unreachable.", exc_info=True)
+
+
+read_router = ReadRouter()
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Sessions on the primary engine."""
+    return _sessionmaker(get_engine())
+
+
+def get_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Read-only sessions on the replica, or on the primary while failed over."""
+    return _sessionmaker(read_router.engine())
+
+
+async def dispose_engines() -> None:
+    """Close the pools of the engines created so far."""
+    if get_read_engine.cache_info().currsize:
+        await get_read_engine().dispose()
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+
+
+def __getattr__(name: str):
+    # Backwards compatible `engine` and `AsyncSessionLocal`, built on first access
+    if name == "engine":
+        return get_engine()
+    if name == "AsyncSessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Base(DeclarativeBase):
@@ -22,5 +289,10 @@ class Base(DeclarativeBase):
 
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
+        yield session
+
+
+async def get_read_db():
+    async with await read_router.session() as session:
         yield session
@@ -3,22 +3,375 @@
 Provides Prometheus metrics for observability.
 """
 
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import socket
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING
 
-from fastapi import FastAPI
-from prometheus_client import Counter, Gauge
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, multiprocess, values
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.mmap_dict import MmapedDict
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from prometheus_fastapi_instrumentator import Instrumentator
+    from tenacity import RetryCallState
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set (`esios server --workers N`, or a daemon sharing the
+# directory with the API), every process writes its metrics to files there and /metrics
+# aggregates all of them. It must be set in the environment before this module is imported.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def process_identifier() -> str:
+    """Name of this process's metric files: containers sharing the directory can reuse pids."""
+    return f"{socket.gethostname().replace('_', '-')}-{os.getpid()}"
+
+
+if MULTIPROCESS:
+    values.ValueClass = values.MultiProcessValue(process_identifier)
+
+SERIES_LABELS = ["indicator_id", "zone_id"]
 
 ESIOS_LAST_SUCCESS_TIMESTAMP = Gauge(
-    "esios_last_success_timestamp", "Unix timestamp of last successful data ingestion", ["zone_id"]
+    "esios_last_success_timestamp",
+    "Unix timestamp of last successful data ingestion",
+    ["indicator_id", "zone_id"],
+    multiprocess_mode="max",
 )
 
 INGESTION_RECORDS_TOTAL = Counter(
     "esios_ingestion_records_total", "Total records ingested by status", ["status"]
 )
 
+INGESTION_DUPLICATES_TOTAL = Counter(
+    "esios_ingestion_duplicates_total",
+    "Fetched rows skipped because they were already stored",
+    SERIES_LABELS,
+)
+
+ESIOS_REQUEST_RETRIES_TOTAL = Counter(
+    "esios_request_retries_total", "ESIOS requests retried, by exception type", ["exception"]
+)
+
+INGESTION_FETCH_SECONDS = Histogram(
+    "esios_ingestion_fetch_seconds",
+    "ESIOS request latency, per attempt",
+    SERIES_LABELS,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+INGESTION_PAYLOAD_BYTES = Histogram(
+    "esios_ingestion_payload_bytes",
+    "Size of ESIOS response bodies",
+    SERIES_LABELS,
+    buckets=tuple(4**i for i in range(5, 14)),  # 1 KiB to 64 MiB
+)
+
+INGESTION_PARSE_SECONDS = Histogram(
+    "esios_ingestion_parse_seconds",
+    "Time to decode and validate one ESIOS response",
+    SERIES_LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+INGESTION_WRITE_SECONDS = Histogram(
+    "esios_ingestion_write_seconds",
+    "Time to upsert one window of rows and commit",
+    SERIES_LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+INGESTION_BATCH_ROWS = Histogram(
+    "esios_ingestion_batch_rows",
+    "Rows written per ingestion window",
+    SERIES_LABELS,
+    buckets=(10, 100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "esios_db_query_seconds",
+    "Database statement latency, by normalized statement name",
+    ["statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+DB_SLOW_QUERIES_TOTAL = Counter(
+    "esios_db_slow_queries_total",
+    "Statements slower than DB_SLOW_QUERY_SECONDS",
+    ["statement"],
+)
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "esios_db_pool_wait_seconds",
+    "Time to get a connection from the pool, including connecting and pre-ping",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+
+DB_POOL_TIMEOUTS_TOTAL = Counter(
+    "esios_db_pool_timeouts_total", "Pool checkouts that gave up after pool_timeout", ["pool"]
+)
 
-def setup_instrumentator(app: FastAPI) -> Instrumentator:
+
+class PoolCollector:
+    """Reads connection pool usage of the registered engines at scrape time."""
+
+    def __init__(self):
+        self.pools: dict[str, Callable[[], object]] = {}
+
+    def collect(self):
+        checked_out = GaugeMetricFamily(
+            "esios_db_pool_checked_out", "Connections currently checked out", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "esios_db_pool_overflow",
+            "Connections open beyond pool_size (negative until the pool has filled)",
+            labels=["pool"],
+        )
+        size = GaugeMetricFamily("esios_db_pool_size", "Configured pool_size", labels=["pool"])
+
+        for name, get_pool in self.pools.items():
+            pool = get_pool()
+            if hasattr(pool, "checkedout"):
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], pool.overflow())
+                size.add_metric([name], pool.size())
+
+        yield from (checked_out, overflow, size)
+
+
+DB_POOL_COLLECTOR = PoolCollector()
+
+if MULTIPROCESS:
+    # Collectors only see their own process: publish pool usage as live gauges instead
+    DB_POOL_CHECKED_OUT = Gauge(
+        "esios_db_pool_checked_out",
+        "Connections currently checked out",
+        ["pool"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_OVERFLOW = Gauge(
+        "esios_db_pool_overflow",
+        "Connections open beyond pool_size (negative until the pool has filled)",
+        ["pool"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_SIZE = Gauge(
+        "esios_db_pool_size", "Configured pool_size", ["pool"], multiprocess_mode="livesum"
+    )
+else:
+    REGISTRY.register(DB_POOL_COLLECTOR)
+
+
+def observe_pool(name: str, pool) -> None:
+    """Record the usage of `pool` after a checkout or checkin (multiprocess mode only)."""
+    if MULTIPROCESS:
+        DB_POOL_CHECKED_OUT.labels(pool=name).set(pool.checkedout())
+        DB_POOL_OVERFLOW.labels(pool=name).set(pool.overflow())
+        DB_POOL_SIZE.labels(pool=name).set(pool.size())
+
+
+API_CACHE_HITS_TOTAL = Counter(
+    "esios_api_cache_hits_total", "Read API responses served from the cache", ["endpoint"]
+)
+
+API_CACHE_MISSES_TOTAL = Counter(
+    "esios_api_cache_misses_total", "Read API responses built from the database", ["endpoint"]
+)
+
+HOT_CACHE_HITS_TOTAL = Counter(
+    "esios_hot_cache_hits_total", "Recent /prices reads answered from the in-memory series"
+)
+
+HOT_CACHE_MISSES_TOTAL = Counter(
+    "esios_hot_cache_misses_total",
+    "Recent /prices reads sent to Postgres (range not covered, or cache reloading)",
+)
+
+HOT_CACHE_ROWS = Gauge(
+    "esios_hot_cache_rows",
+    "Prices held in the in-memory series cache",
+    multiprocess_mode="livemax",
+)
+
+STREAM_SUBSCRIBERS = Gauge(
+    "esios_stream_subscribers", "Clients connected to /prices/stream", multiprocess_mode="livesum"
+)
+
+STREAM_EVENTS_TOTAL = Counter(
+    "esios_stream_events_total", "Events published to /prices/stream subscribers", ["event"]
+)
+
+STREAM_OVERFLOWS_TOTAL = Counter(
+    "esios_stream_overflows_total", "/prices/stream subscribers dropped for falling behind"
+)
+
+
+def remove_dead_process_files(path: str) -> int:
+    """
+    Delete live gauge files left in `path` by processes of this host that died
+    without cleaning up (killed workers, crashed servers). Counters and
+    histograms of finished processes are kept, so totals never go backwards.
+
+    Returns:
+        Number of files removed.
+    """
+    host = socket.gethostname().replace("_", "-")
+    removed = 0
+    for file in glob.glob(os.path.join(path, "gauge_live*_*.db")):
+        identifier = os.path.basename(file)[: -len(".db")].split("_", 2)[2]
+        file_host, _, pid = identifier.rpartition("-")
+        if file_host != host or not pid.isdigit():
+            continue
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            os.remove(file)
+            removed += 1
+        except PermissionError:
+            pass  # Alive, owned by another user
+    return removed
+
+
+# How values of exited processes are folded into one file, per file type. "all"
+# gauges are labelled by pid and "live" ones are dropped, so neither is compacted.
+_COMPACTED_TYPES = {
+    "counter": "sum",
+    "histogram": "sum",
+    "summary": "sum",
+    "gauge_sum": "sum",
+    "gauge_max": "max",
+    "gauge_min": "min",
+    "gauge_mostrecent": "mostrecent",
+}
+
+
+def _fold_into_archive(path: str, typ: str, files: list[str]) -> None:
+    """Merge `files` of one type into `<type>_<host>-archive.db` and delete them."""
+    mode = _COMPACTED_TYPES[typ]
+    host = socket.gethostname().replace("_", "-")
+    archive = os.path.join(path, f"{typ}_{host}-archive.db")
+    merged: dict[str, tuple[float, float]] = {}
+    for file in ([archive] if os.path.exists(archive) else []) + files:
+        for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(file):
+            if key not in merged:
+                merged[key] = (value, timestamp)
+                continue
+            old_value, old_timestamp = merged[key]
+            if mode == "sum":
+                merged[key] = (old_value + value, max(old_timestamp, timestamp))
+            elif mode == "max":
+                merged[key] = max(merged[key], (value, timestamp))
+            elif mode == "min":
+                merged[key] = min(merged[key], (value, timestamp))
+            elif timestamp > old_timestamp:
+                merged[key] = (value, timestamp)
+
+    # Written aside and swapped in, so a scrape never sees half an archive
+    staging = os.path.join(path, f".{typ}_{host}-archive.tmp")
+    if os.path.exists(staging):
+        os.remove(staging)
+    staged = MmapedDict(staging)
+    for key, (value, timestamp) in merged.items():
+        staged.write_value(key, value, timestamp)
+    staged.close()
+    os.replace(staging, archive)
+    for file in files:
+        os.remove(file)
+
+
+def compact_dead_process_files(path: str) -> int:
+    """
+    Fold counters, histograms and aggregated gauges of exited processes of this
+    host into one `<type>_<host>-archive.db` file per type, so the directory
+    (and the cost of every scrape) stays bounded by the live processes instead
+    of growing with each restart. Totals are unchanged.
+
+    Returns:
+        Number of files folded in.
+    """
+    host = socket.gethostname().replace("_", "-")
+    compacted = 0
+    for typ in _COMPACTED_TYPES:
+        dead = []
+        for file in glob.glob(os.path.join(path, f"{typ}_{host}-*.db")):
+            identifier = os.path.basename(file)[len(typ) + 1 : -len(".db")]
+            file_host, _, pid = identifier.rpartition("-")
+            if file_host != host or not pid.isdigit():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                dead.append(file)
+            except PermissionError:
+                pass
+        if dead:
+            _fold_into_archive(path, typ, dead)
+            compacted += len(dead)
+    return compacted
+
+
+@contextmanager
+def _cleanup_lock(path: str) -> Iterator[None]:
+    """Processes sharing the directory take turns rewriting archives."""
+    with open(os.path.join(path, ".cleanup.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def clean_multiprocess_dir() -> None:
+    """
+    Remove what exited processes of this host left in PROMETHEUS_MULTIPROC_DIR.
+    Called by every API worker and the daemon at startup.
+    """
+    if not MULTIPROCESS:
+        return
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    with _cleanup_lock(path):
+        removed = remove_dead_process_files(path)
+        compacted = compact_dead_process_files(path)
+    if removed or compacted:
+        logger.info(
+            f"Metrics of exited processes in {path}: {removed} gauge files removed, "
+            f"{compacted} files compacted"
+        )
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this process's live gauges (pool usage, subscribers) from the aggregate
+    and fold its counters and histograms into the host's archive files, so
+    short CLI runs (`esios ingest` from cron) report without adding files.
+    """
+    if not MULTIPROCESS:
+        return
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    identifier = process_identifier()
+    multiprocess.mark_process_dead(identifier, path)
+    with _cleanup_lock(path):
+        for typ in _COMPACTED_TYPES:
+            own = os.path.join(path, f"{typ}_{identifier}.db")
+            if os.path.exists(own):
+                _fold_into_archive(path, typ, [own])
+
+
+if MULTIPROCESS:
+    atexit.register(mark_process_dead)
+
+
+def setup_instrumentator(app: "FastAPI") -> "Instrumentator":
     """Configure prometheus-fastapi-instrumentator for HTTP metrics.
 
     Provides automatic instrumentation for:
@@ -26,6 +379,8 @@ def setup_instrumentator(app: FastAPI) -> Instrumentator:
     - http_requests_total
     - http_requests_in_progress
     """
+    from prometheus_fastapi_instrumentator import Instrumentator
+
     instrumentator = Instrumentator(
         should_group_status_codes=False,
         should_ignore_untemplated=True,
@@ -40,10 +395,108 @@ def setup_instrumentator(app: FastAPI) -> Instrumentator:
     return instrumentator
 
 
-def update_last_success_timestamp(zone_id: str = "8741") -> None:
-    """Update the last successful ingestion timestamp.
+def update_last_success_timestamp(indicator_id: str, zone_id: str) -> None:
+    """Update the last successful ingestion timestamp of one series.
 
     Args:
-        zone_id: Geographic zone identifier (default: 8741 for Spain)
+        indicator_id: ESIOS indicator identifier (e.g. 1001 for PVPC)
+        zone_id: Geographic zone identifier (e.g. 8741 for the Peninsula)
+    """
+    ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id=indicator_id, zone_id=zone_id).set(time.time())
+
+
+@dataclass
+class IngestionRunStats:
+    """Totals of one ingestion run, logged as a single summary line when it ends."""
+
+    kind: str
+    status: str = "ok"
+    windows: int = 0
+    requests: int = 0
+    retries: int = 0
+    payload_bytes: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def summary(self) -> dict:
+        summary = asdict(self)
+        del summary["started"]
+        summary["total_seconds"] = time.perf_counter() - self.started
+        return {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in summary.items()
+        }
+
+
+_current_run: ContextVar[IngestionRunStats | None] = ContextVar("ingestion_run", default=None)
+
+
+@contextmanager
+def track_ingestion_run(kind: str = "ingest") -> Iterator[IngestionRunStats]:
+    """Collect stage timings of the run in this context and log their summary at the end.
+
+    Tasks started inside the block share the same stats, so concurrent windows
+    add up into one summary.
     """
-    ESIOS_LAST_SUCCESS_TIMESTAMP.labels(zone_id=zone_id).set(time.time())
+    stats = IngestionRunStats(kind)
+    token = _current_run.set(stats)
+    try:
+        yield stats
+    except BaseException:
+        stats.status = "failed"
+        raise
+    finally:
+        _current_run.reset(token)
+        logger.info(f"Ingestion summary {json.dumps(stats.summary())}")
+
+
+def _series_labels(indicator_id: int, zone_id: int) -> dict[str, str]:
+    return {"indicator_id": str(indicator_id), "zone_id": str(zone_id)}
+
+
+def observe_fetch(indicator_id: int, zone_id: int, seconds: float, payload_bytes: int) -> None:
+    labels = _series_labels(indicator_id, zone_id)
+    INGESTION_FETCH_SECONDS.labels(**labels).observe(seconds)
+    INGESTION_PAYLOAD_BYTES.labels(**labels).observe(payload_bytes)
+
+    if (stats := _current_run.get()) is not None:
+        stats.requests += 1
+        stats.fetch_seconds += seconds
+        stats.payload_bytes += payload_bytes
+
+
+def observe_parse(indicator_id: int, zone_id: int, seconds: float) -> None:
+    INGESTION_PARSE_SECONDS.labels(**_series_labels(indicator_id, zone_id)).observe(seconds)
+
+    if (stats := _current_run.get()) is not None:
+        stats.parse_seconds += seconds
+
+
+def observe_write(
+    indicator_id: int, zone_id: int, seconds: float, inserted: int, skipped: int
+) -> None:
+    labels = _series_labels(indicator_id, zone_id)
+    INGESTION_WRITE_SECONDS.labels(**labels).observe(seconds)
+    INGESTION_BATCH_ROWS.labels(**labels).observe(inserted + skipped)
+    INGESTION_DUPLICATES_TOTAL.labels(**labels).inc(skipped)
+    INGESTION_RECORDS_TOTAL.labels(status="inserted").inc(inserted)
+    INGESTION_RECORDS_TOTAL.labels(status="skipped").inc(skipped)
+
+    if (stats := _current_run.get()) is not None:
+        stats.windows += 1
+        stats.write_seconds += seconds
+        stats.inserted += inserted
+        stats.skipped += skipped
+
+
+def count_retry(retry_state: "RetryCallState") -> None:
+    """tenacity `before_sleep` hook counting retried ESIOS requests."""
+    exception = retry_state.outcome.exception() if retry_state.outcome else None
+    ESIOS_REQUEST_RETRIES_TOTAL.labels(exception=type(exception).__name__).inc()
+
+    if (stats := _current_run.get()) is not None:
+        stats.retries += 1
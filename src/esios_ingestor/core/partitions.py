@@ -0,0 +1,174 @@
+"""Monthly range partitions of electricity_prices.
+
+Partitions are named `electricity_prices_pYYYYMM` and cover one UTC month.
+They are created on demand before writes (and a few months ahead), and old
+ones are detached or dropped by the retention policy.
+"""
+
+import logging
+import re
+from collections.abc import Iterable
+from datetime import UTC, date, datetime
+from typing import Literal, NamedTuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.version import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = ElectricityPrice.__tablename__
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+# pg_advisory_xact_lock key serializing partition DDL across processes
+PARTITION_LOCK_ID = 0x65736970
+
+# Months known to have a partition in this process, so writes skip the catalog lookup.
+# Only trusted from the current month on: retention (possibly in another process)
+# retires past months, so those are always checked against the catalog.
+_known_months: set[date] = set()
+
+
+class Partition(NamedTuple):
+    name: str
+    month: date
+    total_bytes: int
+
+
+def month_start(value: datetime) -> date:
+    value = value.astimezone(UTC) if value.tzinfo else value
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+async def list_partitions(conn: AsyncConnection) -> list[Partition]:
+    """Monthly partitions currently attached to the price table, oldest first."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname, pg_total_relation_size(c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+
+    partitions = []
+    for name, total_bytes in result.all():
+        match = PARTITION_NAME.match(name)
+        if match:
+            month = date(int(match[1]), int(match[2]), 1)
+            partitions.append(Partition(name, month, total_bytes))
+
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+async def ensure_partitions(bind: AsyncEngine, months: Iterable[date]) -> None:
+    """
+    Create the partitions for `months` that do not exist yet.
+
+    Each partition is created standalone and then attached, which only takes a
+    SHARE UPDATE EXCLUSIVE lock on the parent, so concurrent reads and writes
+    (including an open transaction of the caller) are not blocked.
+    """
+    current = month_start(datetime.now(UTC))
+    missing = {month for month in months if month < current or month not in _known_months}
+    if not missing:
+        return
+
+    async with bind.begin() as conn:
+        existing = {partition.month for partition in await list_partitions(conn)}
+        if missing - existing:
+            # Only creators queue on the lock; re-read once holding it
+            await conn.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_ID)))
+            existing = {partition.month for partition in await list_partitions(conn)}
+
+        for month in sorted(missing - existing):
+            name = partition_name(month)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {name} (LIKE {PARENT_TABLE} "
+                    "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING INDEXES)"
+                )
+            )
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+                )
+            )
+            logger.info(f"Created partition {name}")
+
+    _known_months.update(month for month in missing if month >= current)
+
+
+async def ensure_future_partitions(
+    bind: AsyncEngine, months_ahead: int, now: datetime | None = None
+) -> None:
+    """Make sure the current month and the next `months_ahead` months have partitions."""
+    current = month_start(now or datetime.now(UTC))
+    await ensure_partitions(bind, [add_months(current, i) for i in range(months_ahead + 1)])
+
+
+async def apply_retention(
+    bind: AsyncEngine,
+    keep_months: int,
+    action: Literal["detach", "drop"],
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> list[str]:
+    """
+    Retire partitions older than the last `keep_months` months (current included).
+
+    `detach` keeps the data as a standalone `<partition>_archived_<timestamp>`
+    table; `drop` deletes it. Partitions are detached CONCURRENTLY, so ingestion
+    and reads keep running. Rollups are left untouched and keep serving stats
+    for retired months. The data version is bumped, so cached reads expire.
+
+    Returns:
+        Names of the retired partitions.
+    """
+    now = now or datetime.now(UTC)
+    cutoff = add_months(month_start(now), -(keep_months - 1))
+
+    async with bind.connect() as conn:
+        expired = [p for p in await list_partitions(conn) if p.month < cutoff]
+
+    if dry_run or not expired:
+        return [partition.name for partition in expired]
+
+    async with bind.connect() as conn:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        for partition in expired:
+            await conn.execute(
+                text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name} CONCURRENTLY")
+            )
+            _known_months.discard(partition.month)
+
+            if action == "drop":
+                await conn.execute(text(f"DROP TABLE {partition.name}"))
+                logger.info(f"Dropped partition {partition.name}")
+            else:
+                archived = f"{partition.name}_archived_{now:%Y%m%d%H%M%S}"
+                await conn.execute(text(f"ALTER TABLE {partition.name} RENAME TO {archived}"))
+                logger.info(f"Detached partition {partition.name} as {archived}")
+
+        # Read API caches are keyed on the data version; they must stop serving retired rows
+        await bump_data_version(conn)
+
+    return [partition.name for partition in expired]
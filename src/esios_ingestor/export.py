@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.models.price import ElectricityPrice
+
+EXPORT_COLUMNS = ("timestamp", "price", "zone_id", "indicator_id")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+class ExportFormatError(ValueError):
+    """Unknown export format, or a columnar format without pyarrow installed."""
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in MEDIA_TYPES:
+        raise ExportFormatError(f"Unknown export format '{fmt}' (use {', '.join(MEDIA_TYPES)})")
+
+    if fmt in COLUMNAR_FORMATS:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportFormatError(f"{fmt} export requires the 'pyarrow' package") from None
+
+
+async def iter_price_batches(
+    session: AsyncSession,
+    indicator_id: int,
+    zone_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    batch_size: int = 10000,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Stream prices ordered by (zone_id, timestamp) from a server-side cursor.
+
+    Only `batch_size` rows are held in memory at a time, whatever the range.
+    """
+    query = (
+        select(*(getattr(ElectricityPrice, column) for column in EXPORT_COLUMNS))
+        .where(ElectricityPrice.indicator_id == indicator_id)
+        .order_by(ElectricityPrice.zone_id, ElectricityPrice.timestamp)
+        .execution_options(yield_per=batch_size)
+    )
+
+    if zone_id is not None:
+        query = query.where(ElectricityPrice.zone_id == zone_id)
+    if start_date:
+        query = query.where(ElectricityPrice.timestamp >= start_date)
+    if end_date:
+        query = query.where(ElectricityPrice.timestamp <= end_date)
+
+    result = await session.stream(query)
+    async for batch in result.partitions():
+        yield batch
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last `drain()`."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _encode_ndjson(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(
+                {
+                    "timestamp": timestamp.isoformat(),
+                    "price": price,
+                    "zone_id": zone_id,
+                    "indicator_id": indicator_id,
+                }
+            )
+            + "\n"
+            for timestamp, price, zone_id, indicator_id in batch
+        ).encode()
+
+
+async def _encode_csv(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+
+    async for batch in batches:
+        writer.writerows(
+            (timestamp.isoformat(), price, zone_id, indicator_id)
+            for timestamp, price, zone_id, indicator_id in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _encode_columnar(batches: AsyncIterator[Sequence[Row]], fmt: str) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("price", pa.float64()),
+            ("zone_id", pa.int32()),
+            ("indicator_id", pa.int32()),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+
+    try:
+        async for batch in batches:
+            # One row group / record batch per database batch
+            columns = dict(zip(EXPORT_COLUMNS, zip(*batch, strict=True), strict=True))
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def encode_batches(batches: AsyncIterator[Sequence[Row]], fmt: str) -> AsyncIterator[bytes]:
+    """Encode row batches into `fmt` chunk by chunk; call `check_format(fmt)` first."""
+    if fmt == "ndjson":
+        return _encode_ndjson(batches)
+    if fmt == "csv":
+        return _encode_csv(batches)
+    return _encode_columnar(batches, fmt)
@@ -0,0 +1,216 @@
+"""On-disk archive of raw ESIOS responses.
+
+Bodies are stored gzipped under their SHA-256 (`objects/ab/cdef....json.gz`),
+so identical responses are kept once. An index file per (indicator, geo,
+window) points at the body fetched last for that window:
+
+    index/<indicator>/<geo>/<start>_<end>.json
+
+The client archives whole UTC calendar months (`month_blocks`), whatever
+window ingestion asked for, so every run reads and refreshes the same keys.
+
+Writes go through a temporary file and `os.replace`, so concurrent writers and
+crashes never leave a partial object or index entry behind.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from esios_ingestor.core.metrics import observe_parse
+from esios_ingestor.schemas import PriceRow, parse_price_rows
+
+_KEY_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+class ArchiveEntry(NamedTuple):
+    indicator_id: int
+    geo_id: int
+    start: datetime
+    end: datetime
+    digest: str
+    fetched_at: datetime
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def month_blocks(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """
+    UTC calendar months overlapping [start, end], as archive windows.
+
+    Each runs from the first instant of its month to one second before the
+    next, like the windows of `iter_windows`.
+    """
+    start, end = _utc(start), _utc(end)
+    block = datetime(start.year, start.month, 1, tzinfo=UTC)
+    blocks = []
+    while block <= end:
+        following = datetime(block.year + block.month // 12, block.month % 12 + 1, 1, tzinfo=UTC)
+        blocks.append((block, following - timedelta(seconds=1)))
+        block = following
+    return blocks
+
+
+def rows_between(rows: list[PriceRow], start: datetime, end: datetime) -> list[PriceRow]:
+    start, end = _utc(start), _utc(end)
+    return [row for row in rows if start <= row[0] <= end]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class ResponseArchive:
+    """
+    Raw response store keyed by (indicator, geo, window).
+
+    A window is settled when its archived body was fetched at least `settle`
+    after the window ended; ESIOS no longer revises it, so it never needs to be
+    fetched again.
+    """
+
+    def __init__(self, root: Path | str, settle: timedelta = timedelta(days=3)):
+        self.root = Path(root)
+        self.settle = settle
+
+    def _index_path(self, indicator_id: int, geo_id: int, start: datetime, end: datetime) -> Path:
+        name = f"{_utc(start):{_KEY_FORMAT}}_{_utc(end):{_KEY_FORMAT}}.json"
+        return self.root / "index" / str(indicator_id) / str(geo_id) / name
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest[2:]}.json.gz"
+
+    def _load_entry(self, path: Path) -> ArchiveEntry:
+        data = json.loads(path.read_bytes())
+        return ArchiveEntry(
+            data["indicator_id"],
+            data["geo_id"],
+            datetime.fromisoformat(data["start"]),
+            datetime.fromisoformat(data["end"]),
+            data["sha256"],
+            datetime.fromisoformat(data["fetched_at"]),
+        )
+
+    def lookup(
+        self, indicator_id: int, geo_id: int, start: datetime, end: datetime
+    ) -> ArchiveEntry | None:
+        path = self._index_path(indicator_id, geo_id, start, end)
+        try:
+            return self._load_entry(path)
+        except FileNotFoundError:
+            return None
+
+    def is_settled(self, entry: ArchiveEntry) -> bool:
+        return entry.fetched_at - entry.end >= self.settle
+
+    def read(self, entry: ArchiveEntry) -> bytes:
+        return gzip.decompress(self._object_path(entry.digest).read_bytes())
+
+    def put(
+        self,
+        indicator_id: int,
+        geo_id: int,
+        start: datetime,
+        end: datetime,
+        body: bytes,
+        fetched_at: datetime | None = None,
+    ) -> ArchiveEntry:
+        """Store `body` as the latest response for the window."""
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            _write_atomic(object_path, gzip.compress(body, compresslevel=6))
+
+        entry = ArchiveEntry(
+            indicator_id, geo_id, _utc(start), _utc(end), digest, fetched_at or datetime.now(UTC)
+        )
+        index = {
+            "indicator_id": indicator_id,
+            "geo_id": geo_id,
+            "start": entry.start.isoformat(),
+            "end": entry.end.isoformat(),
+            "sha256": digest,
+            "fetched_at": entry.fetched_at.isoformat(),
+        }
+        _write_atomic(
+            self._index_path(indicator_id, geo_id, start, end), json.dumps(index).encode()
+        )
+        return entry
+
+    def entries(
+        self,
+        indicator_id: int | None = None,
+        geo_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Iterator[ArchiveEntry]:
+        """Archived windows overlapping [start, end], ordered by series and window start."""
+        pattern = f"{indicator_id if indicator_id is not None else '*'}/"
+        pattern += f"{geo_id if geo_id is not None else '*'}/*.json"
+        paths = sorted(
+            (self.root / "index").glob(pattern),
+            key=lambda path: (int(path.parent.parent.name), int(path.parent.name), path.name),
+        )
+
+        for path in paths:
+            entry = self._load_entry(path)
+            if start is not None and entry.end < _utc(start):
+                continue
+            if end is not None and entry.start > _utc(end):
+                continue
+            yield entry
+
+
+class ArchiveReader:
+    """
+    Offline stand-in for EsiosClient that serves rows from the archive only.
+
+    Lets `esios replay` reuse the ingestion pipeline (writes, watermarks,
+    rollups) without network access.
+    """
+
+    def __init__(self, archive: ResponseArchive):
+        self.archive = archive
+
+    async def fetch_price_rows(
+        self, indicator_id: int, geo_id: int, start_date: datetime, end_date: datetime
+    ) -> list[PriceRow]:
+        """Rows of an archived window, or of [start_date, end_date] from its archived months."""
+        entry = self.archive.lookup(indicator_id, geo_id, start_date, end_date)
+        if entry is not None:
+            return await self._read_rows(entry)
+
+        rows = []
+        for block_start, block_end in month_blocks(start_date, end_date):
+            entry = self.archive.lookup(indicator_id, geo_id, block_start, block_end)
+            if entry is None:
+                raise LookupError(
+                    f"No archived response for {indicator_id}/{geo_id} {block_start:%Y-%m}"
+                )
+            rows += await self._read_rows(entry)
+        return rows_between(rows, start_date, end_date)
+
+    async def _read_rows(self, entry: ArchiveEntry) -> list[PriceRow]:
+        body = await asyncio.to_thread(self.archive.read, entry)
+        started = time.perf_counter()
+        rows = parse_price_rows(body)
+        observe_parse(entry.indicator_id, entry.geo_id, time.perf_counter() - started)
+        return rows
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections.abc import Iterator
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import get_engine, get_sessionmaker
+from esios_ingestor.core.metrics import track_ingestion_run
+from esios_ingestor.core.partitions import ensure_future_partitions
+from esios_ingestor.ingestion.client import EsiosClient
+from esios_ingestor.ingestion.service import Window, ingest_windows, iter_windows
+from esios_ingestor.models.backfill import BackfillJob, BackfillWindow
+from esios_ingestor.schemas import Series
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock(BACKFILL_LOCK_ID, job_id) is held by the process running a job
+BACKFILL_LOCK_ID = 0x62666C6C
+
+
+class BackfillError(RuntimeError):
+    """Unknown job, or a job that cannot be run right now."""
+
+
+@dataclass
+class BackfillProgress:
+    """Completed windows of a job, and the pace since its last (re)start."""
+
+    job_id: int
+    status: str
+    total_windows: int
+    done_windows: int
+    rows: int  # Inserted plus skipped, over the whole job
+    run_windows: int = 0  # Completed since the last (re)start...
+    run_rows: int = 0
+    run_seconds: float = 0.0  # ...and the time that took
+
+    @property
+    def fraction(self) -> float:
+        return self.done_windows / self.total_windows if self.total_windows else 1.0
+
+    @property
+    def rows_per_second(self) -> float | None:
+        return self.run_rows / self.run_seconds if self.run_seconds > 0 else None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Time left at the pace of the current run, or None before its first window."""
+        if self.done_windows >= self.total_windows:
+            return 0.0
+        if not self.run_windows:
+            return None
+        return (self.total_windows - self.done_windows) * self.run_seconds / self.run_windows
+
+    def summary(self) -> str:
+        rate, eta = self.rows_per_second, self.eta_seconds
+        return (
+            f"Backfill {self.job_id}: {self.done_windows}/{self.total_windows} windows "
+            f"({self.fraction:.0%}), {self.rows:,} rows, "
+            f"{f'{rate:,.0f}' if rate is not None else '-'} rows/s, ETA {format_duration(eta)}"
+        )
+
+
+def format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    seconds = round(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+def job_windows(job: BackfillJob) -> Iterator[Window]:
+    """Every window of `job`, interleaved per window across series like `esios ingest`."""
+    series_list = [Series(indicator_id, geo_id) for indicator_id, geo_id in job.series]
+    return (
+        Window(series, window_start, window_end)
+        for window_start, window_end in iter_windows(
+            _utc(job.start_date), _utc(job.end_date), timedelta(days=job.window_days)
+        )
+        for series in series_list
+    )
+
+
+async def create_job(
+    start_date: datetime, end_date: datetime, window_days: int, series: list[Series]
+) -> BackfillJob:
+    job = BackfillJob(
+        status="pending",
+        start_date=_utc(start_date),
+        end_date=_utc(end_date),
+        window_days=window_days,
+        series=[list(s) for s in series],
+        total_windows=0,
+    )
+    job.total_windows = sum(1 for _ in job_windows(job))
+
+    async with get_sessionmaker()() as session:
+        session.add(job)
+        await session.commit()
+    logger.info(
+        f"Backfill {job.id} created: {job.start_date:%Y-%m-%d} - {job.end_date:%Y-%m-%d}, "
+        f"{len(series)} series, {job.total_windows} windows."
+    )
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int) -> BackfillJob:
+    job = await session.get(BackfillJob, job_id)
+    if job is None:
+        raise BackfillError(f"Backfill job {job_id} does not exist")
+    return job
+
+
+async def list_jobs(session: AsyncSession, limit: int = 10) -> list[BackfillJob]:
+    result = await session.execute(select(BackfillJob).order_by(BackfillJob.id.desc()).limit(limit))
+    return list(result.scalars())
+
+
+async def job_progress(session: AsyncSession, job: BackfillJob) -> BackfillProgress:
+    rows = BackfillWindow.inserted + BackfillWindow.skipped
+    done_windows, done_rows = (
+        await session.execute(
+            select(func.count(), func.coalesce(func.sum(rows), 0)).where(
+                BackfillWindow.job_id == job.id
+            )
+        )
+    ).one()
+    progress = BackfillProgress(job.id, job.status, job.total_windows, done_windows, done_rows)
+
+    if job.started_at is not None:
+        run_windows, run_rows, last = (
+            await session.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(rows), 0),
+                    func.max(BackfillWindow.completed_at),
+                ).where(
+                    BackfillWindow.job_id == job.id,
+                    BackfillWindow.completed_at >= job.started_at,
+                )
+            )
+        ).one()
+        until = job.finished_at or (datetime.now(UTC) if job.status == "running" else last)
+        progress.run_windows, progress.run_rows = run_windows, run_rows
+        if until is not None:
+            progress.run_seconds = max(0.0, (until - job.started_at).total_seconds())
+    return progress
+
+
+async def job_is_active(session: AsyncSession, job_id: int) -> bool:
+    """Whether some process holds the job's lock, i.e. a "running" job is not a dead one."""
+    return await session.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' "
+            "AND classid = :lock_id AND objid = :job_id AND objsubid = 2)"
+        ),
+        {"lock_id": BACKFILL_LOCK_ID, "job_id": job_id},
+    )
+
+
+async def cancel_job(job_id: int) -> BackfillJob:
+    """
+    Mark a job cancelled. A process running it stops taking new windows
+    within BACKFILL_PROGRESS_SECONDS; windows already committed stay.
+    """
+    async with get_sessionmaker()() as session:
+        job = await get_job(session, job_id)
+        if job.status == "succeeded":
+            raise BackfillError(f"Backfill job {job_id} already succeeded")
+        job.status = "cancelled"
+        job.finished_at = func.now()
+        await session.commit()
+        await session.refresh(job)
+    return job
+
+
+async def _set_status(job_id: int, status: str, error: str | None = None) -> None:
+    async with get_sessionmaker()() as session:
+        await session.execute(
+            update(BackfillJob)
+            .where(BackfillJob.id == job_id, BackfillJob.status == "running")
+            .values(status=status, error=error, finished_at=func.now())
+        )
+        await session.commit()
+
+
+async def run_job(
+    job_id: int,
+    concurrency: int | None = None,
+    client: EsiosClient | None = None,
+    progress_interval: float | None = None,
+) -> BackfillProgress:
+    """
+    Run (or resume) a backfill job until all of its windows are stored.
+
+    Windows recorded in `backfill_windows` are skipped, so a job picks up
+    after the last committed window whatever stopped it. Each window is
+    recorded in the same transaction as its prices. A progress line with
+    rows/s and ETA is logged every `progress_interval` seconds, which is also
+    how often the job is checked for cancellation. Only one process can run
+    a job at a time (Postgres advisory lock).
+
+    Raises:
+        BackfillError: The job does not exist, already succeeded or is running elsewhere.
+    """
+    concurrency = concurrency or settings.INGESTION_CONCURRENCY
+    progress_interval = progress_interval or settings.BACKFILL_PROGRESS_SECONDS
+
+    async with get_engine().connect() as lock_conn:
+        locked = await lock_conn.scalar(select(func.pg_try_advisory_lock(BACKFILL_LOCK_ID, job_id)))
+        await lock_conn.commit()
+        if not locked:
+            raise BackfillError(f"Backfill job {job_id} is being run by another process")
+
+        try:
+            async with get_sessionmaker()() as session:
+                job = await get_job(session, job_id)
+                if job.status == "succeeded":
+                    raise BackfillError(f"Backfill job {job_id} already succeeded")
+
+                result = await session.execute(
+                    select(
+                        BackfillWindow.indicator_id, BackfillWindow.zone_id, BackfillWindow.start
+                    ).where(BackfillWindow.job_id == job_id)
+                )
+                completed = {tuple(row) for row in result}
+
+                job.status = "running"
+                job.replica = f"{socket.gethostname()}:{os.getpid()}"
+                job.error = None
+                job.started_at = func.now()
+                job.finished_at = None
+                await session.commit()
+                await session.refresh(job)
+
+            if completed:
+                logger.info(f"Resuming backfill {job_id}: {len(completed)} windows already stored.")
+            return await _run_windows(job, completed, concurrency, client, progress_interval)
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(BACKFILL_LOCK_ID, job_id)))
+            await lock_conn.commit()
+
+
+async def _run_windows(
+    job: BackfillJob,
+    completed: set[tuple],
+    concurrency: int,
+    client: EsiosClient | None,
+    progress_interval: float,
+) -> BackfillProgress:
+    cancelled = asyncio.Event()
+
+    def remaining() -> Iterator[Window]:
+        for window in job_windows(job):
+            if cancelled.is_set():
+                return
+            if (window.series.indicator_id, window.series.geo_id, window.start) not in completed:
+                yield window
+
+    async def checkpoint(session: AsyncSession, window: Window, inserted: int, skipped: int):
+        session.add(
+            BackfillWindow(
+                job_id=job.id,
+                indicator_id=window.series.indicator_id,
+                zone_id=window.series.geo_id,
+                start=window.start,
+                end=window.end,
+                inserted=inserted,
+                skipped=skipped,
+            )
+        )
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            async with get_sessionmaker()() as session:
+                current = await get_job(session, job.id)
+                logger.info((await job_progress(session, current)).summary())
+            if current.status == "cancelled":
+                logger.info(f"Backfill {job.id} cancelled; finishing the windows in flight.")
+                cancelled.set()
+                return
+
+    started = time.perf_counter()
+    with track_ingestion_run("backfill"):
+        try:
+            await ensure_future_partitions(get_engine(), settings.PARTITION_PREMAKE_MONTHS)
+            async with AsyncExitStack() as stack:
+                if client is None:
+                    client = await stack.enter_async_context(EsiosClient())
+                reporter = asyncio.create_task(report())
+                try:
+                    await ingest_windows(client, remaining(), concurrency, checkpoint)
+                finally:
+                    reporter.cancel()
+                    await asyncio.gather(reporter, return_exceptions=True)
+        except BaseException as e:
+            await _set_status(job.id, "failed", repr(e))
+            raise
+
+    if not cancelled.is_set():
+        await _set_status(job.id, "succeeded")
+
+    async with get_sessionmaker()() as session:
+        progress = await job_progress(session, await get_job(session, job.id))
+    logger.info(f"{progress.summary()} ({progress.status}, {time.perf_counter() - started:.1f}s)")
+    return progress
@@ -1,25 +1,88 @@
+import asyncio
 import logging
-from datetime import datetime
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
 
 import httpx
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from esios_ingestor.core.config import settings
-from esios_ingestor.schemas import EsiosResponse
+from esios_ingestor.core.metrics import count_retry, observe_fetch, observe_parse
+from esios_ingestor.ingestion.archive import ResponseArchive, month_blocks, rows_between
+from esios_ingestor.ingestion.rate_limit import TokenBucket, parse_retry_after
+from esios_ingestor.schemas import EsiosResponse, PriceRow, parse_price_rows
 
 logger = logging.getLogger(__name__)
 
 
 class EsiosClient:
-    BASE_URL = "https://api.esios.ree.es"
-    INDICATOR_ID = "1001"
+    """
+    ESIOS API client backed by a single pooled `httpx.AsyncClient`.
 
-    def __init__(self):
+    Use it as an async context manager so connections are kept alive and
+    reused across requests (including tenacity retries):
+
+        async with EsiosClient() as client:
+            await client.fetch_price_rows(1001, 8741, start, end)
+
+    Every request, including retries, first takes a token from one shared
+    TokenBucket, so concurrent fan-out stays within the API rate limit.
+
+    With an archive (ARCHIVE_DIR), price rows are fetched and archived a whole
+    UTC month at a time, and settled months are served from the archive
+    instead of the API.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        archive: ResponseArchive | None = None,
+    ):
+        self.transport = transport
+        if archive is None and settings.ARCHIVE_DIR:
+            archive = ResponseArchive(
+                settings.ARCHIVE_DIR, timedelta(days=settings.ARCHIVE_SETTLE_DAYS)
+            )
+        self.archive = archive
+        self.rate_limiter = TokenBucket(settings.ESIOS_RATE_LIMIT, settings.ESIOS_RATE_BURST)
+        self.base_url = settings.ESIOS_BASE_URL
         self.headers = {
-            "x-api-key": settings.ESIOS_API_KEY,
             "Accept": "application/json",
             "Content-Type": "application/json",
         }
+        if settings.ESIOS_API_KEY:
+            self.headers["x-api-key"] = settings.ESIOS_API_KEY
+        self._http: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "EsiosClient":
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(settings.ESIOS_TIMEOUT, connect=settings.ESIOS_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.ESIOS_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ESIOS_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.ESIOS_KEEPALIVE_EXPIRY,
+            ),
+            http2=settings.ESIOS_HTTP2,
+            transport=self.transport,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            raise RuntimeError("EsiosClient is not open; use 'async with EsiosClient() as client'")
+        return self._http
 
     @retry(
         stop=stop_after_attempt(3),
@@ -27,39 +90,121 @@ class EsiosClient:
         retry=retry_if_exception_type(
             (httpx.ConnectError, httpx.TimeoutException, httpx.HTTPStatusError)
         ),
+        before_sleep=count_retry,
     )
-    async def fetch_prices(self, start_date: datetime, end_date: datetime) -> EsiosResponse | None:
+    async def fetch_raw(
+        self, indicator_id: int, geo_id: int, start_date: datetime, end_date: datetime
+    ) -> bytes:
+        """Fetch the raw JSON body for one indicator and geo zone between two dates."""
+        if "x-api-key" not in self.headers:
+            raise RuntimeError("ESIOS_API_KEY is not set; it is required to call the ESIOS API")
+
         params = {
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
-            "geo_ids[]": [8741],
+            "geo_ids[]": [geo_id],
         }
 
-        timeout = httpx.Timeout(10.0, connect=5.0)
+        await self.rate_limiter.acquire()
+        logger.info(f"Fetching ESIOS {indicator_id}/{geo_id} from {start_date} to {end_date}")
+
+        try:
+            started = time.perf_counter()
+            response = await self.http.get(f"/indicators/{indicator_id}", params=params)
+            elapsed = time.perf_counter() - started
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            logger.info(f"Fetching ESIOS data from {start_date} to {end_date}")
+            if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+                delay = parse_retry_after(
+                    response.headers.get("Retry-After"), settings.ESIOS_RETRY_AFTER_DEFAULT
+                )
+                logger.warning(f"ESIOS rate limit hit, pausing requests for {delay:.0f}s")
+                self.rate_limiter.pause(delay)
+
+            response.raise_for_status()
+            observe_fetch(indicator_id, geo_id, elapsed, len(response.content))
+            return response.content
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"ESIOS API Error {e.response.status_code}: {e.response.text}")
+            raise e
+        except Exception as e:
+            logger.error(f"Failed to fetch data: {str(e)}")
+            raise e
+
+    async def _fetch_parsed[T](
+        self,
+        indicator_id: int,
+        geo_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        parse: Callable[[bytes], T],
+    ) -> T:
+        """Fetch and parse one window, timing the parse."""
+        body = await self.fetch_raw(indicator_id, geo_id, start_date, end_date)
+        started = time.perf_counter()
+        parsed = parse(body)
+        observe_parse(indicator_id, geo_id, time.perf_counter() - started)
+        return parsed
+
+    async def _fetch_archived_rows(
+        self, indicator_id: int, geo_id: int, start_date: datetime, end_date: datetime
+    ) -> list[PriceRow]:
+        """
+        Rows of one window through the archive, a UTC month at a time.
 
-            try:
-                response = await client.get(
-                    f"{self.BASE_URL}/indicators/{self.INDICATOR_ID}",
-                    headers=self.headers,
-                    params=params,
+        Archive keys are calendar months rather than the requested window,
+        whose bounds depend on when a run starts and what is already stored.
+        Settled months are read from the archive; the others are fetched whole
+        and archived once they parse, so a broken body is never kept.
+        """
+        rows = []
+        for block_start, block_end in month_blocks(start_date, end_date):
+            entry = self.archive.lookup(indicator_id, geo_id, block_start, block_end)
+            settled = entry is not None and self.archive.is_settled(entry)
+            if settled:
+                logger.info(
+                    f"Serving ESIOS {indicator_id}/{geo_id} {block_start:%Y-%m} from archive"
                 )
-                response.raise_for_status()
+                body = await asyncio.to_thread(self.archive.read, entry)
+            else:
+                body = await self.fetch_raw(indicator_id, geo_id, block_start, block_end)
+
+            started = time.perf_counter()
+            rows += parse_price_rows(body)
+            observe_parse(indicator_id, geo_id, time.perf_counter() - started)
+
+            if not settled:
+                await asyncio.to_thread(
+                    self.archive.put, indicator_id, geo_id, block_start, block_end, body
+                )
+        return rows_between(rows, start_date, end_date)
+
+    async def fetch_prices(
+        self, indicator_id: int, geo_id: int, start_date: datetime, end_date: datetime
+    ) -> EsiosResponse | None:
+        """Fetch and validate the full indicator response, including metadata."""
+        validated_data = await self._fetch_parsed(
+            indicator_id, geo_id, start_date, end_date, EsiosResponse.model_validate_json
+        )
+
+        if not validated_data.indicator.values:
+            logger.warning("ESIOS returned 200 OK but 'values' list is empty.")
+            return None
 
-                data = response.json()
-                validated_data = EsiosResponse(**data)
+        return validated_data
 
-                if not validated_data.indicator.values:
-                    logger.warning("ESIOS returned 200 OK but 'values' list is empty.")
-                    return None
+    async def fetch_price_rows(
+        self, indicator_id: int, geo_id: int, start_date: datetime, end_date: datetime
+    ) -> list[PriceRow]:
+        """Fetch only (datetime_utc, value, geo_id) rows through the lean decode path."""
+        if self.archive is not None:
+            rows = await self._fetch_archived_rows(indicator_id, geo_id, start_date, end_date)
+        else:
+            rows = await self._fetch_parsed(
+                indicator_id, geo_id, start_date, end_date, parse_price_rows
+            )
 
-                return validated_data
+        if not rows:
+            logger.warning("ESIOS returned 200 OK but 'values' list is empty.")
 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"ESIOS API Error {e.response.status_code}: {e.response.text}")
-                raise e
-            except Exception as e:
-                logger.error(f"Failed to fetch data: {str(e)}")
-                raise e
+        return rows
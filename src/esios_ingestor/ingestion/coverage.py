@@ -0,0 +1,220 @@
+from datetime import UTC, datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import and_, false, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.models.coverage import SeriesWatermark
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.schemas import Series
+
+
+class Gap(NamedTuple):
+    """Missing interval of a series; `start` and `end` are the first and last missing points."""
+
+    series: Series
+    start: datetime
+    end: datetime
+
+    def missing_points(self, step: timedelta) -> int:
+        return int((self.end - self.start) / step) + 1
+
+
+class Watermark(NamedTuple):
+    """Stored coverage bounds of a series, and how far its holes have been fetched."""
+
+    first: datetime
+    last: datetime
+    verified_through: datetime | None = None
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+async def update_watermark(
+    session: AsyncSession, series: Series, first: datetime, last: datetime
+) -> None:
+    """Widen the stored coverage bounds of a series to include [first, last]."""
+    stmt = insert(SeriesWatermark).values(
+        indicator_id=series.indicator_id,
+        zone_id=series.geo_id,
+        first_timestamp=first,
+        last_timestamp=last,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["indicator_id", "zone_id"],
+        set_={
+            "first_timestamp": func.least(SeriesWatermark.first_timestamp, first),
+            "last_timestamp": func.greatest(SeriesWatermark.last_timestamp, last),
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def mark_verified(session: AsyncSession, verified: dict[Series, datetime]) -> None:
+    """
+    Record that every hole of each series up to the given point has been fetched.
+
+    Holes ESIOS never fills stay in the stored history; below this mark they
+    are known to be empty upstream, so gap scans start from it instead of
+    re-fetching them on every run. The mark only moves forward.
+    """
+    for series, through in verified.items():
+        await session.execute(
+            update(SeriesWatermark)
+            .where(
+                SeriesWatermark.indicator_id == series.indicator_id,
+                SeriesWatermark.zone_id == series.geo_id,
+            )
+            .values(
+                verified_through=func.greatest(
+                    func.coalesce(SeriesWatermark.verified_through, through), through
+                )
+            )
+        )
+
+
+async def stored_series(
+    session: AsyncSession, indicator_id: int | None = None, zone_id: int | None = None
+) -> list[Series]:
+    """Series with stored prices (per their watermark), optionally of one indicator or zone."""
+    query = select(SeriesWatermark.indicator_id, SeriesWatermark.zone_id)
+    if indicator_id is not None:
+        query = query.where(SeriesWatermark.indicator_id == indicator_id)
+    if zone_id is not None:
+        query = query.where(SeriesWatermark.zone_id == zone_id)
+    result = await session.execute(query)
+    return [Series(indicator_id, zone_id) for indicator_id, zone_id in result.all()]
+
+
+async def load_watermarks(
+    session: AsyncSession, series_list: list[Series]
+) -> dict[Series, Watermark]:
+    """
+    Coverage bounds per series.
+
+    Series that have stored prices but no watermark yet (data loaded before
+    watermarks existed) are bootstrapped from the price index once; the
+    bootstrap is committed on `session`.
+    """
+    result = await session.execute(
+        select(
+            SeriesWatermark.indicator_id,
+            SeriesWatermark.zone_id,
+            SeriesWatermark.first_timestamp,
+            SeriesWatermark.last_timestamp,
+            SeriesWatermark.verified_through,
+        ).where(
+            tuple_(SeriesWatermark.indicator_id, SeriesWatermark.zone_id).in_(
+                [tuple(series) for series in series_list]
+            )
+        )
+    )
+    watermarks = {
+        Series(indicator_id, zone_id): Watermark(
+            _utc(first), _utc(last), _utc(verified) if verified else None
+        )
+        for indicator_id, zone_id, first, last, verified in result.all()
+    }
+
+    for series in series_list:
+        if series in watermarks:
+            continue
+
+        bounds = await session.execute(
+            select(
+                func.min(ElectricityPrice.timestamp), func.max(ElectricityPrice.timestamp)
+            ).where(
+                ElectricityPrice.indicator_id == series.indicator_id,
+                ElectricityPrice.zone_id == series.geo_id,
+            )
+        )
+        first, last = bounds.one()
+
+        if first is not None:
+            await update_watermark(session, series, first, last)
+            watermarks[series] = Watermark(_utc(first), _utc(last))
+
+    await session.commit()
+    return watermarks
+
+
+async def find_gaps(
+    session: AsyncSession,
+    step: timedelta,
+    series_list: list[Series] | None = None,
+    since: dict[Series, datetime] | None = None,
+) -> list[Gap]:
+    """
+    Find every hole inside the stored history in one ordered pass over the
+    (indicator_id, zone_id, timestamp) index.
+
+    A hole is any pair of consecutive points of a series further apart than `step`.
+    With `since`, a series listed there is only scanned from that point on.
+    """
+    previous = (
+        func.lag(ElectricityPrice.timestamp)
+        .over(
+            partition_by=(ElectricityPrice.indicator_id, ElectricityPrice.zone_id),
+            order_by=ElectricityPrice.timestamp,
+        )
+        .label("previous")
+    )
+    points = select(
+        ElectricityPrice.indicator_id,
+        ElectricityPrice.zone_id,
+        ElectricityPrice.timestamp,
+        previous,
+    )
+
+    if series_list is not None:
+        since = since or {}
+        conditions = []
+        for series in series_list:
+            condition = and_(
+                ElectricityPrice.indicator_id == series.indicator_id,
+                ElectricityPrice.zone_id == series.geo_id,
+            )
+            if series in since:
+                # The first point scanned has no predecessor, so holes start after it
+                condition = and_(condition, ElectricityPrice.timestamp >= since[series])
+            conditions.append(condition)
+        points = points.where(or_(false(), *conditions))
+
+    points = points.subquery()
+    query = (
+        select(points.c.indicator_id, points.c.zone_id, points.c.previous, points.c.timestamp)
+        .where(points.c.timestamp - points.c.previous > literal(step))
+        .order_by(points.c.indicator_id, points.c.zone_id, points.c.timestamp)
+    )
+
+    result = await session.execute(query)
+    return [
+        Gap(Series(indicator_id, zone_id), _utc(previous) + step, _utc(timestamp) - step)
+        for indicator_id, zone_id, previous, timestamp in result.all()
+    ]
+
+
+def coalesce_ranges(
+    ranges: list[tuple[datetime, datetime]], max_span: timedelta
+) -> list[tuple[datetime, datetime]]:
+    """
+    Merge missing ranges of one series into as few fetch ranges as possible.
+
+    Consecutive ranges are joined while the combined span fits in `max_span`
+    (one API call); re-fetching the stored points in between is harmless because
+    writes skip existing rows. Ranges already longer than `max_span` are kept
+    whole and split into windows later.
+    """
+    merged: list[tuple[datetime, datetime]] = []
+
+    for start, end in sorted(ranges):
+        if merged and max(end, merged[-1][1]) - merged[-1][0] <= max_span:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+
+    return merged
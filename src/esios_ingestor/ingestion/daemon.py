@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+from datetime import UTC, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import get_engine
+from esios_ingestor.core.metrics import clean_multiprocess_dir
+from esios_ingestor.ingestion.client import EsiosClient
+from esios_ingestor.ingestion.service import ingest_data
+from esios_ingestor.models.daemon import IngestionCycle
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key held by the replica that is ingesting
+DAEMON_LOCK_ID = 0x65736964
+
+
+def parse_run_times(values: list[str]) -> list[time]:
+    return sorted(time.fromisoformat(value) for value in values)
+
+
+def _slots_around(now: datetime, run_times: list[time], tz: ZoneInfo) -> list[datetime]:
+    today = now.astimezone(tz).date()
+    return [
+        datetime.combine(today + timedelta(days=offset), run_time, tzinfo=tz).astimezone(UTC)
+        for offset in (-1, 0, 1)
+        for run_time in run_times
+    ]
+
+
+def previous_slot(now: datetime, run_times: list[time], tz: ZoneInfo) -> datetime:
+    """Latest scheduled slot at or before `now`, in UTC."""
+    return max(slot for slot in _slots_around(now, run_times, tz) if slot <= now)
+
+
+def next_slot(now: datetime, run_times: list[time], tz: ZoneInfo) -> datetime:
+    """First scheduled slot after `now`, in UTC."""
+    return min(slot for slot in _slots_around(now, run_times, tz) if slot > now)
+
+
+def backoff_delay(failures: int, base: float, cap: float) -> float:
+    """Exponential retry delay after `failures` consecutive failed runs, jittered down by up to half."""
+    return random.uniform(0.5, 1.0) * min(cap, base * 2 ** (failures - 1))
+
+
+class IngestionDaemon:
+    """
+    Long-running scheduler around `ingest_data`.
+
+    Runs once at startup for the latest missed slot, then at every
+    DAEMON_RUN_TIMES slot (plus jitter), retrying failures with exponential
+    backoff until the next slot. The engine pool and one EsiosClient stay warm
+    for the whole process.
+
+    Several replicas can run side by side: a cycle only runs while holding a
+    Postgres advisory lock, and each slot is recorded in `ingestion_cycles`,
+    so a slot that one replica completed is skipped by the others.
+    """
+
+    def __init__(
+        self,
+        run_times: list[str] | None = None,
+        timezone: str | None = None,
+        bind: AsyncEngine | None = None,
+    ):
+        self.run_times = parse_run_times(run_times or settings.DAEMON_RUN_TIMES)
+        self.tz = ZoneInfo(timezone or settings.DAEMON_TIMEZONE)
+        self.bind = bind or get_engine()
+        self.sessions = async_sessionmaker(self.bind, expire_on_commit=False)
+        self.replica = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        if not self.stopping.is_set():
+            logger.info("Shutdown requested.")
+            self.stopping.set()
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep for `seconds` unless asked to stop; returns True when stopping."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=max(0.0, seconds))
+            return True
+        except TimeoutError:
+            return self.stopping.is_set()
+
+    async def _claim(self, slot: datetime) -> bool:
+        async with self.sessions() as session:
+            cycle = await session.get(IngestionCycle, slot)
+
+            if cycle is not None and cycle.status == "succeeded":
+                return False
+
+            if cycle is None:
+                session.add(IngestionCycle(slot=slot, status="running", replica=self.replica))
+            else:
+                # Failed, or left "running" by a replica that died holding the lock
+                cycle.status = "running"
+                cycle.replica = self.replica
+                cycle.attempts += 1
+                cycle.started_at = func.now()
+                cycle.finished_at = None
+
+            await session.commit()
+            return True
+
+    async def _finish(self, slot: datetime, status: str, inserted: int | None = None) -> None:
+        async with self.sessions() as session:
+            cycle = await session.get(IngestionCycle, slot)
+            cycle.status = status
+            cycle.inserted = inserted
+            cycle.finished_at = func.now()
+            await session.commit()
+
+    async def run_cycle(self, client: EsiosClient, slot: datetime) -> bool:
+        """
+        Ingest for `slot` if no other replica is ingesting or already did.
+
+        Returns:
+            True if this replica ran the cycle, False if it was skipped.
+        """
+        async with self.bind.connect() as lock_conn:
+            locked = await lock_conn.scalar(select(func.pg_try_advisory_lock(DAEMON_LOCK_ID)))
+            await lock_conn.commit()
+
+            if not locked:
+                logger.info("Another replica is ingesting; skipping this cycle.")
+                return False
+
+            try:
+                if not await self._claim(slot):
+                    logger.info(f"Cycle {slot:%Y-%m-%d %H:%M} UTC already completed; skipping.")
+                    return False
+
+                try:
+                    inserted, _ = await ingest_data(client=client)
+                except BaseException:
+                    await self._finish(slot, "failed")
+                    raise
+
+                await self._finish(slot, "succeeded", inserted)
+                return True
+            finally:
+                await lock_conn.execute(select(func.pg_advisory_unlock(DAEMON_LOCK_ID)))
+                await lock_conn.commit()
+
+    async def _run_until_stopped(self, client: EsiosClient, slot: datetime) -> bool:
+        """Run a cycle; on shutdown give it DAEMON_SHUTDOWN_GRACE seconds, then cancel it."""
+        cycle = asyncio.create_task(self.run_cycle(client, slot))
+        stop = asyncio.create_task(self.stopping.wait())
+        done, _ = await asyncio.wait({cycle, stop}, return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+
+        if cycle in done:
+            return cycle.result()
+
+        logger.info(f"Waiting up to {settings.DAEMON_SHUTDOWN_GRACE:.0f}s for the running cycle.")
+        try:
+            return await asyncio.wait_for(cycle, settings.DAEMON_SHUTDOWN_GRACE)
+        except TimeoutError:
+            # Every window commits on its own; the next run resumes from what was stored
+            logger.warning("Running cycle cancelled at shutdown.")
+            return False
+
+    async def run(self) -> None:
+        now = datetime.now(UTC)
+        slot = previous_slot(now, self.run_times, self.tz)
+        delay = 0.0
+        failures = 0
+
+        async with EsiosClient() as client:
+            while not await self._sleep(delay):
+                try:
+                    await self._run_until_stopped(client, slot)
+                    failures = 0
+                except Exception:
+                    failures += 1
+                    logger.error(f"Ingestion cycle failed ({failures} in a row).", exc_info=True)
+
+                if self.stopping.is_set():
+                    break
+
+                now = datetime.now(UTC)
+                upcoming = next_slot(now, self.run_times, self.tz)
+
+                if failures:
+                    retry = backoff_delay(
+                        failures, settings.DAEMON_BACKOFF_BASE, settings.DAEMON_BACKOFF_MAX
+                    )
+                    if now + timedelta(seconds=retry) < upcoming:
+                        delay = retry
+                        logger.info(f"Retrying in {delay:.0f}s.")
+                        continue
+                    failures = 0
+
+                slot = upcoming
+                delay = (slot - now).total_seconds() + random.uniform(
+                    0, settings.DAEMON_JITTER_SECONDS
+                )
+                logger.info(
+                    f"Next ingestion cycle at {slot.astimezone(self.tz):%Y-%m-%d %H:%M %Z} "
+                    f"(in {delay / 60:.0f} min)."
+                )
+
+        logger.info("Ingestion daemon stopped.")
+
+
+async def run_daemon() -> None:
+    """Run the ingestion daemon until SIGTERM or SIGINT."""
+    clean_multiprocess_dir()
+    daemon = IngestionDaemon()
+    loop = asyncio.get_running_loop()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, daemon.stop)
+
+    logger.info(
+        f"Ingestion daemon started as {daemon.replica}; "
+        f"slots {', '.join(settings.DAEMON_RUN_TIMES)} {daemon.tz.key}."
+    )
+
+    try:
+        await daemon.run()
+    finally:
+        await get_engine().dispose()
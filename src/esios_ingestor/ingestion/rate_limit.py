@@ -0,0 +1,65 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter shared by every request of an EsiosClient.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. A 429
+    response can pause the whole bucket with `pause()`, so concurrent callers
+    back off together instead of hammering the API one by one.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Block all acquirers for `seconds`; the bucket refills from empty afterwards."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Parse a Retry-After header given either as delay-seconds or an HTTP date."""
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
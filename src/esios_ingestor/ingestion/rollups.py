@@ -0,0 +1,62 @@
+from sqlalchemy import CTE, Date, SmallInteger, cast, extract, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from esios_ingestor.models.rollup import DailyPriceRollup, HourOfDayPriceRollup
+
+
+def _merge_rollup(model, inserted: CTE, keys: dict) -> CTE:
+    """
+    INSERT ... ON CONFLICT DO UPDATE that folds freshly inserted prices into a rollup.
+
+    Only rows that were actually inserted are added, so duplicates are never
+    counted twice. Sums and counts add up and min/max widen, which makes the
+    merge commutative: concurrent windows touching the same day or month
+    serialise on the row lock and still produce the right totals. Groups are
+    sorted so concurrent merges lock rows in the same order.
+    """
+    table = model.__table__
+    group_by = (inserted.c.indicator_id, inserted.c.zone_id, *keys.values())
+
+    stmt = insert(table).from_select(
+        ["indicator_id", "zone_id", *keys, "price_sum", "price_count", "price_min", "price_max"],
+        select(
+            *group_by,
+            func.sum(inserted.c.price),
+            func.count(),
+            func.min(inserted.c.price),
+            func.max(inserted.c.price),
+        )
+        .group_by(*group_by)
+        .order_by(*group_by),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={
+            "price_sum": table.c.price_sum + stmt.excluded.price_sum,
+            "price_count": table.c.price_count + stmt.excluded.price_count,
+            "price_min": func.least(table.c.price_min, stmt.excluded.price_min),
+            "price_max": func.greatest(table.c.price_max, stmt.excluded.price_max),
+        },
+    )
+    return stmt.cte(table.name)
+
+
+def rollup_ctes(inserted: CTE) -> list[CTE]:
+    """
+    Rollup maintenance for a CTE of inserted (indicator_id, zone_id, timestamp, price) rows.
+
+    Days, months and hours are taken in UTC.
+    """
+    utc = func.timezone("UTC", inserted.c.timestamp)
+
+    return [
+        _merge_rollup(DailyPriceRollup, inserted, {"day": cast(utc, Date)}),
+        _merge_rollup(
+            HourOfDayPriceRollup,
+            inserted,
+            {
+                "month": cast(func.date_trunc("month", utc), Date),
+                "hour": cast(extract("hour", utc), SmallInteger),
+            },
+        ),
+    ]
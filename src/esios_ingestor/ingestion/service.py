@@ -1,96 +1,447 @@
+import asyncio
+import json
 import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import AsyncExitStack
 from datetime import UTC, datetime, timedelta
+from typing import NamedTuple
 
-from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import DateTime, Float, Integer, SmallInteger, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from esios_ingestor.core.database import AsyncSessionLocal
-from esios_ingestor.core.metrics import INGESTION_RECORDS_TOTAL, update_last_success_timestamp
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import PRICES_CHANNEL, get_engine, get_sessionmaker
+from esios_ingestor.core.metrics import (
+    observe_write,
+    track_ingestion_run,
+    update_last_success_timestamp,
+)
+from esios_ingestor.core.partitions import (
+    apply_retention,
+    ensure_future_partitions,
+    ensure_partitions,
+    month_start,
+)
+from esios_ingestor.ingestion.archive import ArchiveReader, ResponseArchive
 from esios_ingestor.ingestion.client import EsiosClient
+from esios_ingestor.ingestion.coverage import (
+    coalesce_ranges,
+    find_gaps,
+    load_watermarks,
+    mark_verified,
+    update_watermark,
+)
+from esios_ingestor.ingestion.rollups import rollup_ctes
 from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.version import bump_data_version
+from esios_ingestor.schemas import PriceRow, Series
 
 logger = logging.getLogger(__name__)
 
 
-async def get_last_recorded_timestamp() -> datetime | None:
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(func.max(ElectricityPrice.timestamp))
-        last_date = result.scalar()
+class Window(NamedTuple):
+    """A unit of ingestion work: one series over one time range."""
 
-        if last_date and last_date.tzinfo is None:
-            last_date = last_date.replace(tzinfo=UTC)
+    series: Series
+    start: datetime
+    end: datetime
 
-        return last_date
 
+# Called in a window's transaction, before it commits, with the (inserted, skipped) counts
+Checkpoint = Callable[[AsyncSession, Window, int, int], Awaitable[None]]
 
-async def ingest_data(start_date: datetime | None = None, end_date: datetime | None = None):
+
+def configured_series() -> list[Series]:
+    return [Series(indicator_id, geo_id) for indicator_id, geo_id in settings.ESIOS_SERIES]
+
+
+def _build_upsert_statement():
     """
-    Idempotent ETL flow: Fetch only new data -> Upsert to DB.
+    INSERT ... SELECT FROM unnest(...) ON CONFLICT DO NOTHING, plus rollup upkeep.
 
-    Args:
-        start_date: Custom start date (optional)
-        end_date: Custom end date (optional)
+    Each column travels as a single array parameter, so a whole batch is one
+    statement with a fixed number of bind parameters regardless of its size.
+    The inserted rows feed the daily and hour-of-day rollups through
+    data-modifying CTEs in the same statement; it returns the inserted count
+    and the first and last inserted timestamps.
     """
-    client = EsiosClient()
-    now = datetime.now(UTC)
+    source = (
+        func.unnest(
+            bindparam("timestamps", type_=ARRAY(DateTime(timezone=True))),
+            bindparam("prices", type_=ARRAY(Float)),
+            bindparam("zone_ids", type_=ARRAY(SmallInteger)),
+        )
+        .table_valued("timestamp", "price", "zone_id")
+        .render_derived()
+    )
+    prices = ElectricityPrice.__table__
+
+    inserted = (
+        insert(prices)
+        .from_select(
+            ["indicator_id", "timestamp", "price", "zone_id"],
+            select(
+                bindparam("indicator_id", type_=Integer),
+                source.c.timestamp,
+                source.c.price,
+                source.c.zone_id,
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["indicator_id", "zone_id", "timestamp"])
+        .returning(prices.c.indicator_id, prices.c.zone_id, prices.c.timestamp, prices.c.price)
+        .cte("inserted")
+    )
+
+    return (
+        select(func.count(), func.min(inserted.c.timestamp), func.max(inserted.c.timestamp))
+        .select_from(inserted)
+        .add_cte(*rollup_ctes(inserted))
+    )
+
+
+UPSERT_PRICES = _build_upsert_statement()
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    first: datetime | None  # Earliest and latest newly inserted timestamps
+    last: datetime | None
+
+
+async def upsert_prices(
+    session: AsyncSession, indicator_id: int, rows: list[PriceRow]
+) -> UpsertResult:
+    """
+    Bulk upsert (timestamp, price, zone_id) rows of one indicator in batches of
+    INGESTION_BATCH_SIZE.
+
+    Rows that already exist are skipped by ON CONFLICT DO NOTHING; new rows
+    are also folded into the daily and hour-of-day rollups. Monthly partitions
+    for the rows are created first, outside the session's transaction.
+    """
+    if not rows:
+        return UpsertResult(0, None, None)
+
+    await ensure_partitions(session.bind, {month_start(row[0]) for row in rows})
+
+    inserted, first, last = 0, None, None
+    batch_size = settings.INGESTION_BATCH_SIZE
+
+    for offset in range(0, len(rows), batch_size):
+        timestamps, prices, zone_ids = zip(*rows[offset : offset + batch_size], strict=True)
+        result = await session.execute(
+            UPSERT_PRICES,
+            {
+                "indicator_id": indicator_id,
+                "timestamps": list(timestamps),
+                "prices": list(prices),
+                "zone_ids": list(zone_ids),
+            },
+        )
+        count, batch_first, batch_last = result.one()
+        if count:
+            inserted += count
+            first = batch_first if first is None else min(first, batch_first)
+            last = batch_last if last is None else max(last, batch_last)
+
+    return UpsertResult(inserted, first, last)
+
+
+async def write_prices(
+    session: AsyncSession, indicator_id: int, rows: list[PriceRow]
+) -> tuple[int, int]:
+    """
+    `upsert_prices`, counting rows instead.
+
+    Returns:
+        Tuple of (inserted, skipped) row counts.
+    """
+    result = await upsert_prices(session, indicator_id, rows)
+    return result.inserted, len(rows) - result.inserted
+
+
+def iter_windows(
+    start: datetime, end: datetime, size: timedelta
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Split [start, end] into consecutive windows of at most `size`.
+
+    Windows do not overlap: each one ends one second before the next begins.
+    """
+    window_start = start
+    while window_start <= end:
+        next_start = window_start + size
+        yield window_start, min(next_start - timedelta(seconds=1), end)
+        window_start = next_start
+
+
+async def notify_prices(session: AsyncSession, series: Series, result: UpsertResult) -> None:
+    """
+    NOTIFY PRICES_CHANNEL with the newly inserted range of `series`.
+
+    Postgres delivers it when the session's transaction commits (and drops it
+    on rollback), so listeners never hear about rows they cannot read yet.
+    """
+    payload = {
+        "indicator_id": series.indicator_id,
+        "zone_id": series.geo_id,
+        "start": result.first.isoformat(),
+        "end": result.last.isoformat(),
+        "inserted": result.inserted,
+    }
+    await session.execute(select(func.pg_notify(PRICES_CHANNEL, json.dumps(payload))))
+
+
+async def ingest_window(
+    client: EsiosClient, window: Window, checkpoint: Checkpoint | None = None
+) -> tuple[int, int]:
+    """
+    Fetch one window of one series and write it in its own transaction.
+
+    `checkpoint`, if given, runs in that transaction, so whatever it records
+    commits together with the prices (even when the window was empty).
+
+    Returns:
+        Tuple of (inserted, skipped) row counts.
+    """
+    indicator_id, geo_id = window.series
+    rows = await client.fetch_price_rows(indicator_id, geo_id, window.start, window.end)
+
+    if not rows:
+        if checkpoint is not None:
+            async with get_sessionmaker()() as session:
+                await checkpoint(session, window, 0, 0)
+                await session.commit()
+        # The API answered; the series is healthy even if there is nothing new
+        update_last_success_timestamp(str(indicator_id), str(geo_id))
+        return 0, 0
+
+    started = time.perf_counter()
+    async with get_sessionmaker()() as session:
+        result = await upsert_prices(session, indicator_id, rows)
+        await update_watermark(
+            session, window.series, min(row[0] for row in rows), max(row[0] for row in rows)
+        )
+        if result.inserted:
+            await bump_data_version(session)
+            await notify_prices(session, window.series, result)
+        inserted, skipped = result.inserted, len(rows) - result.inserted
+        if checkpoint is not None:
+            await checkpoint(session, window, inserted, skipped)
+        await session.commit()
 
+    # Only once the rows are stored: a failed write must not look like fresh data
+    update_last_success_timestamp(str(indicator_id), str(geo_id))
+    observe_write(indicator_id, geo_id, time.perf_counter() - started, inserted, skipped)
+
+    logger.info(
+        f"{indicator_id}/{geo_id} {window.start:%Y-%m-%d} - {window.end:%Y-%m-%d}: "
+        f"inserted {inserted}, skipped {skipped}"
+    )
+    return inserted, skipped
+
+
+async def ingest_windows(
+    client: EsiosClient,
+    windows: Iterator[Window],
+    concurrency: int,
+    checkpoint: Checkpoint | None = None,
+) -> tuple[int, int]:
+    """
+    Ingest windows with at most `concurrency` in flight.
+
+    Workers pull from a shared iterator, so only `concurrency` windows are held
+    in memory at any time and each one is written as soon as it is fetched.
+    All requests go through the client's shared rate limiter. `checkpoint` is
+    passed on to `ingest_window`.
+
+    Returns:
+        Tuple of total (inserted, skipped) row counts.
+    """
+    totals = [0, 0]
+
+    async def worker():
+        for window in windows:
+            inserted, skipped = await ingest_window(client, window, checkpoint)
+            totals[0] += inserted
+            totals[1] += skipped
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(concurrency):
+                tg.create_task(worker())
+    except ExceptionGroup as eg:
+        # Surface the first failure; the remaining workers were cancelled because of it
+        raise eg.exceptions[0] from None
+
+    return totals[0], totals[1]
+
+
+async def plan_windows(
+    series_list: list[Series],
+    start_date: datetime | None,
+    end_date: datetime | None,
+    window_size: timedelta,
+) -> tuple[Iterator[Window], dict[Series, datetime]]:
+    """
+    Build the window iterator for a run.
+
+    With explicit dates every series covers the same range, interleaved per
+    window so concurrent workers fan out across series.
+
+    Without dates only missing data is fetched: holes inside each series'
+    stored history plus the tail after its watermark. Nearby holes are
+    coalesced so they cost as few API calls as possible. Only history after
+    a series' `verified_through` mark is scanned for holes.
+
+    Returns:
+        The windows, and per series how far its history was scanned; once
+        every window is fetched, `mark_verified` can move the marks there.
+    """
     if start_date and end_date:
         target_start = start_date.replace(tzinfo=UTC) if start_date.tzinfo is None else start_date
         target_end = end_date.replace(tzinfo=UTC) if end_date.tzinfo is None else end_date
         logger.info(f"Using custom date range: {target_start} to {target_end}")
-    else:
-        last_date = await get_last_recorded_timestamp()
-        target_end = now + timedelta(days=2)
 
-        if not last_date:
-            logger.info("Database empty. Starting initial load (last 7 days).")
-            target_start = now - timedelta(days=7)
-        else:
-            target_start = last_date + timedelta(hours=1)
+        return (
+            Window(series, window_start, window_end)
+            for window_start, window_end in iter_windows(target_start, target_end, window_size)
+            for series in series_list
+        ), {}
 
-            if target_start >= target_end:
-                logger.info("Data is up to date.")
-                return
+    now = datetime.now(UTC)
+    target_end = now + timedelta(days=2)
+    step = timedelta(minutes=settings.INGESTION_STEP_MINUTES)
 
-    api_call_successful = False
+    async with get_sessionmaker()() as session:
+        watermarks = await load_watermarks(session, series_list)
+        verified = {
+            series: watermark.verified_through
+            for series, watermark in watermarks.items()
+            if watermark.verified_through is not None
+        }
+        gaps = await find_gaps(session, step, series_list, since=verified)
 
-    try:
-        esios_data = await client.fetch_prices(target_start, target_end)
-        api_call_successful = True
-
-        if not esios_data:
-            logger.info("No new data received from API (up to date).")
-        else:
-            async with AsyncSessionLocal() as session:
-                records_count = 0
-
-                for item in esios_data.indicator.values:
-                    stmt = (
-                        insert(ElectricityPrice)
-                        .values(
-                            timestamp=item.datetime_utc,
-                            price=item.value,
-                            zone_id=item.geo_id,
-                        )
-                        .on_conflict_do_nothing(index_elements=["timestamp", "zone_id"])
-                    )
-
-                    await session.execute(stmt)
-                    records_count += 1
+    missing: dict[Series, list[tuple[datetime, datetime]]] = {s: [] for s in series_list}
 
-                await session.commit()
+    for gap in gaps:
+        missing[gap.series].append((gap.start, gap.end))
+
+    for series in series_list:
+        if series not in watermarks:
+            logger.info(f"No data for {series}. Starting initial load (last 7 days).")
+            missing[series].append((now - timedelta(days=7), target_end))
+        elif watermarks[series].last + step < target_end:
+            missing[series].append((watermarks[series].last + step, target_end))
+
+    if gaps:
+        logger.info(f"Found {len(gaps)} gaps in stored history; fetching them first.")
+
+    windows = (
+        Window(series, window_start, window_end)
+        for series, ranges in missing.items()
+        for range_start, range_end in coalesce_ranges(ranges, window_size)
+        for window_start, window_end in iter_windows(range_start, range_end, window_size)
+    )
+    return windows, {series: watermark.last for series, watermark in watermarks.items()}
+
+
+async def replay_archive(
+    archive: ResponseArchive,
+    indicator_id: int | None = None,
+    geo_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    concurrency: int | None = None,
+) -> tuple[int, int]:
+    """
+    Rebuild prices from archived responses, without network access.
+
+    Every archived window (optionally limited to one indicator, one zone and
+    windows overlapping the dates) goes through the regular write path, so rollups,
+    watermarks and the data version are kept up to date. Rows already stored
+    are skipped, so replaying twice is harmless.
+
+    Returns:
+        Tuple of (inserted, skipped) row counts.
+    """
+    windows = (
+        Window(Series(entry.indicator_id, entry.geo_id), entry.start, entry.end)
+        for entry in archive.entries(indicator_id, geo_id, start_date, end_date)
+    )
+
+    with track_ingestion_run("replay"):
+        inserted, skipped = await ingest_windows(
+            ArchiveReader(archive), windows, concurrency or settings.INGESTION_CONCURRENCY
+        )
+    logger.info(f"Replay complete. Inserted {inserted}, skipped {skipped} records.")
+    return inserted, skipped
+
+
+async def ingest_data(
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    window_days: int | None = None,
+    concurrency: int | None = None,
+    client: EsiosClient | None = None,
+    series: list[Series] | None = None,
+) -> tuple[int, int]:
+    """
+    Idempotent ETL flow: Fetch only new data -> Upsert to DB.
+
+    Every configured (indicator, geo) series is split into windows that are
+    fetched concurrently and written as they arrive.
+
+    Args:
+        start_date: Custom start date (optional)
+        end_date: Custom end date (optional)
+        window_days: Window size in days (default: INGESTION_WINDOW_DAYS)
+        concurrency: Max windows in flight (default: INGESTION_CONCURRENCY)
+        client: Open EsiosClient to reuse (optional, one is opened for the run otherwise)
+        series: Series to ingest (default: ESIOS_SERIES)
+
+    Returns:
+        Tuple of (inserted, skipped) row counts.
+    """
+    window_size = timedelta(days=window_days or settings.INGESTION_WINDOW_DAYS)
+    concurrency = concurrency or settings.INGESTION_CONCURRENCY
+    series_list = series or configured_series()
+
+    with track_ingestion_run():
+        try:
+            await ensure_future_partitions(get_engine(), settings.PARTITION_PREMAKE_MONTHS)
+            windows, scanned = await plan_windows(series_list, start_date, end_date, window_size)
+
+            async with AsyncExitStack() as stack:
+                if client is None:
+                    client = await stack.enter_async_context(EsiosClient())
+
+                inserted, skipped = await ingest_windows(client, windows, concurrency)
+
+            if scanned:
+                # Every hole found was fetched; those still empty are not asked for again
+                async with get_sessionmaker()() as session:
+                    await mark_verified(session, scanned)
+                    await session.commit()
+
+            if inserted > 0:
+                logger.info(f"Ingestion complete. Inserted {inserted}, skipped {skipped} records.")
+            elif skipped > 0:
+                logger.info("API returned data but all records were duplicates.")
+            else:
+                logger.info("No new data received from API (up to date).")
 
-                if records_count > 0:
-                    INGESTION_RECORDS_TOTAL.labels(status="success").inc(records_count)
-                    logger.info(f"Ingestion complete. Processed {records_count} records.")
-                else:
-                    logger.info("API returned data but all records were duplicates.")
+            if settings.RETENTION_MONTHS:
+                retired = await apply_retention(
+                    get_engine(), settings.RETENTION_MONTHS, settings.RETENTION_ACTION
+                )
+                if retired:
+                    logger.info(f"Retention ({settings.RETENTION_ACTION}): {', '.join(retired)}")
 
-        # Update timestamp on successful API call (even if no new data)
-        # This confirms pipeline is healthy and up-to-date
-        if api_call_successful:
-            update_last_success_timestamp()
+            return inserted, skipped
 
-    except Exception:
-        logger.error("Ingestion process failed.", exc_info=True)
-        raise
+        except Exception:
+            logger.error("Ingestion process failed.", exc_info=True)
+            raise
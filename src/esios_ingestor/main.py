@@ -1,36 +1,60 @@
-import asyncio
 import logging
-from datetime import datetime
+import sys
+from datetime import datetime, timedelta
+from functools import cache
 
 import typer
-import uvicorn
-from rich.console import Console
-from rich.table import Table
-from sqlalchemy import select
 
-from esios_ingestor.core.database import AsyncSessionLocal
-from esios_ingestor.core.logger import setup_logging
-from esios_ingestor.ingestion.service import ingest_data
-from esios_ingestor.models.price import ElectricityPrice
+# Commands import what they need when they run, so `esios --help` and light
+# commands do not pay for the web stack, the ESIOS client or the engine.
 
 app = typer.Typer(help="Esios Ingestor CLI")
-console = Console()
-
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
+@cache
+def get_console():
+    from rich.console import Console
+
+    return Console()
+
+
+# Commands that ingest report through the shared metrics directory, so the API's
+# /metrics shows cron-driven runs too; each folds its files into the host's archive
+# when it exits. Read-only commands have nothing to report and stay out of it.
+MULTIPROCESS_COMMANDS = ("server", "daemon", "ingest", "backfill", "replay")
+
+
+@app.callback()
+def main(ctx: typer.Context):
+    """Esios Ingestor CLI"""
+    import os
+
+    from esios_ingestor.core.logger import setup_logging
+
+    if ctx.invoked_subcommand not in MULTIPROCESS_COMMANDS:
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    setup_logging()
+
+
 @app.command()
 def ingest(
     start_date: str = typer.Option(None, help="Start date (YYYY-MM-DD)"),
     end_date: str = typer.Option(None, help="End date (YYYY-MM-DD)"),
+    window_days: int = typer.Option(None, min=1, help="Backfill window size in days"),
+    concurrency: int = typer.Option(None, min=1, help="Windows fetched concurrently"),
 ):
     """
     Triggers the ETL pipeline to fetch and store electricity prices.
 
     Without dates: auto-detects gaps and fetches missing data.
-    With dates: fetches specific range.
+    With dates: fetches specific range, split into concurrently fetched windows.
     """
+    import asyncio
+
+    from esios_ingestor.ingestion.service import ingest_data
+
     logger.info("Starting ingestion process from CLI...")
 
     start_dt = None
@@ -40,22 +64,22 @@ def ingest(
         try:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
         except ValueError as e:
-            console.print("[red]Invalid start date format. Use YYYY-MM-DD[/red]")
+            get_console().print("[red]Invalid start date format. Use YYYY-MM-DD[/red]")
             raise typer.Exit(code=1) from e
 
     if end_date:
         try:
             end_dt = datetime.strptime(end_date, "%Y-%m-%d")
         except ValueError as e:
-            console.print("[red]Invalid end date format. Use YYYY-MM-DD[/red]")
+            get_console().print("[red]Invalid end date format. Use YYYY-MM-DD[/red]")
             raise typer.Exit(code=1) from e
 
     if start_dt and end_dt and start_dt > end_dt:
-        console.print("[red]Error: start_date must be before or equal to end_date[/red]")
+        get_console().print("[red]Error: start_date must be before or equal to end_date[/red]")
         raise typer.Exit(code=1)
 
     try:
-        asyncio.run(ingest_data(start_dt, end_dt))
+        asyncio.run(ingest_data(start_dt, end_dt, window_days, concurrency))
         logger.info("Ingestion process finished successfully.")
     except Exception as e:
         logger.error(f"Ingestion failed: {e}")
@@ -63,50 +87,216 @@ def ingest(
 
 
 @app.command()
-def server(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
-    """Starts the FastAPI web server."""
-    logger.info(f"Starting API server on {host}:{port}")
-    uvicorn.run("esios_ingestor.web.app:app", host=host, port=port, reload=reload)
+def replay(
+    archive_dir: str = typer.Option(None, help="Archive directory (default: ARCHIVE_DIR)"),
+    start_date: str = typer.Option(None, help="Only windows ending on or after (YYYY-MM-DD)"),
+    end_date: str = typer.Option(None, help="Only windows starting on or before (YYYY-MM-DD)"),
+    indicator: int = typer.Option(None, help="Only this ESIOS indicator"),
+    zone: int = typer.Option(None, help="Only this geo zone"),
+    concurrency: int = typer.Option(None, min=1, help="Windows written concurrently"),
+):
+    """
+    Rebuilds stored prices from the raw response archive, without calling ESIOS.
+
+    Rows already stored are skipped, so it can fill a fresh database or repair
+    an existing one.
+    """
+    import asyncio
+
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.core.database import get_engine
+    from esios_ingestor.ingestion.archive import ResponseArchive
+    from esios_ingestor.ingestion.service import replay_archive
+
+    archive_dir = archive_dir or settings.ARCHIVE_DIR
+    if not archive_dir:
+        get_console().print("[red]Set ARCHIVE_DIR or pass --archive-dir[/red]")
+        raise typer.Exit(code=1)
+
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_dt = (
+            datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1, microseconds=-1)
+            if end_date
+            else None
+        )
+    except ValueError as e:
+        get_console().print("[red]Invalid date format. Use YYYY-MM-DD[/red]")
+        raise typer.Exit(code=1) from e
+
+    archive = ResponseArchive(archive_dir)
+
+    async def _replay():
+        try:
+            return await replay_archive(archive, indicator, zone, start_dt, end_dt, concurrency)
+        finally:
+            await get_engine().dispose()
+
+    try:
+        inserted, skipped = asyncio.run(_replay())
+    except Exception as e:
+        get_console().print(f"[red]Replay failed: {e}[/red]")
+        raise typer.Exit(code=1) from e
+
+    get_console().print(f"[green]Replayed archive: inserted {inserted}, skipped {skipped}[/green]")
+
+
+@app.command()
+def daemon():
+    """
+    Runs ingestion on a schedule until stopped (SIGTERM/SIGINT).
+
+    Runs at DAEMON_RUN_TIMES in DAEMON_TIMEZONE, once at startup for the latest
+    slot, and retries failures with backoff. Safe to run on several replicas.
+    """
+    import asyncio
+
+    from esios_ingestor.ingestion.daemon import run_daemon
+
+    try:
+        asyncio.run(run_daemon())
+    except Exception as e:
+        logger.error(f"Ingestion daemon failed: {e}")
+        raise typer.Exit(code=1) from e
+
+
+@app.command()
+def server(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    reload: bool = False,
+    workers: int = typer.Option(1, min=1, help="Worker processes (ignored with --reload)"),
+):
+    """
+    Starts the FastAPI web server.
+
+    With several workers, metrics are kept in PROMETHEUS_MULTIPROC_DIR (a
+    temporary directory, removed on exit, if unset) so /metrics adds up all of them.
+    """
+    import os
+    import shutil
+    import tempfile
+
+    import uvicorn
+
+    temporary_dir = None
+    if workers > 1 and not reload and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Workers inherit the environment; metrics must see it before they are created
+        temporary_dir = tempfile.mkdtemp(prefix="esios-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = temporary_dir
+
+    if multiproc_dir := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.makedirs(multiproc_dir, exist_ok=True)
+        logger.info(f"Multiprocess metrics in {multiproc_dir}")
+
+    logger.info(f"Starting API server on {host}:{port} with {workers} worker(s)")
+    try:
+        uvicorn.run(
+            "esios_ingestor.web.app:app", host=host, port=port, reload=reload, workers=workers
+        )
+    finally:
+        if temporary_dir:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
 
 
 @app.command()
 def prices(
-    limit: int = typer.Option(10, help="Number of prices to show"),
+    limit: int = typer.Option(10, help="Number of prices (or buckets) to show"),
     date: str = typer.Option(None, help="Filter by date (YYYY-MM-DD)"),
+    indicator: int = typer.Option(None, help="ESIOS indicator (default: ESIOS_DEFAULT_INDICATOR)"),
+    zone: int = typer.Option(None, help="Geo zone (default: all zones)"),
+    bucket: str = typer.Option(
+        None, help="Show open/high/low/close/avg per 15m, 1h, 1d or 1w bucket (UTC)"
+    ),
 ):
     """Show electricity prices from the database in a table."""
+    import asyncio
+
+    from rich.table import Table
+    from sqlalchemy import func, select
+
+    from esios_ingestor.aggregate import BUCKETS, aggregate_prices
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.core.database import get_read_sessionmaker
+    from esios_ingestor.models.price import ElectricityPrice
+
+    indicator_id = indicator or settings.ESIOS_DEFAULT_INDICATOR
+
+    if bucket is not None and bucket not in BUCKETS:
+        get_console().print(f"[red]Invalid bucket. Use one of: {', '.join(BUCKETS)}[/red]")
+        raise typer.Exit(code=1)
+
+    start_dt = end_dt = None
+    if date:
+        try:
+            start_dt = datetime.strptime(date, "%Y-%m-%d")
+            end_dt = start_dt.replace(hour=23, minute=59, second=59)
+        except ValueError as e:
+            get_console().print("[red]Invalid date format. Use YYYY-MM-DD[/red]")
+            raise typer.Exit(code=1) from e
 
     async def _get_prices():
-        async with AsyncSessionLocal() as session:
-            query = select(ElectricityPrice).order_by(ElectricityPrice.timestamp.desc())
-
-            if date:
-                try:
-                    start_dt = datetime.strptime(date, "%Y-%m-%d")
-                    end_dt = start_dt.replace(hour=23, minute=59, second=59)
-                    query = query.where(
-                        ElectricityPrice.timestamp >= start_dt,
-                        ElectricityPrice.timestamp <= end_dt,
-                    )
-                except ValueError:
-                    console.print("[red]Invalid date format. Use YYYY-MM-DD[/red]")
-                    return []
+        async with get_read_sessionmaker()() as session:
+            query = select(ElectricityPrice).where(ElectricityPrice.indicator_id == indicator_id)
+            if zone is not None:
+                query = query.where(ElectricityPrice.zone_id == zone)
+            if start_dt:
+                query = query.where(
+                    ElectricityPrice.timestamp >= start_dt,
+                    ElectricityPrice.timestamp <= end_dt,
+                )
 
-            query = query.limit(limit)
+            query = query.order_by(ElectricityPrice.timestamp.desc()).limit(limit)
             result = await session.execute(query)
             return result.scalars().all()
 
+    async def _get_buckets():
+        async with get_read_sessionmaker()() as session:
+            start, end = start_dt, end_dt
+            if start is None:
+                # The last `limit` buckets up to the latest stored price
+                latest = select(func.max(ElectricityPrice.timestamp)).where(
+                    ElectricityPrice.indicator_id == indicator_id
+                )
+                if zone is not None:
+                    latest = latest.where(ElectricityPrice.zone_id == zone)
+                end = await session.scalar(latest)
+                if end is None:
+                    return []
+                start = end - BUCKETS[bucket] * (limit - 1)
+
+            rows = await aggregate_prices(session, indicator_id, bucket, start, end, zone)
+            return sorted(rows, key=lambda row: (row.bucket, row.zone_id), reverse=True)[:limit]
+
     try:
-        results = asyncio.run(_get_prices())
+        results = asyncio.run(_get_buckets() if bucket else _get_prices())
     except Exception as e:
-        console.print(f"[red]Error fetching prices: {e}[/red]")
+        get_console().print(f"[red]Error fetching prices: {e}[/red]")
         return
 
     if not results:
-        console.print("[yellow]No prices found.[/yellow]")
+        get_console().print("[yellow]No prices found.[/yellow]")
+        return
+
+    if bucket:
+        table = Table(title=f"Electricity Prices per {bucket}, indicator {indicator_id} (€/MWh)")
+        table.add_column("Bucket (UTC)", style="cyan")
+        for column in ("Open", "High", "Low", "Close", "Avg"):
+            table.add_column(column, style="green", justify="right")
+        table.add_column("Count", justify="right")
+        table.add_column("Zone", style="magenta")
+
+        for row in results:
+            table.add_row(
+                row.bucket.strftime("%Y-%m-%d %H:%M"),
+                *(f"{value:.2f}" for value in (row.open, row.high, row.low, row.close, row.avg)),
+                str(row.count),
+                str(row.zone_id),
+            )
+        get_console().print(table)
         return
 
-    table = Table(title=f"Electricity Prices (Top {len(results)})")
+    table = Table(title=f"Electricity Prices, indicator {indicator_id} (Top {len(results)})")
     table.add_column("Time (UTC)", style="cyan")
     table.add_column("Price (€/MWh)", style="green", justify="right")
     table.add_column("Zone", style="magenta")
@@ -114,7 +304,349 @@ def prices(
     for p in results:
         table.add_row(p.timestamp.strftime("%Y-%m-%d %H:%M"), f"{p.price:.2f}", str(p.zone_id))
 
-    console.print(table)
+    get_console().print(table)
+
+
+@app.command()
+def export(
+    output: str = typer.Option("-", "--output", "-o", help="Output file ('-' for stdout)"),
+    format: str = typer.Option("ndjson", help="ndjson, csv, parquet or arrow"),
+    start_date: str = typer.Option(None, help="Start date (YYYY-MM-DD)"),
+    end_date: str = typer.Option(None, help="End date (YYYY-MM-DD, inclusive)"),
+    zone: int = typer.Option(None, help="Only this geo zone"),
+    indicator: int = typer.Option(None, help="ESIOS indicator (default: ESIOS_DEFAULT_INDICATOR)"),
+):
+    """Stream stored prices to a file in constant memory."""
+    import asyncio
+
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.core.database import get_read_sessionmaker
+    from esios_ingestor.export import check_format, encode_batches, iter_price_batches
+
+    indicator_id = indicator or settings.ESIOS_DEFAULT_INDICATOR
+
+    try:
+        check_format(format)
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_dt = (
+            datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1, microseconds=-1)
+            if end_date
+            else None
+        )
+    except ValueError as e:
+        get_console().print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1) from e
+
+    async def _export(sink) -> int:
+        written = 0
+        async with get_read_sessionmaker()() as session:
+            batches = iter_price_batches(
+                session, indicator_id, zone, start_dt, end_dt, settings.EXPORT_BATCH_SIZE
+            )
+            async for chunk in encode_batches(batches, format):
+                sink.write(chunk)
+                written += len(chunk)
+        return written
+
+    try:
+        if output == "-":
+            written = asyncio.run(_export(sys.stdout.buffer))
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, "wb") as sink:
+                written = asyncio.run(_export(sink))
+            get_console().print(
+                f"[green]Wrote {written} bytes to {output}[/green]", highlight=False
+            )
+    except Exception as e:
+        get_console().print(f"[red]Export failed: {e}[/red]")
+        raise typer.Exit(code=1) from e
+
+
+@app.command()
+def gaps(
+    indicator: int = typer.Option(None, help="Only this ESIOS indicator"),
+    zone: int = typer.Option(None, help="Only this geo zone"),
+):
+    """List missing intervals inside the stored history of each series."""
+    import asyncio
+
+    from rich.table import Table
+
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.core.database import get_read_sessionmaker
+    from esios_ingestor.ingestion.coverage import find_gaps, stored_series
+
+    step = timedelta(minutes=settings.INGESTION_STEP_MINUTES)
+
+    async def _find_gaps():
+        async with get_read_sessionmaker()() as session:
+            series_list = None
+            if indicator is not None or zone is not None:
+                series_list = await stored_series(session, indicator, zone)
+            return await find_gaps(session, step, series_list)
+
+    try:
+        results = asyncio.run(_find_gaps())
+    except Exception as e:
+        get_console().print(f"[red]Error finding gaps: {e}[/red]")
+        raise typer.Exit(code=1) from e
+
+    if not results:
+        get_console().print("[green]No gaps found.[/green]")
+        return
+
+    table = Table(title=f"Gaps in stored history ({len(results)})")
+    table.add_column("Indicator", style="magenta")
+    table.add_column("Zone", style="magenta")
+    table.add_column("From (UTC)", style="cyan")
+    table.add_column("To (UTC)", style="cyan")
+    table.add_column("Missing", style="red", justify="right")
+
+    for gap in results:
+        table.add_row(
+            str(gap.series.indicator_id),
+            str(gap.series.geo_id),
+            gap.start.strftime("%Y-%m-%d %H:%M"),
+            gap.end.strftime("%Y-%m-%d %H:%M"),
+            str(gap.missing_points(step)),
+        )
+
+    get_console().print(table)
+    get_console().print("Run [bold]esios ingest[/bold] without dates to fill them.")
+
+
+@app.command()
+def partitions(
+    retention: bool = typer.Option(False, help="Apply the RETENTION_MONTHS policy now"),
+    keep_months: int = typer.Option(None, min=1, help="Override RETENTION_MONTHS"),
+    action: str = typer.Option(None, help="Override RETENTION_ACTION (detach or drop)"),
+    dry_run: bool = typer.Option(False, help="Only show what retention would retire"),
+):
+    """List monthly price partitions, creating upcoming ones; optionally apply retention."""
+    import asyncio
+
+    from rich.table import Table
+
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.core.database import get_engine
+    from esios_ingestor.core.partitions import (
+        apply_retention,
+        ensure_future_partitions,
+        list_partitions,
+    )
+
+    keep_months = keep_months or settings.RETENTION_MONTHS
+    action = action or settings.RETENTION_ACTION
+
+    if retention and not keep_months:
+        get_console().print("[red]Set RETENTION_MONTHS or pass --keep-months[/red]")
+        raise typer.Exit(code=1)
+    if action not in ("detach", "drop"):
+        get_console().print("[red]Action must be 'detach' or 'drop'[/red]")
+        raise typer.Exit(code=1)
+
+    async def _partitions():
+        engine = get_engine()
+        await ensure_future_partitions(engine, settings.PARTITION_PREMAKE_MONTHS)
+        retired = []
+        if retention:
+            retired = await apply_retention(engine, keep_months, action, dry_run=dry_run)
+        async with engine.connect() as conn:
+            return retired, await list_partitions(conn)
+
+    try:
+        retired, results = asyncio.run(_partitions())
+    except Exception as e:
+        get_console().print(f"[red]Error managing partitions: {e}[/red]")
+        raise typer.Exit(code=1) from e
+
+    table = Table(title=f"Partitions of electricity_prices ({len(results)})")
+    table.add_column("Partition", style="cyan")
+    table.add_column("Month", style="magenta")
+    table.add_column("Size", style="green", justify="right")
+
+    for partition in results:
+        table.add_row(
+            partition.name,
+            partition.month.strftime("%Y-%m"),
+            f"{partition.total_bytes / 1024 / 1024:.1f} MB",
+        )
+
+    get_console().print(table)
+
+    if retention:
+        verb = f"Would {action}" if dry_run else {"detach": "Detached", "drop": "Dropped"}[action]
+        get_console().print(f"{verb}: {', '.join(retired) if retired else 'nothing'}")
+
+
+backfill_app = typer.Typer(help="Resumable backfills of long date ranges")
+app.add_typer(backfill_app, name="backfill")
+
+
+def _run_backfill(job_id: int | None, concurrency: int | None, create=None) -> None:
+    """Run a job, after creating it with `create()` if given, in one event loop."""
+    import asyncio
+
+    from esios_ingestor.ingestion.backfill import BackfillError, run_job
+
+    async def _run():
+        nonlocal job_id
+        if create is not None:
+            job = await create()
+            job_id = job.id
+            get_console().print(f"Backfill job [bold]{job.id}[/bold]: {job.total_windows} windows.")
+        return await run_job(job_id, concurrency)
+
+    try:
+        progress = asyncio.run(_run())
+    except BackfillError as e:
+        get_console().print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1) from e
+    except Exception as e:
+        get_console().print(f"[red]Backfill failed: {e}[/red]")
+        if job_id is not None:
+            get_console().print(
+                f"Run [bold]esios backfill resume {job_id}[/bold] "
+                "to continue from the last stored window."
+            )
+        raise typer.Exit(code=1) from e
+
+    color = "green" if progress.status == "succeeded" else "yellow"
+    get_console().print(f"[{color}]{progress.summary()} ({progress.status})[/{color}]")
+
+
+@backfill_app.command("start")
+def backfill_start(
+    start_date: str = typer.Option(..., help="Start date (YYYY-MM-DD)"),
+    end_date: str = typer.Option(..., help="End date (YYYY-MM-DD, inclusive)"),
+    window_days: int = typer.Option(None, min=1, help="Window size in days"),
+    concurrency: int = typer.Option(None, min=1, help="Windows fetched concurrently"),
+):
+    """
+    Create a backfill job for every configured series and run it.
+
+    Every stored window is recorded, so an interrupted job continues where it
+    stopped with `esios backfill resume`.
+    """
+    from esios_ingestor.core.config import settings
+    from esios_ingestor.ingestion.backfill import create_job
+    from esios_ingestor.ingestion.service import configured_series
+
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1, seconds=-1)
+    except ValueError as e:
+        get_console().print("[red]Invalid date format. Use YYYY-MM-DD[/red]")
+        raise typer.Exit(code=1) from e
+
+    if start_dt > end_dt:
+        get_console().print("[red]Error: start_date must be before or equal to end_date[/red]")
+        raise typer.Exit(code=1)
+
+    async def _create():
+        return await create_job(
+            start_dt,
+            end_dt,
+            window_days or settings.INGESTION_WINDOW_DAYS,
+            configured_series(),
+        )
+
+    _run_backfill(None, concurrency, create=_create)
+
+
+@backfill_app.command("resume")
+def backfill_resume(
+    job_id: int = typer.Argument(..., help="Job to resume"),
+    concurrency: int = typer.Option(None, min=1, help="Windows fetched concurrently"),
+):
+    """Continue a failed, interrupted or cancelled job after its last stored window."""
+    _run_backfill(job_id, concurrency)
+
+
+@backfill_app.command("cancel")
+def backfill_cancel(job_id: int = typer.Argument(..., help="Job to cancel")):
+    """Stop a job; a process running it finishes the windows in flight and exits."""
+    import asyncio
+
+    from esios_ingestor.ingestion.backfill import BackfillError, cancel_job
+
+    try:
+        asyncio.run(cancel_job(job_id))
+    except BackfillError as e:
+        get_console().print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1) from e
+    get_console().print(f"[yellow]Backfill job {job_id} cancelled.[/yellow]")
+
+
+@backfill_app.command("status")
+def backfill_status(
+    job_id: int = typer.Argument(None, help="Only this job (default: the 10 most recent)"),
+):
+    """Show progress, rows/s and ETA of backfill jobs."""
+    import asyncio
+
+    from rich.table import Table
+
+    from esios_ingestor.core.database import get_sessionmaker
+    from esios_ingestor.ingestion.backfill import (
+        BackfillError,
+        format_duration,
+        get_job,
+        job_is_active,
+        job_progress,
+        list_jobs,
+    )
+
+    async def _status():
+        async with get_sessionmaker()() as session:
+            jobs = [await get_job(session, job_id)] if job_id else await list_jobs(session)
+            results = []
+            for job in jobs:
+                progress = await job_progress(session, job)
+                if job.status == "running" and not await job_is_active(session, job.id):
+                    # Its process died without recording why; resume picks it up
+                    progress.status = "interrupted"
+                results.append((job, progress))
+            return results
+
+    try:
+        results = asyncio.run(_status())
+    except BackfillError as e:
+        get_console().print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1) from e
+
+    if not results:
+        get_console().print("[yellow]No backfill jobs.[/yellow]")
+        return
+
+    table = Table(title="Backfill jobs")
+    table.add_column("Job", style="bold")
+    table.add_column("Status", style="magenta")
+    table.add_column("Range", style="cyan")
+    table.add_column("Series", justify="right")
+    table.add_column("Windows", justify="right")
+    table.add_column("Rows", style="green", justify="right")
+    table.add_column("Rows/s", justify="right")
+    table.add_column("ETA", justify="right")
+
+    for job, progress in results:
+        rate = progress.rows_per_second
+        table.add_row(
+            str(job.id),
+            progress.status,
+            f"{job.start_date:%Y-%m-%d} - {job.end_date:%Y-%m-%d}",
+            str(len(job.series)),
+            f"{progress.done_windows}/{progress.total_windows} ({progress.fraction:.0%})",
+            f"{progress.rows:,}",
+            f"{rate:,.0f}" if rate is not None else "-",
+            format_duration(progress.eta_seconds) if progress.status == "running" else "-",
+        )
+
+    get_console().print(table)
+    for job, _ in results:
+        if job.error and job.status == "failed":
+            get_console().print(f"[red]Job {job.id}: {job.error}[/red]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from esios_ingestor.core.database import Base
+
+
+class BackfillJob(Base):
+    """One `esios backfill` range; its progress is the set of completed windows."""
+
+    __tablename__ = "backfill_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # pending, running, succeeded, failed or cancelled
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    start_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    end_date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    window_days: Mapped[int] = mapped_column(Integer)
+    series: Mapped[list] = mapped_column(JSONB)  # [[indicator_id, geo_id], ...]
+    total_windows: Mapped[int] = mapped_column(Integer)
+    replica: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Last (re)start; rows/s and ETA are measured from here
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<BackfillJob(id={self.id}, status={self.status}, {self.start_date} - {self.end_date})>"
+
+
+class BackfillWindow(Base):
+    """A window of a backfill job, recorded in the transaction that stored its prices."""
+
+    __tablename__ = "backfill_windows"
+
+    job_id: Mapped[int] = mapped_column(
+        ForeignKey("backfill_jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    indicator_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    zone_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    end: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    inserted: Mapped[int] = mapped_column(Integer)
+    skipped: Mapped[int] = mapped_column(Integer)
+    completed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
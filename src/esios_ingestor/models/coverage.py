@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from esios_ingestor.core.database import Base
+
+
+class SeriesWatermark(Base):
+    """Stored coverage bounds of one (indicator, zone) series, maintained by ingestion."""
+
+    __tablename__ = "series_watermarks"
+
+    indicator_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    zone_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    first_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    last_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # Holes up to here were fetched once; what is still missing ESIOS does not have
+    verified_through: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return (
+            f"<Watermark(series={self.indicator_id}/{self.zone_id}, "
+            f"{self.first_timestamp} - {self.last_timestamp})>"
+        )
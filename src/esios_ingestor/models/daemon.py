@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from esios_ingestor.core.database import Base
+
+
+class IngestionCycle(Base):
+    """One scheduled daemon slot; lets replicas run each slot only once."""
+
+    __tablename__ = "ingestion_cycles"
+
+    slot: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16))  # running, succeeded or failed
+    replica: Mapped[str] = mapped_column(String(255))
+    attempts: Mapped[int] = mapped_column(Integer, default=1)
+    inserted: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<IngestionCycle(slot={self.slot}, status={self.status}, replica={self.replica})>"
@@ -1,20 +1,35 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, UniqueConstraint
+from sqlalchemy import DateTime, Float, Index, Integer, PrimaryKeyConstraint, SmallInteger
 from sqlalchemy.orm import Mapped, mapped_column
 
 from esios_ingestor.core.database import Base
 
 
 class ElectricityPrice(Base):
+    """
+    Price series keyed by (indicator_id, zone_id, timestamp), range-partitioned
+    by UTC month on `timestamp`.
+
+    The natural key is the primary key: there is no surrogate id, and the PK
+    index serves per-series range scans and keyset pages. A second btree on
+    (indicator_id, timestamp, zone_id) serves pages across zones, where zones
+    interleave per timestamp. Partitions are managed by `esios_ingestor.core.partitions`.
+    """
+
     __tablename__ = "electricity_prices"
 
-    __table_args__ = (UniqueConstraint("timestamp", "zone_id", name="uq_price_timestamp_zone"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("indicator_id", "zone_id", "timestamp"),
+        Index("idx_indicator_timestamp_zone", "indicator_id", "timestamp", "zone_id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # Fixed-width columns first, widest to narrowest, to avoid alignment padding
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
     price: Mapped[float] = mapped_column(Float)
-    zone_id: Mapped[int] = mapped_column(Integer)
+    indicator_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    zone_id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
 
     def __repr__(self):
-        return f"<Price(time={self.timestamp}, val={self.price})>"
+        return f"<Price(indicator={self.indicator_id}, time={self.timestamp}, val={self.price})>"
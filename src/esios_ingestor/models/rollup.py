@@ -0,0 +1,35 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from esios_ingestor.core.database import Base
+
+
+class DailyPriceRollup(Base):
+    """Per-day aggregates of one series (UTC days), maintained by ingestion."""
+
+    __tablename__ = "price_daily_rollups"
+
+    indicator_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    zone_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    price_sum: Mapped[float] = mapped_column(Float)
+    price_count: Mapped[int] = mapped_column(Integer)
+    price_min: Mapped[float] = mapped_column(Float)
+    price_max: Mapped[float] = mapped_column(Float)
+
+
+class HourOfDayPriceRollup(Base):
+    """Per-month, per-hour-of-day aggregates of one series (UTC), maintained by ingestion."""
+
+    __tablename__ = "price_hour_of_day_rollups"
+
+    indicator_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    zone_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    hour: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    price_sum: Mapped[float] = mapped_column(Float)
+    price_count: Mapped[int] = mapped_column(Integer)
+    price_min: Mapped[float] = mapped_column(Float)
+    price_max: Mapped[float] = mapped_column(Float)
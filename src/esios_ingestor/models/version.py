@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from esios_ingestor.core.database import Base
+
+
+class DataVersion(Base):
+    """Single-row counter bumped by every ingestion commit that inserts prices."""
+
+    __tablename__ = "data_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<DataVersion(version={self.version}, updated_at={self.updated_at})>"
+
+
+async def bump_data_version(bind: AsyncConnection | AsyncSession) -> None:
+    """Increment the data version read API caches are keyed on; commits with `bind`."""
+    stmt = insert(DataVersion).values(id=1, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    )
+    await bind.execute(stmt)
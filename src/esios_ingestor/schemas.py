@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import NamedTuple, TypedDict
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class EsiosValue(BaseModel):
@@ -24,3 +25,49 @@ class EsiosIndicator(BaseModel):
 
 class EsiosResponse(BaseModel):
     indicator: EsiosIndicator
+
+
+class Series(NamedTuple):
+    """One ingested time series: an ESIOS indicator in one geo zone."""
+
+    indicator_id: int
+    geo_id: int
+
+
+# Lean decode path for ingestion: validates only the fields that are stored and
+# skips building an EsiosValue model per value. Extra keys are ignored.
+
+
+class EsiosPricePoint(TypedDict):
+    datetime_utc: datetime
+    value: float
+    geo_id: int
+
+
+class EsiosPriceIndicator(TypedDict):
+    values: list[EsiosPricePoint]
+
+
+class EsiosPricePayload(TypedDict):
+    indicator: EsiosPriceIndicator
+
+
+PriceRow = tuple[datetime, float, int]
+
+price_payload_adapter = TypeAdapter(EsiosPricePayload)
+
+
+def parse_price_rows(body: bytes) -> list[PriceRow]:
+    """
+    Decode a raw ESIOS indicator response into (datetime_utc, value, geo_id) rows.
+
+    JSON is parsed and validated in one pass by pydantic-core, straight from bytes.
+
+    Raises:
+        pydantic.ValidationError: If the payload is malformed.
+    """
+    payload = price_payload_adapter.validate_json(body)
+    return [
+        (point["datetime_utc"], point["value"], point["geo_id"])
+        for point in payload["indicator"]["values"]
+    ]
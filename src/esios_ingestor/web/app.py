@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -6,9 +7,26 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from tenacity import retry, stop_after_attempt, wait_fixed
 
-from esios_ingestor.core.database import Base, engine, get_db
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import (
+    Base,
+    dispose_engines,
+    get_db,
+    get_engine,
+    get_read_sessionmaker,
+    read_router,
+)
 from esios_ingestor.core.logger import setup_logging
-from esios_ingestor.core.metrics import setup_instrumentator
+from esios_ingestor.core.metrics import (
+    clean_multiprocess_dir,
+    mark_process_dead,
+    setup_instrumentator,
+)
+from esios_ingestor.core.partitions import ensure_future_partitions
+from esios_ingestor.models import backfill, coverage, daemon, price, rollup, version  # noqa: F401  (register tables for create_all)
+from esios_ingestor.web.cache import response_cache
+from esios_ingestor.web.events import PriceListener, price_events
+from esios_ingestor.web.hot_cache import hot_prices
 from esios_ingestor.web.routes import router as prices_router
 
 logger = logging.getLogger(__name__)
@@ -17,16 +35,25 @@ logger = logging.getLogger(__name__)
 @retry(stop=stop_after_attempt(5), wait=wait_fixed(2))
 async def init_db():
     logger.info("Initializing database connection...")
+    engine = get_engine()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await ensure_future_partitions(engine, settings.PARTITION_PREMAKE_MONTHS)
     logger.info("Database tables verified.")
 
 
+def _on_prices_changed() -> None:
+    response_cache.expire_version()
+    if hot_prices.version is not None:
+        hot_prices.schedule_refresh()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan with graceful startup and shutdown."""
     setup_logging()
     logger.info("Application starting up...")
+    clean_multiprocess_dir()
 
     try:
         await init_db()
@@ -35,11 +62,33 @@ async def lifespan(app: FastAPI):
         logger.error("Critical: Database connection failed.", exc_info=True)
         raise e
 
+    if settings.HOT_CACHE_DAYS:
+        # Not fatal: until it loads, every read goes to Postgres
+        try:
+            async with get_read_sessionmaker()() as session:
+                await hot_prices.load(session)
+        except Exception:
+            logger.warning("Hot price cache failed to load.", exc_info=True)
+
+    # One LISTEN connection feeds /prices/stream and expires the read caches
+    listener = PriceListener(price_events, on_change=_on_prices_changed)
+    tasks = [asyncio.create_task(listener.run())]
+
+    if settings.POSTGRES_REPLICA_HOST:
+        # Routing is per process: every worker fails over and back on its own
+        tasks.append(asyncio.create_task(read_router.run_checks(settings.DB_REPLICA_CHECK_SECONDS)))
+
     yield
 
     # Graceful shutdown sequence
     logger.info("Shutting down application...")
-    await engine.dispose()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await hot_prices.aclose()
+    await dispose_engines()
+    # Uvicorn workers end by re-raising SIGTERM, which skips atexit
+    mark_process_dead()
     logger.info("Graceful shutdown complete")
 
 
@@ -67,13 +116,15 @@ async def health_check(db: AsyncSession = Depends(get_db)):
 
 
 @app.get("/ready")
-async def readiness_check(db: AsyncSession = Depends(get_db)):
+async def readiness_check():
     """
     Readiness probe for orchestrators (Kubernetes, Docker Swarm).
     Returns 200 when ready to receive traffic, 503 otherwise.
+
+    Also checks the read replica (if configured): while it is unreachable,
+    reads fail over to the primary and `reads` reports "primary".
     """
     try:
-        await db.execute(text("SELECT 1"))
-        return {"ready": True}
+        return {"ready": True, "reads": await read_router.check()}
     except Exception:
         raise HTTPException(status_code=503, detail={"ready": False}) from None
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.metrics import API_CACHE_HITS_TOTAL, API_CACHE_MISSES_TOTAL
+from esios_ingestor.models.version import DataVersion
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+
+class CachedResponse(NamedTuple):
+    version: int
+    body: bytes
+    etag: str
+    headers: dict[str, str]
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered JSON responses, keyed by path and query parameters.
+
+    Entries are tagged with the ingestion data version they were built from
+    and are stale as soon as ingestion commits new prices. The version itself
+    is re-read from the database at most every `version_ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int, version_ttl: float):
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._version: int | None = None
+        self._version_read_at = 0.0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._version = None
+
+    def expire_version(self) -> None:
+        """Re-read the data version on the next request (e.g. on an ingestion notification)."""
+        self._version = None
+
+    async def data_version(self, db: AsyncSession) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._version_read_at >= self.version_ttl:
+            result = await db.execute(select(DataVersion.version).where(DataVersion.id == 1))
+            self._version = result.scalar_one_or_none() or 0
+            self._version_read_at = now
+        return self._version
+
+    def get(self, key: str, version: int) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        # Same rendering as pydantic and orjson's OPT_UTC_Z ("Z" for UTC)
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact JSON of plain data (dicts, lists, str, numbers, datetimes).
+
+    Uses orjson when installed (the `speedups` extra), which encodes large row
+    lists several times faster than the standard library. Both produce the same
+    bytes, so ETags do not change with the encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, separators=(",", ":"), ensure_ascii=False, default=_json_default
+    ).encode()
+
+
+response_cache = ResponseCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_VERSION_TTL)
+
+
+def _cache_key(request: Request, extra: tuple) -> str:
+    query = sorted(request.query_params.multi_items())
+    return json.dumps([request.url.path, query, [str(part) for part in extra]])
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def cached_json(
+    request: Request,
+    db: AsyncSession,
+    build: Callable[[], Awaitable[tuple[Any, dict[str, str]]]],
+    extra_key: tuple = (),
+) -> Response:
+    """
+    Serve a JSON response from the cache, building it with `build()` on a miss.
+
+    `build()` returns the content and any extra headers (e.g. pagination
+    links), which are cached with the body. Content already encoded to
+    `bytes` is used as the body as is. `extra_key` adds inputs that are
+    not query parameters (e.g. the current day for "last N days" windows).
+    Responses carry a content-hash ETag and
+    `Cache-Control`; a matching `If-None-Match` gets `304 Not Modified`.
+    """
+    endpoint = request.url.path
+    key = _cache_key(request, extra_key)
+    version = await response_cache.data_version(db)
+
+    entry = response_cache.get(key, version)
+    if entry is not None:
+        API_CACHE_HITS_TOTAL.labels(endpoint=endpoint).inc()
+    else:
+        API_CACHE_MISSES_TOTAL.labels(endpoint=endpoint).inc()
+        content, extra_headers = await build()
+        body = content if isinstance(content, bytes) else dumps(jsonable_encoder(content))
+        etag = f'"{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        entry = CachedResponse(version, body, etag, extra_headers)
+        response_cache.put(key, entry)
+
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={settings.CACHE_MAX_AGE}",
+    }
+
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import logging
+import secrets
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from typing import NamedTuple
+
+import asyncpg
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import PRICES_CHANNEL
+from esios_ingestor.core.metrics import (
+    STREAM_EVENTS_TOTAL,
+    STREAM_OVERFLOWS_TOTAL,
+    STREAM_SUBSCRIBERS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PriceEvent(NamedTuple):
+    epoch: str  # Of the broker that numbered it
+    seq: int
+    name: str  # "prices", or "resync" when notifications may have been missed
+    data: dict
+
+    @property
+    def id(self) -> str:
+        """SSE id, `<epoch>:<seq>`."""
+        return f"{self.epoch}:{self.seq}"
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.name}\ndata: {json.dumps(self.data)}\n\n".encode()
+
+    def matches(self, indicator_id: int | None, zone_id: int | None) -> bool:
+        if self.name != "prices":
+            return True
+        return (indicator_id is None or self.data["indicator_id"] == indicator_id) and (
+            zone_id is None or self.data["zone_id"] == zone_id
+        )
+
+
+# Queued instead of an event when a subscriber falls too far behind
+OVERFLOW = None
+
+
+class Subscriber:
+    __slots__ = ("queue", "indicator_id", "zone_id")
+
+    def __init__(self, queue_size: int, indicator_id: int | None, zone_id: int | None):
+        self.queue: asyncio.Queue[PriceEvent | None] = asyncio.Queue(queue_size)
+        self.indicator_id = indicator_id
+        self.zone_id = zone_id
+
+
+class PriceEventBroker:
+    """
+    In-process fan-out of price events to `/prices/stream` subscribers.
+
+    Every subscriber has a bounded queue. Publishing never waits: a
+    subscriber whose queue is full is sent an overflow marker and dropped, and
+    can reconnect with `Last-Event-ID` to get the events it missed replayed
+    from the last `replay_size`. Idle subscribers cost one queue each and
+    nothing on the database.
+
+    Event ids are `<epoch>:<seq>`: sequence numbers are per process, and the
+    random epoch tells a reconnecting client's id apart from one handed out
+    by another worker or before a restart, which get a "resync" instead.
+    """
+
+    def __init__(self, queue_size: int, replay_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+        self.recent: deque[PriceEvent] = deque(maxlen=replay_size)
+        self.epoch = secrets.token_hex(4)
+        self.last_id = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    def publish(self, name: str, data: dict) -> PriceEvent:
+        self.last_id += 1
+        event = PriceEvent(self.epoch, self.last_id, name, data)
+        self.recent.append(event)
+        STREAM_EVENTS_TOTAL.labels(event=name).inc()
+
+        for subscriber in list(self.subscribers):
+            if not event.matches(subscriber.indicator_id, subscriber.zone_id):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._overflow(subscriber)
+        return event
+
+    def _overflow(self, subscriber: Subscriber) -> None:
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(OVERFLOW)
+        self.unsubscribe(subscriber)
+        STREAM_OVERFLOWS_TOTAL.inc()
+
+    def subscribe(
+        self,
+        indicator_id: int | None = None,
+        zone_id: int | None = None,
+        last_event_id: str | None = None,
+    ) -> Subscriber:
+        subscriber = Subscriber(self.queue_size, indicator_id, zone_id)
+
+        if last_event_id is not None:
+            missed = self._missed_since(last_event_id)
+            if missed is not None:
+                missed = [event for event in missed if event.matches(indicator_id, zone_id)]
+            if missed is None or len(missed) > self.queue_size:
+                missed = [
+                    PriceEvent(self.epoch, self.last_id, "resync", {"reason": "events expired"})
+                ]
+            for event in missed:
+                subscriber.queue.put_nowait(event)
+
+        self.subscribers.add(subscriber)
+        STREAM_SUBSCRIBERS.set(len(self.subscribers))
+        return subscriber
+
+    def _missed_since(self, last_event_id: str) -> list[PriceEvent] | None:
+        """
+        Events after `last_event_id`, or None if some of them are no longer
+        kept or the id was not handed out by this broker.
+        """
+        epoch, _, seq = last_event_id.partition(":")
+        if epoch != self.epoch:
+            # Another worker's id, or one from before a restart: it says nothing about ours
+            return None
+        try:
+            last_id = int(seq)
+        except ValueError:
+            return None
+        if last_id > self.last_id:
+            return None
+        if last_id < self.last_id and (not self.recent or self.recent[0].seq > last_id + 1):
+            return None
+        return [event for event in self.recent if event.seq > last_id]
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+        STREAM_SUBSCRIBERS.set(len(self.subscribers))
+
+    async def stream(
+        self,
+        indicator_id: int | None = None,
+        zone_id: int | None = None,
+        last_event_id: str | None = None,
+        keepalive: float | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Server-Sent Events for one subscriber, with comment keepalives while idle."""
+        keepalive = keepalive or settings.STREAM_KEEPALIVE_SECONDS
+        subscriber = self.subscribe(indicator_id, zone_id, last_event_id)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), keepalive)
+                except TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is OVERFLOW:
+                    yield b'event: overflow\ndata: {"reason": "client too slow"}\n\n'
+                    return
+                yield event.encode()
+        finally:
+            self.unsubscribe(subscriber)
+
+
+class PriceListener:
+    """
+    The process's one LISTEN connection on PRICES_CHANNEL, straight to the
+    primary (notifications are not replicated).
+
+    Each notification is published to the broker, and `on_change` is called.
+    The connection is pinged while idle and re-opened with backoff when
+    lost; after a reconnect subscribers get a "resync" event, since
+    notifications sent in between are gone.
+    """
+
+    def __init__(self, broker: PriceEventBroker, on_change: Callable[[], None] | None = None):
+        self.broker = broker
+        self.on_change = on_change
+        self.connected = asyncio.Event()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed {channel} notification: {payload[:200]}")
+            return
+        self.broker.publish("prices", data)
+        if self.on_change is not None:
+            self.on_change()
+
+    async def run(self, ping_interval: float = 30.0, ping_timeout: float = 10.0) -> None:
+        delay = 1.0
+        reconnect = False
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(
+                    host=settings.POSTGRES_HOST,
+                    port=settings.POSTGRES_PORT,
+                    user=settings.POSTGRES_USER,
+                    password=settings.POSTGRES_PASSWORD,
+                    database=settings.POSTGRES_DB,
+                )
+                await conn.add_listener(PRICES_CHANNEL, self._on_notify)
+                logger.info(f"Listening for {PRICES_CHANNEL} notifications.")
+                self.connected.set()
+                delay = 1.0
+
+                if reconnect:
+                    self.broker.publish("resync", {"reason": "listener reconnected"})
+                    if self.on_change is not None:
+                        self.on_change()
+                reconnect = True
+
+                while True:
+                    await asyncio.sleep(ping_interval)
+                    # Bounded, so a half-open TCP connection is noticed instead of hanging
+                    await conn.execute("SELECT 1", timeout=ping_timeout)
+
+            except (OSError, TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                self.connected.clear()
+                logger.warning(f"{PRICES_CHANNEL} listener lost ({e!r}); retrying in {delay:.0f}s.")
+            finally:
+                if conn is not None:
+                    conn.terminate()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+
+price_events = PriceEventBroker(
+    settings.STREAM_QUEUE_SIZE, settings.STREAM_REPLAY_EVENTS, settings.STREAM_MAX_SUBSCRIBERS
+)
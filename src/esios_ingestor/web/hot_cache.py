@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from heapq import merge
+from itertools import islice
+from typing import Literal, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import get_read_sessionmaker
+from esios_ingestor.core.metrics import HOT_CACHE_HITS_TOTAL, HOT_CACHE_MISSES_TOTAL, HOT_CACHE_ROWS
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _micros(value: datetime) -> int:
+    # Naive datetimes are compared as UTC, like Postgres does for timestamptz parameters
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class HotSeries(NamedTuple):
+    """One series as parallel arrays, sorted by timestamp (UTC epoch microseconds)."""
+
+    timestamps: array
+    prices: array
+
+
+class HotRow(NamedTuple):
+    zone_id: int
+    timestamp: datetime
+    price: float
+
+
+def _zone_rows(
+    zone_id: int, series: HotSeries, positions: range
+) -> Iterator[tuple[int, int, float]]:
+    """(timestamp, zone_id, price) of one zone at `positions`, for merging across zones."""
+    for i in positions:
+        yield series.timestamps[i], zone_id, series.prices[i]
+
+
+class HotPriceCache:
+    """
+    The last HOT_CACHE_DAYS of every series, held per process as parallel
+    arrays of timestamps and prices, to answer recent `/prices` reads without
+    a database round-trip.
+
+    The cache holds every row at or after `since` as of data version
+    `version`. Queries it can answer exactly (a range starting at or after
+    `since`, or the latest rows of one zone) are served by binary search;
+    anything else, or any query once ingestion has bumped the data version,
+    goes to Postgres while the cache reloads in the background.
+    """
+
+    def __init__(self, days: int):
+        self.days = days
+        self.version: int | None = None
+        self.since: datetime | None = None
+        self.series: dict[int, dict[int, HotSeries]] = {}
+        self._refresh: asyncio.Task | None = None
+
+    def clear(self) -> None:
+        self.version = None
+        self.since = None
+        self.series = {}
+
+    async def load(self, session: AsyncSession) -> None:
+        """Read the window from the database and swap it in."""
+        # Version first: rows committed in between only make the cache look older than it is
+        version = await session.scalar(select(DataVersion.version).where(DataVersion.id == 1))
+        since = datetime.now(UTC) - timedelta(days=self.days)
+
+        result = await session.execute(
+            select(
+                ElectricityPrice.indicator_id,
+                ElectricityPrice.zone_id,
+                ElectricityPrice.timestamp,
+                ElectricityPrice.price,
+            )
+            .where(ElectricityPrice.timestamp >= since)
+            .order_by(
+                ElectricityPrice.indicator_id,
+                ElectricityPrice.zone_id,
+                ElectricityPrice.timestamp,
+            )
+        )
+
+        series: dict[int, dict[int, HotSeries]] = {}
+        rows = 0
+        for indicator_id, zone_id, timestamp, price in result:
+            zones = series.setdefault(indicator_id, {})
+            hot = zones.get(zone_id)
+            if hot is None:
+                hot = zones[zone_id] = HotSeries(array("q"), array("d"))
+            hot.timestamps.append(_micros(timestamp))
+            hot.prices.append(price)
+            rows += 1
+
+        self.series, self.since, self.version = series, since, version or 0
+        HOT_CACHE_ROWS.set(rows)
+        logger.info(f"Hot price cache loaded: {rows} rows since {since:%Y-%m-%d %H:%M} UTC.")
+
+    async def _reload(self) -> None:
+        try:
+            async with get_read_sessionmaker()() as session:
+                await self.load(session)
+        except Exception:
+            logger.warning("Hot price cache refresh failed.", exc_info=True)
+
+    def schedule_refresh(self) -> None:
+        """Reload in the background, unless a reload is already running."""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._reload())
+
+    async def aclose(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+            await asyncio.gather(self._refresh, return_exceptions=True)
+
+    def rows(
+        self,
+        version: int,
+        indicator_id: int,
+        zone_id: int | None,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        order: Literal["asc", "desc"],
+        after: tuple[int, datetime] | None,
+        count: int,
+    ) -> list[HotRow] | None:
+        """
+        Up to `count` rows ordered by (timestamp, zone_id), exactly as the
+        database would return them, or None if the cache cannot tell.
+
+        Filters and the keyset cursor `after` follow `GET /prices`.
+        """
+        if self.version is None:
+            return None
+        if version != self.version:
+            self.schedule_refresh()
+            HOT_CACHE_MISSES_TOTAL.inc()
+            return None
+
+        start_us = _micros(start_date) if start_date is not None else None
+        end_us = _micros(end_date) if end_date is not None else None
+        covered = start_us is not None and start_us >= _micros(self.since)
+        # Without a covered start, only the latest rows of one zone are known to be complete
+        if not covered and (zone_id is None or order == "asc"):
+            HOT_CACHE_MISSES_TOTAL.inc()
+            return None
+
+        zones = self.series.get(indicator_id, {})
+        zone_ids = [zone_id] if zone_id is not None else list(zones)
+
+        ordered = []
+        for zone in zone_ids:
+            series = zones.get(zone)
+            if series is None:
+                continue
+            timestamps = series.timestamps
+            lo = bisect_left(timestamps, start_us) if start_us is not None else 0
+            hi = bisect_right(timestamps, end_us) if end_us is not None else len(timestamps)
+
+            if after is not None:
+                # Rows past (after_timestamp, after_zone): at that timestamp only the zones beyond it
+                after_zone, after_timestamp = after
+                after_us = _micros(after_timestamp)
+                if order == "asc":
+                    cut = bisect_right if zone <= after_zone else bisect_left
+                    lo = max(lo, cut(timestamps, after_us))
+                else:
+                    cut = bisect_left if zone >= after_zone else bisect_right
+                    hi = min(hi, cut(timestamps, after_us))
+
+            positions = range(lo, hi) if order == "asc" else range(hi - 1, lo - 1, -1)
+            ordered.append(_zone_rows(zone, series, positions))
+
+        rows = [
+            HotRow(zone, EPOCH + timedelta(microseconds=timestamp), price)
+            for timestamp, zone, price in islice(merge(*ordered, reverse=order == "desc"), count)
+        ]
+        if len(rows) == count:
+            HOT_CACHE_HITS_TOTAL.inc()
+            return rows
+
+        # Fewer rows than asked for: complete only if nothing older than `since` can match
+        if not covered:
+            HOT_CACHE_MISSES_TOTAL.inc()
+            return None
+        HOT_CACHE_HITS_TOTAL.inc()
+        return rows
+
+
+hot_prices = HotPriceCache(settings.HOT_CACHE_DAYS)
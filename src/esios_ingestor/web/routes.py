@@ -1,12 +1,35 @@
-from datetime import UTC, datetime, timedelta
+import base64
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
+from typing import Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import extract, func, select
+from sqlalchemy import Select, extract, func, select, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from esios_ingestor.core.database import get_db
+from esios_ingestor.aggregate import (
+    AGGREGATE_COLUMNS,
+    Bucket,
+    BucketError,
+    aggregate_prices,
+    check_bucket_range,
+)
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import get_read_db
+from esios_ingestor.export import (
+    MEDIA_TYPES,
+    ExportFormatError,
+    check_format,
+    encode_batches,
+    iter_price_batches,
+)
 from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.rollup import DailyPriceRollup, HourOfDayPriceRollup
+from esios_ingestor.web.cache import cached_json, dumps, response_cache
+from esios_ingestor.web.events import price_events
+from esios_ingestor.web.hot_cache import hot_prices
 
 router = APIRouter()
 
@@ -15,91 +38,374 @@ class PriceResponse(BaseModel):
     timestamp: datetime
     price: float
     zone_id: int
+    indicator_id: int
     model_config = ConfigDict(from_attributes=True)
 
 
-@router.get("/prices", response_model=list[PriceResponse])
+class PriceColumnsResponse(BaseModel):
+    """`/prices?format=columns`: one entry per row in each array."""
+
+    indicator_id: int
+    zone_ids: list[int]
+    timestamps: list[datetime]
+    prices: list[float]
+
+
+def _encode_cursor(zone_id: int, timestamp: datetime) -> str:
+    """Opaque keyset cursor pointing at the last row of a page."""
+    raw = f"{zone_id}|{timestamp.isoformat()}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, datetime]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        zone_id, timestamp = raw.split("|")
+        return int(zone_id), datetime.fromisoformat(timestamp)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+@router.get("/prices", response_model=list[PriceResponse] | PriceColumnsResponse)
 async def get_prices(
-    limit: int = Query(24, ge=1, le=168),
+    request: Request,
+    limit: int = Query(24, ge=1, le=5000),
     start_date: datetime | None = None,
-    db: AsyncSession = Depends(get_db),
+    end_date: datetime | None = None,
+    zone_id: int | None = Query(None, description="Geo zone (default: all zones)"),
+    order: Literal["asc", "desc"] = Query("desc", description="Order by (timestamp, zone_id)"),
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    indicator_id: int = Query(settings.ESIOS_DEFAULT_INDICATOR, description="ESIOS indicator"),
+    format: Literal["rows", "columns"] = Query(
+        "rows", description="A list of prices, or one object of parallel arrays"
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get electricity prices.
     By default returns the latest prices.
+
+    Rows are ordered by (timestamp, zone_id), so without `zone_id` the zones
+    are interleaved per timestamp. When more rows match, the response carries
+    an `X-Next-Cursor` header (and a `Link: rel="next"`); pass it back as
+    `cursor` with the same filters to get the next page. Each page starts
+    right after the cursor, so with `zone_id` it is a range scan of the
+    (indicator_id, zone_id, timestamp) index and deep pages cost the same as
+    the first.
+
+    `format=columns` returns `{"indicator_id", "zone_ids", "timestamps",
+    "prices"}` with one array entry per row instead of a list of objects,
+    which is about half the size for large pages.
+
+    Responses are cached until the next ingestion and support `If-None-Match`.
+    Recent ranges are answered from the in-memory hot cache when it covers them.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+
+    async def build():
+        version = await response_cache.data_version(db)
+        rows = hot_prices.rows(
+            version, indicator_id, zone_id, start_date, end_date, order, after, limit + 1
+        )
+
+        if rows is None:
+            query = _price_page_query(indicator_id, zone_id, start_date, end_date, order, after)
+            # One extra row tells whether there is a next page
+            result = await db.execute(query.limit(limit + 1))
+            rows = result.all()
+
+        return _encode_prices(rows[:limit], indicator_id, format), _next_page_headers(
+            request, rows, limit
+        )
+
+    return await cached_json(request, db, build)
+
+
+def _price_page_query(
+    indicator_id: int,
+    zone_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    order: Literal["asc", "desc"],
+    after: tuple[int, datetime] | None,
+) -> Select:
     """
-    query = select(ElectricityPrice).order_by(ElectricityPrice.timestamp.desc())
+    `/prices` rows after the cursor, ordered by (timestamp, zone_id).
 
+    With zone_id the primary key serves it; across zones the
+    (indicator_id, timestamp, zone_id) index does, so no page sorts.
+    """
+    # Plain (zone_id, timestamp, price) tuples: no ORM instances, no per-row validation
+    query = select(
+        ElectricityPrice.zone_id, ElectricityPrice.timestamp, ElectricityPrice.price
+    ).where(ElectricityPrice.indicator_id == indicator_id)
+    # Zones interleave per timestamp; with zone_id this is plain timestamp order
+    key = tuple_(ElectricityPrice.timestamp, ElectricityPrice.zone_id)
+
+    if zone_id is not None:
+        query = query.where(ElectricityPrice.zone_id == zone_id)
     if start_date:
         query = query.where(ElectricityPrice.timestamp >= start_date)
+    if end_date:
+        query = query.where(ElectricityPrice.timestamp <= end_date)
+
+    if after:
+        after_zone, after_timestamp = after
+        after_key = tuple_(after_timestamp, after_zone)
+        query = query.where(key > after_key if order == "asc" else key < after_key)
+    if order == "asc":
+        return query.order_by(ElectricityPrice.timestamp.asc(), ElectricityPrice.zone_id.asc())
+    return query.order_by(ElectricityPrice.timestamp.desc(), ElectricityPrice.zone_id.desc())
+
+
+def _encode_prices(
+    rows: Sequence[tuple[int, datetime, float]],
+    indicator_id: int,
+    format: Literal["rows", "columns"],
+) -> bytes:
+    """JSON body of `(zone_id, timestamp, price)` rows, as PriceResponse or PriceColumnsResponse."""
+    if format == "columns":
+        zone_ids, timestamps, prices = zip(*rows, strict=True) if rows else ((), (), ())
+        return dumps(
+            {
+                "indicator_id": indicator_id,
+                "zone_ids": zone_ids,
+                "timestamps": timestamps,
+                "prices": prices,
+            }
+        )
+    return dumps(
+        [
+            {"timestamp": timestamp, "price": price, "zone_id": zone, "indicator_id": indicator_id}
+            for zone, timestamp, price in rows
+        ]
+    )
+
+
+def _next_page_headers(request: Request, rows: Sequence, limit: int) -> dict[str, str]:
+    """Cursor headers when `rows` (fetched with one extra row) holds more than a page."""
+    if len(rows) <= limit:
+        return {}
+    last = rows[limit - 1]
+    next_cursor = _encode_cursor(last.zone_id, last.timestamp)
+    next_url = request.url.include_query_params(cursor=next_cursor)
+    return {"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'}
+
+
+@router.get("/prices/aggregate")
+async def get_price_aggregates(
+    request: Request,
+    bucket: Bucket = Query(..., description="Bucket size"),
+    start_date: datetime = Query(..., description="Rounded down to the start of its bucket"),
+    end_date: datetime | None = Query(None, description="Default: up to the latest price"),
+    zone_id: int | None = Query(None, description="Geo zone (default: all zones)"),
+    indicator_id: int = Query(settings.ESIOS_DEFAULT_INDICATOR, description="ESIOS indicator"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Open, high, low, close, average and count of prices per time bucket.
+
+    Buckets are 15 minutes, 1 hour, 1 day or 1 week (days and weeks start at
+    00:00 UTC, weeks on Monday), ordered by (zone_id, bucket). Postgres
+    reduces the rows, so the response size depends on the number of
+    buckets, which is limited to AGGREGATE_MAX_BUCKETS per request.
+
+    Responses are cached until the next ingestion and support `If-None-Match`.
+    """
+    try:
+        check_bucket_range(
+            bucket, start_date, end_date or datetime.now(UTC), settings.AGGREGATE_MAX_BUCKETS
+        )
+    except BucketError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+    async def build():
+        rows = await aggregate_prices(db, indicator_id, bucket, start_date, end_date, zone_id)
+        return dumps([dict(zip(AGGREGATE_COLUMNS, row, strict=True)) for row in rows]), {}
+
+    return await cached_json(request, db, build)
+
+
+@router.get("/prices/stream")
+async def stream_prices(
+    request: Request,
+    indicator_id: int | None = Query(None, description="Only this ESIOS indicator"),
+    zone_id: int | None = Query(None, description="Only this geo zone"),
+):
+    """
+    Server-Sent Events announcing newly ingested prices, instead of polling.
+
+    Each `prices` event carries `indicator_id`, `zone_id`, the `start` and
+    `end` of the inserted range and the `inserted` count; fetch the rows from
+    `/prices`. A `resync` event means events may have been missed (refetch
+    what you need); `overflow` means the client read too slowly and was
+    disconnected. Reconnecting with `Last-Event-ID` replays recent events.
+    Idle connections get a comment line every STREAM_KEEPALIVE_SECONDS.
+    """
+    if price_events.full:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
 
-    query = query.limit(limit)
+    return StreamingResponse(
+        price_events.stream(indicator_id, zone_id, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/prices/export")
+async def export_prices(
+    format: Literal["ndjson", "csv", "parquet", "arrow"] = Query("ndjson"),
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    zone_id: int | None = Query(None, description="Geo zone (default: all zones)"),
+    indicator_id: int = Query(settings.ESIOS_DEFAULT_INDICATOR, description="ESIOS indicator"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Stream every matching price, ordered by (zone_id, timestamp).
+
+    Rows are read from a server-side cursor and encoded in chunks of
+    EXPORT_BATCH_SIZE, so memory stays flat for any range. Parquet and Arrow
+    need the optional `pyarrow` package.
+    """
+    try:
+        check_format(format)
+    except ExportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+    batches = iter_price_batches(
+        db, indicator_id, zone_id, start_date, end_date, settings.EXPORT_BATCH_SIZE
+    )
+    return StreamingResponse(
+        encode_batches(batches, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="prices-{indicator_id}.{format}"'},
+    )
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=UTC)
+
+
+def _hour_of_day_sources(indicator_id: int, cutoff_day: date, today: date) -> list:
+    """
+    Per-hour (hour, price_sum, price_count) selects covering [cutoff_day, now].
+
+    Whole months come from the hour-of-day rollup; only the partial first and
+    current months are aggregated from raw prices, so the raw scan is bounded
+    to about two months however long the window is.
+    """
+    hour = extract("hour", func.timezone("UTC", ElectricityPrice.timestamp))
 
-    result = await db.execute(query)
-    prices = result.scalars().all()
+    def raw(start: date, end: date | None):
+        query = select(
+            hour.label("hour"),
+            func.sum(ElectricityPrice.price).label("price_sum"),
+            func.count().label("price_count"),
+        ).where(
+            ElectricityPrice.indicator_id == indicator_id,
+            ElectricityPrice.timestamp >= _utc_midnight(start),
+        )
+        if end is not None:
+            query = query.where(ElectricityPrice.timestamp < _utc_midnight(end))
+        return query.group_by(hour)
+
+    first_full_month = cutoff_day if cutoff_day.day == 1 else _next_month(cutoff_day)
+    current_month = _month_start(today)
 
-    return prices
+    if first_full_month >= current_month:
+        return [raw(cutoff_day, None)]
+
+    rolled_up = (
+        select(
+            HourOfDayPriceRollup.hour.label("hour"),
+            func.sum(HourOfDayPriceRollup.price_sum).label("price_sum"),
+            func.sum(HourOfDayPriceRollup.price_count).label("price_count"),
+        )
+        .where(
+            HourOfDayPriceRollup.indicator_id == indicator_id,
+            HourOfDayPriceRollup.month >= first_full_month,
+            HourOfDayPriceRollup.month < current_month,
+        )
+        .group_by(HourOfDayPriceRollup.hour)
+    )
+
+    return [raw(cutoff_day, first_full_month), rolled_up, raw(current_month, None)]
 
 
 @router.get("/prices/stats")
 async def get_price_stats(
-    days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    days: int = Query(7, ge=1, le=3650, description="Number of days to analyze"),
+    indicator_id: int = Query(settings.ESIOS_DEFAULT_INDICATOR, description="ESIOS indicator"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Get aggregated statistics for electricity prices over the last N days.
+    Get aggregated statistics for electricity prices over the last N days (UTC days).
+
+    Served from the daily and hour-of-day rollups maintained by ingestion, so
+    the cost stays flat as the window grows.
 
     Returns:
         - avg_price: Average price in the period
         - max_price: Maximum price recorded
         - min_price: Minimum price recorded
-        - peak_hour: Hour of day (0-23) with highest average price
-        - cheapest_hour: Hour of day (0-23) with lowest average price
+        - peak_hour: Hour of day (0-23, UTC) with highest average price
+        - cheapest_hour: Hour of day (0-23, UTC) with lowest average price
+
+    Responses are cached until the next ingestion (or the next UTC day) and
+    support `If-None-Match`.
     """
-    cutoff_date = datetime.now(UTC) - timedelta(days=days)
+    now = datetime.now(UTC)
+
+    async def build():
+        return await _price_stats(db, days, indicator_id, now), {}
+
+    return await cached_json(request, db, build, extra_key=(now.date(),))
+
+
+async def _price_stats(db: AsyncSession, days: int, indicator_id: int, now: datetime) -> dict:
+    cutoff_day = (now - timedelta(days=days)).date()
 
     stats_query = select(
-        func.avg(ElectricityPrice.price).label("avg_price"),
-        func.max(ElectricityPrice.price).label("max_price"),
-        func.min(ElectricityPrice.price).label("min_price"),
-    ).where(ElectricityPrice.timestamp >= cutoff_date)
+        (func.sum(DailyPriceRollup.price_sum) / func.sum(DailyPriceRollup.price_count)).label(
+            "avg_price"
+        ),
+        func.max(DailyPriceRollup.price_max).label("max_price"),
+        func.min(DailyPriceRollup.price_min).label("min_price"),
+    ).where(
+        DailyPriceRollup.indicator_id == indicator_id,
+        DailyPriceRollup.day >= cutoff_day,
+    )
 
     result = await db.execute(stats_query)
     stats = result.one()
 
-    peak_query = (
-        select(
-            extract("hour", ElectricityPrice.timestamp).label("hour"),
-            func.avg(ElectricityPrice.price).label("avg_price"),
-        )
-        .where(ElectricityPrice.timestamp >= cutoff_date)
-        .group_by(extract("hour", ElectricityPrice.timestamp))
-        .order_by(func.avg(ElectricityPrice.price).desc())
-        .limit(1)
-    )
-
-    peak_result = await db.execute(peak_query)
-    peak_hour = peak_result.scalar()
+    sources = union_all(*_hour_of_day_sources(indicator_id, cutoff_day, now.date())).subquery()
+    hours_query = select(
+        sources.c.hour,
+        (func.sum(sources.c.price_sum) / func.sum(sources.c.price_count)).label("avg_price"),
+    ).group_by(sources.c.hour)
 
-    cheap_query = (
-        select(
-            extract("hour", ElectricityPrice.timestamp).label("hour"),
-            func.avg(ElectricityPrice.price).label("avg_price"),
-        )
-        .where(ElectricityPrice.timestamp >= cutoff_date)
-        .group_by(extract("hour", ElectricityPrice.timestamp))
-        .order_by(func.avg(ElectricityPrice.price).asc())
-        .limit(1)
-    )
+    hours_result = await db.execute(hours_query)
+    hourly_averages = {int(hour): avg for hour, avg in hours_result.all()}
 
-    cheap_result = await db.execute(cheap_query)
-    cheapest_hour = cheap_result.scalar()
+    peak_hour = max(hourly_averages, key=hourly_averages.get, default=None)
+    cheapest_hour = min(hourly_averages, key=hourly_averages.get, default=None)
 
     return {
         "period": f"last_{days}_days",
-        "avg_price": round(float(stats.avg_price), 2) if stats.avg_price else None,
-        "max_price": round(float(stats.max_price), 2) if stats.max_price else None,
-        "min_price": round(float(stats.min_price), 2) if stats.min_price else None,
-        "peak_hour": int(peak_hour) if peak_hour is not None else None,
-        "cheapest_hour": int(cheapest_hour) if cheapest_hour is not None else None,
+        "avg_price": round(float(stats.avg_price), 2) if stats.avg_price is not None else None,
+        "max_price": round(float(stats.max_price), 2) if stats.max_price is not None else None,
+        "min_price": round(float(stats.min_price), 2) if stats.min_price is not None else None,
+        "peak_hour": peak_hour,
+        "cheapest_hour": cheapest_hour,
     }
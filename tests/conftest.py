@@ -5,8 +5,10 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from esios_ingestor.core.config import settings
-from esios_ingestor.core.database import Base, get_db
+from esios_ingestor.core.database import Base, dispose_engines, get_db, get_read_db
 from esios_ingestor.web.app import app
+from esios_ingestor.web.cache import response_cache
+from esios_ingestor.web.hot_cache import hot_prices
 
 test_engine = create_async_engine(settings.DATABASE_URL, echo=False, poolclass=NullPool)
 
@@ -28,6 +30,13 @@ async def setup_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def dispose_app_engines():
+    """Each test runs in its own event loop; don't keep app engine connections across them."""
+    yield
+    await dispose_engines()
+
+
 @pytest.fixture(scope="function")
 async def db_session():
     """
@@ -48,6 +57,9 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    response_cache.clear()
+    hot_prices.clear()
 
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
@@ -1,5 +1,24 @@
+import csv
+import io
+import json
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.metrics import (
+    API_CACHE_HITS_TOTAL,
+    API_CACHE_MISSES_TOTAL,
+    HOT_CACHE_HITS_TOTAL,
+)
+from esios_ingestor.ingestion.service import write_prices
+from esios_ingestor.models.version import bump_data_version
+from esios_ingestor.web import cache
+from esios_ingestor.web.cache import response_cache
+from esios_ingestor.web.hot_cache import hot_prices
+from esios_ingestor.web.routes import _price_page_query
 
 pytestmark = pytest.mark.asyncio
 
@@ -66,3 +85,375 @@ async def test_price_statistics(client: AsyncClient):
 
         if data["peak_hour"] is not None:
             assert 0 <= data["peak_hour"] <= 23
+
+
+async def test_price_statistics_match_raw_prices(client: AsyncClient, db_session):
+    """Stats served from the rollups agree with aggregating the raw prices."""
+    indicator_id = -7
+    now = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    start = now - timedelta(days=100)
+    rows = [
+        (start + timedelta(hours=i), float((start + timedelta(hours=i)).hour + i % 5), -100)
+        for i in range(100 * 24 + 1)
+    ]
+
+    try:
+        await write_prices(db_session, indicator_id, rows)
+
+        response = await client.get(f"/prices/stats?days=60&indicator_id={indicator_id}")
+        assert response.status_code == 200
+        data = response.json()
+
+        cutoff = datetime.combine((now - timedelta(days=60)).date(), datetime.min.time(), UTC)
+        prices = [price for ts, price, _ in rows if ts >= cutoff]
+        assert data["avg_price"] == round(sum(prices) / len(prices), 2)
+        assert data["max_price"] == max(prices)
+        assert data["min_price"] == min(prices)
+        assert data["peak_hour"] == 23
+        assert data["cheapest_hour"] == 0
+    finally:
+        await db_session.rollback()
+
+
+async def test_prices_cached_until_data_version_changes(
+    client: AsyncClient, db_session, monkeypatch
+):
+    """Repeated reads hit the cache, honour If-None-Match and refresh after an ingestion."""
+    monkeypatch.setattr(response_cache, "version_ttl", 0)
+    url = "/prices?limit=5&indicator_id=-8"
+
+    try:
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        assert first.json() == []
+        assert "max-age" in first.headers["cache-control"]
+
+        misses = API_CACHE_MISSES_TOTAL.labels(endpoint="/prices")._value.get()
+        hits = API_CACHE_HITS_TOTAL.labels(endpoint="/prices")._value.get()
+
+        not_modified = await client.get(url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == etag
+        assert API_CACHE_HITS_TOTAL.labels(endpoint="/prices")._value.get() == hits + 1
+
+        await write_prices(db_session, -8, [(datetime(2001, 1, 1, tzinfo=UTC), 1.5, -100)])
+        # Not visible to the cache until ingestion bumps the data version
+        assert (await client.get(url)).json() == []
+
+        await bump_data_version(db_session)
+        refreshed = await client.get(url, headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+        assert [item["price"] for item in refreshed.json()] == [1.5]
+        assert API_CACHE_MISSES_TOTAL.labels(endpoint="/prices")._value.get() == misses + 1
+    finally:
+        await db_session.rollback()
+
+
+async def test_prices_keyset_pagination(client: AsyncClient, db_session):
+    """Following X-Next-Cursor walks every matching row once, in either order."""
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+    rows = [(start + timedelta(hours=i), float(i), zone) for zone in (-101, -100) for i in range(7)]
+
+    try:
+        await write_prices(db_session, -9, rows)
+
+        for order in ("asc", "desc"):
+            seen, cursor = [], None
+            while True:
+                url = f"/prices?indicator_id=-9&limit=3&order={order}"
+                response = await client.get(url + (f"&cursor={cursor}" if cursor else ""))
+                assert response.status_code == 200
+                seen += [(item["zone_id"], item["price"]) for item in response.json()]
+                cursor = response.headers.get("x-next-cursor")
+                if cursor is None:
+                    break
+                assert 'rel="next"' in response.headers["link"]
+
+            expected = [
+                (zone, price) for _, price, zone in sorted(rows, key=lambda r: (r[0], r[2]))
+            ]
+            assert seen == (expected if order == "asc" else expected[::-1])
+
+        response = await client.get(
+            "/prices",
+            params={
+                "indicator_id": -9,
+                "zone_id": -100,
+                "start_date": (start + timedelta(hours=2)).isoformat(),
+                "end_date": (start + timedelta(hours=4)).isoformat(),
+                "order": "asc",
+            },
+        )
+        assert [item["price"] for item in response.json()] == [2.0, 3.0, 4.0]
+        assert "x-next-cursor" not in response.headers
+    finally:
+        await db_session.rollback()
+
+
+async def test_prices_default_returns_latest_across_zones(client: AsyncClient, db_session):
+    """Without zone_id the latest timestamps come first, whatever their zone."""
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+    rows = [(start + timedelta(hours=i), float(i), zone) for zone in (-101, -100) for i in range(5)]
+    # Only the lower zone has the newest hour
+    rows.append((start + timedelta(hours=5), 5.0, -101))
+
+    try:
+        await write_prices(db_session, -15, rows)
+
+        response = await client.get("/prices?indicator_id=-15&limit=3")
+        assert response.status_code == 200
+        assert [(item["zone_id"], item["price"]) for item in response.json()] == [
+            (-101, 5.0),
+            (-100, 4.0),
+            (-101, 4.0),
+        ]
+
+        following = await client.get(
+            f"/prices?indicator_id=-15&limit=3&cursor={response.headers['x-next-cursor']}"
+        )
+        assert [(item["zone_id"], item["price"]) for item in following.json()] == [
+            (-100, 3.0),
+            (-101, 3.0),
+            (-100, 2.0),
+        ]
+    finally:
+        await db_session.rollback()
+
+
+@pytest.mark.parametrize("after", [None, (-100, datetime(2001, 2, 1, tzinfo=UTC))])
+async def test_prices_across_zones_page_through_an_index(db_session, after):
+    """Without zone_id, pages walk the (indicator_id, timestamp, zone_id) index instead of sorting."""
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+    rows = [(start + timedelta(days=i), float(i), zone) for zone in (-101, -100) for i in range(60)]
+
+    try:
+        await write_prices(db_session, -16, rows)
+        await db_session.execute(text("ANALYZE electricity_prices"))
+        # Tiny test partitions are cheaper to scan; only an index that matches avoids the sort
+        await db_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        query = _price_page_query(-16, None, None, None, "desc", after).limit(25)
+        sql = query.compile(dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = "\n".join((await db_session.execute(text(f"EXPLAIN {sql}"))).scalars())
+
+        assert "indicator_id_timestamp_zone_id_idx" in plan
+        assert "Sort" not in plan
+    finally:
+        await db_session.rollback()
+
+
+async def test_prices_columnar_format(client: AsyncClient, db_session):
+    """format=columns carries the same rows as parallel arrays."""
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+    rows = [
+        (start + timedelta(hours=i), float(i) / 3, zone) for zone in (-101, -100) for i in range(3)
+    ]
+
+    try:
+        await write_prices(db_session, -13, rows)
+
+        url = "/prices?indicator_id=-13&order=asc&limit=4"
+        listed = (await client.get(url)).json()
+        response = await client.get(url + "&format=columns")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "indicator_id": -13,
+            "zone_ids": [item["zone_id"] for item in listed],
+            "timestamps": [item["timestamp"] for item in listed],
+            "prices": [item["price"] for item in listed],
+        }
+        assert listed[0] == {
+            "timestamp": "2001-01-01T00:00:00Z",
+            "price": 0.0,
+            "zone_id": -101,
+            "indicator_id": -13,
+        }
+        assert "x-next-cursor" in response.headers
+    finally:
+        await db_session.rollback()
+
+
+async def test_json_encoders_produce_identical_bytes(monkeypatch):
+    """ETags hash the body, so orjson and the standard library must agree byte for byte."""
+    orjson = pytest.importorskip("orjson")
+    body = {
+        "indicator_id": 1001,
+        "zone_ids": (8741, 8742),
+        "timestamps": [
+            datetime(2025, 1, 1, tzinfo=UTC),
+            datetime(2025, 3, 30, 1, 15, 30, 250000, tzinfo=UTC),
+        ],
+        "prices": [0.0, 123.45, -0.5, 1 / 3, 99999.99, 7],
+        "rows": [{"timestamp": datetime(2025, 1, 1, tzinfo=UTC), "price": 64.1, "zone_id": 3}],
+        "name": "Península €/MWh",
+        "missing": None,
+        "settled": True,
+    }
+
+    monkeypatch.setattr(cache, "orjson", orjson)
+    fast = cache.dumps(body)
+    monkeypatch.setattr(cache, "orjson", None)
+
+    assert cache.dumps(body) == fast
+
+
+async def test_prices_openapi_documents_both_formats(client: AsyncClient):
+    schema = (await client.get("/openapi.json")).json()
+    response = schema["paths"]["/prices"]["get"]["responses"]["200"]
+    options = response["content"]["application/json"]["schema"]["anyOf"]
+
+    assert {"$ref": "#/components/schemas/PriceColumnsResponse"} in options
+    assert {"type": "array", "items": {"$ref": "#/components/schemas/PriceResponse"}} in options
+
+
+async def test_price_aggregates_per_bucket(client: AsyncClient, db_session):
+    """Quarter-hour prices reduce to one OHLC row per bucket, matching Python."""
+    start = datetime(2001, 1, 1, tzinfo=UTC)  # A Monday
+    rows = [
+        (start + timedelta(minutes=15 * i), float((i * 37) % 11), zone)
+        for zone in (-101, -100)
+        for i in range(4 * 24 * 9)
+    ]
+
+    try:
+        await write_prices(db_session, -14, rows)
+
+        for bucket, width in (("1h", timedelta(hours=1)), ("1w", timedelta(weeks=1))):
+            response = await client.get(
+                "/prices/aggregate",
+                params={
+                    "indicator_id": -14,
+                    "zone_id": -100,
+                    "bucket": bucket,
+                    "start_date": (start + timedelta(minutes=30)).isoformat(),
+                    "end_date": (start + timedelta(days=9)).isoformat(),
+                },
+            )
+            assert response.status_code == 200
+
+            buckets: dict[datetime, list[float]] = {}
+            for timestamp, price, zone in rows:
+                if zone == -100:
+                    buckets.setdefault(start + (timestamp - start) // width * width, []).append(
+                        price
+                    )
+            expected = [
+                {
+                    "bucket": key.isoformat().replace("+00:00", "Z"),
+                    "zone_id": -100,
+                    "open": prices[0],
+                    "high": max(prices),
+                    "low": min(prices),
+                    "close": prices[-1],
+                    "avg": pytest.approx(sum(prices) / len(prices)),
+                    "count": len(prices),
+                }
+                for key, prices in sorted(buckets.items())
+            ]
+            assert response.json() == expected
+
+        too_many = await client.get(
+            "/prices/aggregate",
+            params={"bucket": "15m", "start_date": "2000-01-01T00:00:00Z"},
+        )
+        assert too_many.status_code == 400
+        unknown = await client.get(
+            "/prices/aggregate", params={"bucket": "5m", "start_date": start.isoformat()}
+        )
+        assert unknown.status_code == 422
+    finally:
+        await db_session.rollback()
+
+
+async def test_hot_cache_answers_like_the_database(client: AsyncClient, db_session, monkeypatch):
+    """Recent reads served from the in-memory arrays match the database, pages included."""
+    monkeypatch.setattr(response_cache, "version_ttl", 0)
+    now = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    rows = [
+        (now - timedelta(hours=i), float(i) + zone / 1000, zone)
+        for zone in (-101, -100)
+        for i in range(-24, 24 * 10)
+    ]
+    queries = [
+        # Covered range, all zones and one zone, both orders
+        {"start_date": now - timedelta(days=3), "limit": 50},
+        {"start_date": now - timedelta(days=3), "order": "asc", "limit": 50},
+        {"start_date": now - timedelta(days=2), "end_date": now, "zone_id": -100, "limit": 500},
+        # Latest rows of one zone, no start: only the first page fits in the window
+        {"zone_id": -101, "limit": 100},
+    ]
+    # Not covered: older than the window, or oldest-first without a start
+    uncovered = [
+        {"start_date": now - timedelta(days=9), "limit": 50},
+        {"zone_id": -101, "order": "asc", "limit": 5},
+    ]
+
+    async def pages(params: dict) -> list[tuple[list, str | None]]:
+        params = {"indicator_id": -12, **params}
+        seen, cursor = [], None
+        while True:
+            response_cache.clear()
+            response = await client.get("/prices", params={**params, "cursor": cursor or []})
+            assert response.status_code == 200
+            cursor = response.headers.get("x-next-cursor")
+            seen.append((response.json(), cursor))
+            if cursor is None:
+                return seen
+
+    try:
+        await write_prices(db_session, -12, rows)
+        await bump_data_version(db_session)
+        expected = [await pages(params) for params in queries + uncovered]
+
+        await hot_prices.load(db_session)
+        hits = HOT_CACHE_HITS_TOTAL._value.get()
+        assert [await pages(params) for params in queries] == expected[: len(queries)]
+        hits += sum(len(query_pages) for query_pages in expected[: len(queries) - 1]) + 1
+        assert HOT_CACHE_HITS_TOTAL._value.get() == hits
+
+        assert [await pages(params) for params in uncovered] == expected[len(queries) :]
+        assert HOT_CACHE_HITS_TOTAL._value.get() == hits
+    finally:
+        hot_prices.clear()
+        await db_session.rollback()
+
+
+async def test_prices_rejects_invalid_cursor(client: AsyncClient):
+    response = await client.get("/prices?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+async def test_export_streams_every_format(client: AsyncClient, db_session, monkeypatch):
+    """Exports return every matching row, ordered by zone and time, across batches."""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 4)
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+    rows = [(start + timedelta(hours=i), float(i), zone) for zone in (-100, -101) for i in range(5)]
+    expected = sorted((zone, price) for _, price, zone in rows)
+
+    try:
+        await write_prices(db_session, -10, rows)
+
+        response = await client.get("/prices/export?format=ndjson&indicator_id=-10")
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [(line["zone_id"], line["price"]) for line in lines] == expected
+
+        response = await client.get("/prices/export?format=csv&indicator_id=-10&zone_id=-100")
+        header, *records = list(csv.reader(io.StringIO(response.text)))
+        assert header == ["timestamp", "price", "zone_id", "indicator_id"]
+        assert [float(record[1]) for record in records] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+        pq = pytest.importorskip("pyarrow.parquet")
+        response = await client.get("/prices/export?format=parquet&indicator_id=-10")
+        table = pq.read_table(io.BytesIO(response.content))
+        pairs = zip(table["zone_id"].to_pylist(), table["price"].to_pylist(), strict=True)
+        assert list(pairs) == expected
+    finally:
+        await db_session.rollback()
+
+
+async def test_export_rejects_unknown_format(client: AsyncClient):
+    response = await client.get("/prices/export?format=xlsx")
+    assert response.status_code == 422
@@ -0,0 +1,127 @@
+import json
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+
+from esios_ingestor.ingestion.archive import ArchiveReader, ResponseArchive
+from esios_ingestor.ingestion.client import EsiosClient
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+END = START + timedelta(hours=23)
+JANUARY = (START, datetime(2025, 1, 31, 23, 59, 59, tzinfo=UTC))
+
+
+def esios_body(value: float) -> bytes:
+    values = [{"datetime_utc": "2025-01-01T00:00:00Z", "value": value, "geo_id": 8741}]
+    return json.dumps({"indicator": {"values": values}}).encode()
+
+
+def test_identical_bodies_are_stored_once(tmp_path):
+    archive = ResponseArchive(tmp_path)
+
+    first = archive.put(1001, 8741, START, END, esios_body(1.0))
+    second = archive.put(1001, 8742, START, END, esios_body(1.0))
+
+    assert first.digest == second.digest
+    assert len(list((tmp_path / "objects").rglob("*.json.gz"))) == 1
+    assert archive.read(archive.lookup(1001, 8742, START, END)) == esios_body(1.0)
+    assert archive.lookup(1001, 8743, START, END) is None
+
+
+def test_entries_filter_by_series_and_range(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    for day in range(3):
+        start = START + timedelta(days=day)
+        archive.put(1001, 8741, start, start + timedelta(hours=23), esios_body(day))
+    archive.put(600, 8741, START, END, esios_body(9.0))
+
+    entries = list(archive.entries(1001, start=START + timedelta(days=1)))
+
+    assert [entry.start for entry in entries] == [
+        START + timedelta(days=1),
+        START + timedelta(days=2),
+    ]
+    assert len(list(archive.entries())) == 4
+
+
+@pytest.mark.asyncio
+async def test_client_skips_settled_windows(tmp_path):
+    """Open months are fetched and archived; settled ones are served from disk."""
+    archive = ResponseArchive(tmp_path, settle=timedelta(days=3))
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=esios_body(len(requests)))
+
+    async with EsiosClient(transport=httpx.MockTransport(handler), archive=archive) as client:
+        # Archived right after the month ended: not settled, fetched again
+        archive.put(1001, 8741, *JANUARY, esios_body(0.0), fetched_at=JANUARY[1])
+        rows = await client.fetch_price_rows(1001, 8741, START, END)
+        assert rows[0][1] == 1.0
+        assert len(requests) == 1
+
+        # Now archived days after the month ended: served without a request
+        rows = await client.fetch_price_rows(1001, 8741, START, END)
+        assert rows[0][1] == 1.0
+        assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_archives_calendar_months(tmp_path):
+    """Windows with arbitrary bounds share one archive entry per month."""
+    archive = ResponseArchive(tmp_path)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=esios_body(1.0))
+
+    async with EsiosClient(transport=httpx.MockTransport(handler), archive=archive) as client:
+        for offset in (0, 5, 17):
+            start = START + timedelta(hours=offset)
+            assert await client.fetch_price_rows(1001, 8741, start, start + timedelta(days=1)) == (
+                [(START, 1.0, 8741)] if offset == 0 else []
+            )
+        await client.fetch_price_rows(
+            1001, 8741, START + timedelta(days=30), START + timedelta(days=32)
+        )
+
+    # January is fetched once, then settled; the last window only adds February
+    assert [request.url.params["start_date"] for request in requests] == [
+        "2025-01-01T00:00:00+00:00",
+        "2025-02-01T00:00:00+00:00",
+    ]
+    assert [(entry.start, entry.end) for entry in archive.entries()] == [
+        JANUARY,
+        (datetime(2025, 2, 1, tzinfo=UTC), datetime(2025, 2, 28, 23, 59, 59, tzinfo=UTC)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_broken_bodies_are_not_archived(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"not json"))
+
+    async with EsiosClient(transport=transport, archive=archive) as client:
+        with pytest.raises(ValueError):
+            await client.fetch_price_rows(1001, 8741, START, END)
+
+    assert archive.lookup(1001, 8741, START, END) is None
+
+
+@pytest.mark.asyncio
+async def test_reader_replays_archived_rows(tmp_path):
+    archive = ResponseArchive(tmp_path)
+    archive.put(1001, 8741, START, END, esios_body(42.0))
+    reader = ArchiveReader(archive)
+
+    assert await reader.fetch_price_rows(1001, 8741, START, END) == [(START, 42.0, 8741)]
+
+    # Any window inside archived months is cut out of them
+    archive.put(1001, 8742, *JANUARY, esios_body(7.0))
+    assert await reader.fetch_price_rows(1001, 8742, START, END) == [(START, 7.0, 8741)]
+
+    with pytest.raises(LookupError):
+        await reader.fetch_price_rows(1001, 8743, START, END)
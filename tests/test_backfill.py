@@ -0,0 +1,99 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from esios_ingestor.ingestion.backfill import (
+    BackfillError,
+    cancel_job,
+    create_job,
+    job_progress,
+    run_job,
+)
+from esios_ingestor.models.backfill import BackfillJob
+from esios_ingestor.models.coverage import SeriesWatermark
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.rollup import DailyPriceRollup, HourOfDayPriceRollup
+from esios_ingestor.schemas import Series
+
+TEST_INDICATOR_ID = -30
+SERIES = [Series(TEST_INDICATOR_ID, -100), Series(TEST_INDICATOR_ID, -101)]
+START = datetime(2001, 1, 1, tzinfo=UTC)
+
+
+class FakeClient:
+    """Two hourly prices per window; fails on the fetch numbered `fail_at`."""
+
+    def __init__(self, fail_at: int | None = None, delay: float = 0.0):
+        self.fail_at = fail_at
+        self.delay = delay
+        self.fetched: list[tuple[int, datetime]] = []
+
+    async def fetch_price_rows(self, indicator_id, geo_id, start_date, end_date):
+        await asyncio.sleep(self.delay)
+        if len(self.fetched) + 1 == self.fail_at:
+            raise RuntimeError("ESIOS unavailable")
+        self.fetched.append((geo_id, start_date))
+        return [(start_date + timedelta(hours=i), 10.0 + i, geo_id) for i in range(2)]
+
+
+@pytest.fixture
+async def created_jobs(db_session):
+    """Ids of the jobs a test creates; those jobs and the test series are deleted afterwards."""
+    job_ids: list[int] = []
+    yield job_ids
+    await db_session.rollback()
+    await db_session.execute(delete(BackfillJob).where(BackfillJob.id.in_(job_ids)))
+    for model in (ElectricityPrice, SeriesWatermark, DailyPriceRollup, HourOfDayPriceRollup):
+        await db_session.execute(delete(model).where(model.indicator_id == TEST_INDICATOR_ID))
+    await db_session.commit()
+
+
+async def test_failed_backfill_resumes_after_last_stored_window(db_session, created_jobs):
+    """A resumed job fetches only the windows that were not committed, then succeeds."""
+    job = await create_job(START, START + timedelta(days=10) - timedelta(seconds=1), 2, SERIES)
+    created_jobs.append(job.id)
+    assert job.total_windows == 10
+
+    failing = FakeClient(fail_at=4)
+    with pytest.raises(RuntimeError):
+        await run_job(job.id, concurrency=1, client=failing)
+
+    db_session.expire_all()
+    failed = await db_session.get(BackfillJob, job.id)
+    assert failed.status == "failed"
+    assert "ESIOS unavailable" in failed.error
+    assert (await job_progress(db_session, failed)).done_windows == 3
+
+    client = FakeClient()
+    progress = await run_job(job.id, concurrency=2, client=client)
+
+    assert len(client.fetched) == 7
+    assert not set(client.fetched) & set(failing.fetched)
+    assert (progress.status, progress.done_windows, progress.rows) == ("succeeded", 10, 20)
+    assert progress.eta_seconds == 0
+    stored = await db_session.scalar(
+        select(func.count()).where(ElectricityPrice.indicator_id == TEST_INDICATOR_ID)
+    )
+    assert stored == 20
+
+    with pytest.raises(BackfillError):
+        await run_job(job.id, client=client)
+
+
+async def test_cancelled_backfill_stops_taking_windows(db_session, created_jobs):
+    job = await create_job(START, START + timedelta(days=40), 1, SERIES)
+    created_jobs.append(job.id)
+    client = FakeClient(delay=0.02)
+
+    running = asyncio.create_task(
+        run_job(job.id, concurrency=1, client=client, progress_interval=0.05)
+    )
+    await asyncio.sleep(0.1)
+    await cancel_job(job.id)
+    progress = await running
+
+    assert progress.status == "cancelled"
+    assert 0 < progress.done_windows < job.total_windows
+    assert progress.done_windows == len(client.fetched)
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ("fastapi", "uvicorn", "httpx", "sqlalchemy", "pydantic_settings", "rich")
+
+
+def test_cli_import_is_lightweight():
+    """Importing the CLI must not load the web stack, the ESIOS client, the engine or settings."""
+    code = (
+        "import sys, esios_ingestor.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout.strip() == ""
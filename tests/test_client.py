@@ -0,0 +1,160 @@
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.ingestion.client import EsiosClient
+from esios_ingestor.ingestion.rate_limit import TokenBucket, parse_retry_after
+from esios_ingestor.schemas import parse_price_rows
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+END = START + timedelta(hours=1)
+
+
+def esios_payload(values: list[dict]) -> dict:
+    return {
+        "indicator": {
+            "name": "PVPC",
+            "short_name": "PVPC",
+            "id": 1001,
+            "composited": False,
+            "step_type": "linear",
+            "disaggregated": True,
+            "values": values,
+        }
+    }
+
+
+def esios_value(hour: int, value: float = 100.0, geo_id: int = 8741) -> dict:
+    return {
+        "value": value,
+        "datetime": f"2025-01-01T{hour:02d}:00:00.000+01:00",
+        "datetime_utc": f"2025-01-01T{hour:02d}:00:00Z",
+        "tz_time": f"2025-01-01T{hour:02d}:00:00.000Z",
+        "geo_id": geo_id,
+        "geo_name": "Península",
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetch_prices_reuses_pooled_client():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=esios_payload([esios_value(0), esios_value(1)]))
+
+    async with EsiosClient(transport=httpx.MockTransport(handler)) as client:
+        pooled = client.http
+        first = await client.fetch_prices(1001, 8741, START, END)
+        second = await client.fetch_prices(1001, 8741, START, END)
+        assert client.http is pooled
+
+    assert len(first.indicator.values) == 2
+    assert len(second.indicator.values) == 2
+    assert requests[0].url.path == "/indicators/1001"
+    assert requests[0].url.params.get_list("geo_ids[]") == ["8741"]
+    assert requests[0].headers["x-api-key"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_prices_requires_open_client():
+    client = EsiosClient()
+
+    with pytest.raises(RuntimeError):
+        await client.fetch_prices(1001, 8741, START, END)
+
+
+@pytest.mark.asyncio
+async def test_fetch_prices_requires_api_key(monkeypatch):
+    monkeypatch.setattr(settings, "ESIOS_API_KEY", None)
+    requests = []
+    transport = httpx.MockTransport(lambda request: requests.append(request))
+
+    async with EsiosClient(transport=transport) as client:
+        with pytest.raises(RuntimeError, match="ESIOS_API_KEY"):
+            await client.fetch_price_rows(1001, 8741, START, END)
+
+    assert requests == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_price_rows_returns_lean_tuples():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=esios_payload([esios_value(0, 55.5), esios_value(1)]))
+
+    async with EsiosClient(transport=httpx.MockTransport(handler)) as client:
+        rows = await client.fetch_price_rows(1001, 8741, START, END)
+
+    assert rows[0] == (START, 55.5, 8741)
+    assert len(rows) == 2
+
+
+def test_parse_price_rows_ignores_unused_fields():
+    payload = esios_payload([{"datetime_utc": "2025-01-01T00:00:00Z", "value": 1, "geo_id": 3}])
+
+    assert parse_price_rows(json.dumps(payload).encode()) == [(START, 1.0, 3)]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not json",
+        b'{"indicator": {}}',
+        json.dumps(
+            esios_payload([{"datetime_utc": "yesterday", "value": 1, "geo_id": 3}])
+        ).encode(),
+        json.dumps(esios_payload([{"datetime_utc": "2025-01-01T00:00:00Z", "geo_id": 3}])).encode(),
+    ],
+)
+def test_parse_price_rows_rejects_malformed_payloads(body: bytes):
+    with pytest.raises(ValidationError):
+        parse_price_rows(body)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_response_pauses_shared_bucket(monkeypatch):
+    """A 429 pauses the client's bucket for Retry-After and the request is retried."""
+    monkeypatch.setattr(EsiosClient.fetch_raw.retry, "sleep", _no_sleep)
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "0.2"}),
+            httpx.Response(200, json=esios_payload([esios_value(0)])),
+        ]
+    )
+
+    async with EsiosClient(transport=httpx.MockTransport(lambda r: next(responses))) as client:
+        started = asyncio.get_running_loop().time()
+        rows = await client.fetch_price_rows(1001, 8741, START, END)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert len(rows) == 1
+    assert elapsed >= 0.2
+
+
+async def _no_sleep(seconds):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=2)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    for _ in range(7):
+        await bucket.acquire()
+
+    # 2 tokens are available immediately, the other 5 refill at 50/s
+    assert loop.time() - started >= 0.09
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12", default=30) == 12
+    assert parse_retry_after(None, default=30) == 30
+    assert parse_retry_after("garbage", default=30) == 30
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", default=30) == 0
@@ -0,0 +1,114 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from esios_ingestor.ingestion.coverage import coalesce_ranges, find_gaps, update_watermark
+from esios_ingestor.ingestion.service import ingest_data, plan_windows, write_prices
+from esios_ingestor.models.coverage import SeriesWatermark
+from esios_ingestor.models.price import ElectricityPrice
+from esios_ingestor.models.rollup import DailyPriceRollup, HourOfDayPriceRollup
+from esios_ingestor.schemas import Series
+
+HOUR = timedelta(hours=1)
+START = datetime(2002, 1, 1, tzinfo=UTC)
+SERIES = Series(1001, -200)
+
+
+def hourly_rows(hours: list[int]) -> list[tuple[datetime, float, int]]:
+    return [(START + h * HOUR, 1.0, SERIES.geo_id) for h in hours]
+
+
+@pytest.mark.asyncio
+async def test_find_gaps_reports_holes_per_series(db_session):
+    other = Series(600, SERIES.geo_id)
+
+    try:
+        await write_prices(db_session, SERIES.indicator_id, hourly_rows([0, 1, 2, 5, 6, 10]))
+        await write_prices(db_session, other.indicator_id, hourly_rows([0, 1, 2, 3]))
+
+        gaps = await find_gaps(db_session, HOUR, [SERIES, other])
+    finally:
+        await db_session.rollback()
+
+    assert [(g.series, g.start, g.end) for g in gaps] == [
+        (SERIES, START + 3 * HOUR, START + 4 * HOUR),
+        (SERIES, START + 7 * HOUR, START + 9 * HOUR),
+    ]
+    assert [g.missing_points(HOUR) for g in gaps] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_find_gaps_since_skips_verified_history(db_session):
+    try:
+        await write_prices(db_session, SERIES.indicator_id, hourly_rows([0, 1, 2, 5, 6, 10]))
+
+        gaps = await find_gaps(db_session, HOUR, [SERIES], since={SERIES: START + 6 * HOUR})
+    finally:
+        await db_session.rollback()
+
+    assert [(g.start, g.end) for g in gaps] == [(START + 7 * HOUR, START + 9 * HOUR)]
+
+
+@pytest.mark.asyncio
+async def test_holes_fetched_empty_are_not_planned_again(db_session):
+    """Once auto-ingest has asked ESIOS for a hole, later runs only look after it."""
+
+    class EmptyClient:
+        async def fetch_price_rows(self, indicator_id, geo_id, start_date, end_date):
+            return []
+
+    window_size = timedelta(days=3650)
+    try:
+        await write_prices(db_session, SERIES.indicator_id, hourly_rows([0, 1, 2, 5, 6]))
+        await db_session.commit()
+
+        windows, _ = await plan_windows([SERIES], None, None, window_size)
+        assert next(windows).start == START + 3 * HOUR
+
+        await ingest_data(window_days=3650, client=EmptyClient(), series=[SERIES])
+
+        windows, _ = await plan_windows([SERIES], None, None, window_size)
+        assert next(windows).start == START + 7 * HOUR
+    finally:
+        await db_session.rollback()
+        for model in (ElectricityPrice, SeriesWatermark, DailyPriceRollup, HourOfDayPriceRollup):
+            await db_session.execute(
+                delete(model).where(
+                    model.indicator_id == SERIES.indicator_id, model.zone_id == SERIES.geo_id
+                )
+            )
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_watermark_only_widens(db_session):
+    try:
+        await update_watermark(db_session, SERIES, START + 5 * HOUR, START + 10 * HOUR)
+        await update_watermark(db_session, SERIES, START + 6 * HOUR, START + 8 * HOUR)
+        await update_watermark(db_session, SERIES, START, START + 7 * HOUR)
+
+        result = await db_session.execute(
+            select(SeriesWatermark.first_timestamp, SeriesWatermark.last_timestamp).where(
+                SeriesWatermark.indicator_id == SERIES.indicator_id,
+                SeriesWatermark.zone_id == SERIES.geo_id,
+            )
+        )
+        assert result.one() == (START, START + 10 * HOUR)
+    finally:
+        await db_session.rollback()
+
+
+def test_coalesce_ranges_merges_within_span():
+    day = timedelta(days=1)
+    ranges = [
+        (START + 3 * day, START + 3 * day + HOUR),
+        (START, START + HOUR),
+        (START + 40 * day, START + 80 * day),
+        (START + 10 * day, START + 10 * day),
+    ]
+
+    assert coalesce_ranges(ranges, timedelta(days=31)) == [
+        (START, START + 10 * day),
+        (START + 40 * day, START + 80 * day),
+    ]
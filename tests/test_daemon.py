@@ -0,0 +1,104 @@
+import asyncio
+from datetime import UTC, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import delete
+
+from esios_ingestor.ingestion import daemon as daemon_module
+from esios_ingestor.ingestion.daemon import (
+    IngestionDaemon,
+    backoff_delay,
+    next_slot,
+    parse_run_times,
+    previous_slot,
+)
+from esios_ingestor.models.daemon import IngestionCycle
+
+MADRID = ZoneInfo("Europe/Madrid")
+RUN_TIMES = parse_run_times(["20:30", "08:00"])
+
+
+def test_slots_follow_local_schedule():
+    now = datetime(2024, 6, 10, 19, 0, tzinfo=UTC)  # 21:00 in Madrid (CEST)
+
+    assert previous_slot(now, RUN_TIMES, MADRID) == datetime(2024, 6, 10, 18, 30, tzinfo=UTC)
+    assert next_slot(now, RUN_TIMES, MADRID) == datetime(2024, 6, 11, 6, 0, tzinfo=UTC)
+
+
+def test_slots_across_dst_change():
+    """Slots stay on local wall-clock time when Madrid switches from CEST to CET."""
+    before = datetime(2024, 10, 26, 19, 0, tzinfo=UTC)
+
+    assert next_slot(before, RUN_TIMES, MADRID) == datetime(2024, 10, 27, 7, 0, tzinfo=UTC)
+    assert next_slot(datetime(2024, 10, 27, 7, 0, tzinfo=UTC), RUN_TIMES, MADRID) == datetime(
+        2024, 10, 27, 19, 30, tzinfo=UTC
+    )
+
+
+def test_backoff_grows_and_is_capped():
+    assert 15 <= backoff_delay(1, 30, 900) <= 30
+    assert 60 <= backoff_delay(3, 30, 900) <= 120
+    assert 450 <= backoff_delay(20, 30, 900) <= 900
+
+
+@pytest.mark.asyncio
+async def test_replicas_run_each_slot_once(db_session, monkeypatch):
+    """Concurrent replicas take turns on the advisory lock and skip completed slots."""
+    test_engine = db_session.bind
+    calls = 0
+
+    async def fake_ingest_data(client):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.2)
+        return 5, 0
+
+    monkeypatch.setattr(daemon_module, "ingest_data", fake_ingest_data)
+    replicas = [IngestionDaemon(["08:00"], "UTC", bind=test_engine) for _ in range(2)]
+    slot = datetime(1990, 1, 1, 8, tzinfo=UTC)
+
+    try:
+        results = await asyncio.gather(*(replica.run_cycle(None, slot) for replica in replicas))
+        assert sorted(results) == [False, True]
+        assert calls == 1
+
+        assert await replicas[0].run_cycle(None, slot) is False
+        assert calls == 1
+
+        cycle = await db_session.get(IngestionCycle, slot)
+        assert (cycle.status, cycle.inserted, cycle.attempts) == ("succeeded", 5, 1)
+    finally:
+        async with test_engine.begin() as conn:
+            await conn.execute(delete(IngestionCycle).where(IngestionCycle.slot == slot))
+
+
+@pytest.mark.asyncio
+async def test_failed_slot_is_retried(db_session, monkeypatch):
+    test_engine = db_session.bind
+    outcomes = [RuntimeError("ESIOS unavailable"), (3, 0)]
+
+    async def flaky_ingest_data(client):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(daemon_module, "ingest_data", flaky_ingest_data)
+    replica = IngestionDaemon(["08:00"], "UTC", bind=test_engine)
+    slot = datetime(1990, 1, 2, 8, tzinfo=UTC)
+
+    try:
+        with pytest.raises(RuntimeError):
+            await replica.run_cycle(None, slot)
+        cycle = await db_session.get(IngestionCycle, slot)
+        assert cycle.status == "failed"
+
+        assert await replica.run_cycle(None, slot) is True
+        db_session.expire_all()
+        cycle = await db_session.get(IngestionCycle, slot)
+        assert (cycle.status, cycle.inserted, cycle.attempts) == ("succeeded", 3, 2)
+    finally:
+        await db_session.rollback()
+        async with test_engine.begin() as conn:
+            await conn.execute(delete(IngestionCycle).where(IngestionCycle.slot == slot))
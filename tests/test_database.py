@@ -0,0 +1,137 @@
+import logging
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.database import (
+    InstrumentedQueuePool,
+    get_read_db,
+    get_read_engine,
+    get_read_sessionmaker,
+    instrument_engine,
+    read_router,
+    statement_name,
+)
+from esios_ingestor.core.metrics import (
+    DB_POOL_COLLECTOR,
+    DB_POOL_TIMEOUTS_TOTAL,
+    DB_QUERY_SECONDS,
+    DB_SLOW_QUERIES_TOTAL,
+)
+
+
+@pytest.mark.parametrize(
+    ("statement", "name"),
+    [
+        ("SELECT price FROM electricity_prices WHERE zone_id = $1", "select electricity_prices"),
+        ('INSERT INTO "data_version" (id) VALUES ($1)', "insert data_version"),
+        (
+            "WITH inserted AS (INSERT INTO electricity_prices SELECT 1 RETURNING 1) "
+            "SELECT count(*) FROM inserted",
+            "insert electricity_prices",
+        ),
+        ("UPDATE ingestion_cycles SET status = $1", "update ingestion_cycles"),
+        ("SELECT pg_try_advisory_lock($1)", "select"),
+        ("ALTER TABLE electricity_prices ATTACH PARTITION p", "alter"),
+    ],
+)
+def test_statement_name(statement, name):
+    assert statement_name(statement) == name
+
+
+def _pool_checked_out(name: str) -> float:
+    [family, *_] = DB_POOL_COLLECTOR.collect()
+    return next(sample.value for sample in family.samples if sample.labels["pool"] == name)
+
+
+def _histogram_count(histogram) -> float:
+    return next(
+        sample.value for sample in histogram.collect()[0].samples if sample.name.endswith("_count")
+    )
+
+
+@pytest.mark.asyncio
+async def test_engine_instrumentation(monkeypatch, caplog):
+    """Statements are timed and logged when slow; pool usage and timeouts are exported."""
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_SECONDS", 0.0)
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="test",
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    instrument_engine(engine, "test")
+    queries = DB_QUERY_SECONDS.labels(statement="select pg_class")
+    queries_before = _histogram_count(queries)
+    slow_before = DB_SLOW_QUERIES_TOTAL.labels(statement="select pg_class")._value.get()
+    timeouts_before = DB_POOL_TIMEOUTS_TOTAL.labels(pool="test")._value.get()
+
+    try:
+        with caplog.at_level(logging.WARNING, logger="esios_ingestor.core.database"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT count(*) FROM pg_class"))
+                assert _pool_checked_out("test") == 1
+
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+        assert _pool_checked_out("test") == 0
+        assert _histogram_count(queries) == queries_before + 1
+        assert DB_SLOW_QUERIES_TOTAL.labels(statement="select pg_class")._value.get() == (
+            slow_before + 1
+        )
+        assert DB_POOL_TIMEOUTS_TOTAL.labels(pool="test")._value.get() == timeouts_before + 1
+        assert any("Slow query (select pg_class)" in r.message for r in caplog.records)
+    finally:
+        del DB_POOL_COLLECTOR.pools["test"]
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_fail_over_to_primary_while_replica_is_down(monkeypatch):
+    # Nothing listens on port 1: the replica is down
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_PORT", 1)
+    get_read_engine.cache_clear()
+
+    try:
+        assert await read_router.check() == "primary"
+        async with get_read_sessionmaker()() as session:
+            assert await session.scalar(text("SHOW transaction_read_only")) == "on"
+
+        # Replica back (here: the primary itself), reads return to it
+        await get_read_engine().dispose()
+        monkeypatch.setattr(settings, "POSTGRES_REPLICA_PORT", settings.POSTGRES_PORT)
+        get_read_engine.cache_clear()
+
+        assert await read_router.check() == "replica"
+        assert get_read_sessionmaker().kw["bind"] is get_read_engine()
+    finally:
+        read_router.failed_over = False
+        await get_read_engine().dispose()
+        get_read_engine.cache_clear()
+        del DB_POOL_COLLECTOR.pools["replica"]
+
+
+@pytest.mark.asyncio
+async def test_read_sessions_fail_over_when_the_replica_cannot_connect(monkeypatch):
+    """A request that finds the replica down is served by the primary, with no check in between."""
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_PORT", 1)
+    get_read_engine.cache_clear()
+
+    try:
+        assert not read_router.failed_over
+        async for session in get_read_db():
+            assert await session.scalar(text("SHOW transaction_read_only")) == "on"
+        assert read_router.failed_over
+    finally:
+        read_router.failed_over = False
+        await get_read_engine().dispose()
+        get_read_engine.cache_clear()
+        del DB_POOL_COLLECTOR.pools["replica"]
@@ -0,0 +1,86 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from esios_ingestor.ingestion.service import UpsertResult, notify_prices
+from esios_ingestor.schemas import Series
+from esios_ingestor.web.events import PriceEventBroker, PriceListener
+
+
+def prices_event(indicator_id: int, zone_id: int) -> dict:
+    return {"indicator_id": indicator_id, "zone_id": zone_id, "inserted": 24}
+
+
+def queued(subscriber) -> list:
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+
+def test_broker_filters_and_replays_missed_events():
+    broker = PriceEventBroker(queue_size=8, replay_size=3, max_subscribers=10)
+    zone = broker.subscribe(zone_id=8741)
+
+    for zone_id in (8741, 8742, 8741, 8742):
+        broker.publish("prices", prices_event(1001, zone_id))
+
+    assert [event.id for event in queued(zone)] == [f"{broker.epoch}:1", f"{broker.epoch}:3"]
+
+    # Reconnecting after event 2 replays 3 and 4; event 1 is no longer kept
+    replayed = broker.subscribe(last_event_id=f"{broker.epoch}:2")
+    assert [event.seq for event in queued(replayed)] == [3, 4]
+    expired = broker.subscribe(last_event_id=f"{broker.epoch}:0")
+    assert [event.name for event in queued(expired)] == ["resync"]
+
+    # An id from another worker (or before a restart) is not replayed against ours
+    other = PriceEventBroker(queue_size=8, replay_size=3, max_subscribers=10)
+    for event_id in (f"{other.epoch}:3", "3"):
+        assert [event.name for event in queued(broker.subscribe(last_event_id=event_id))] == [
+            "resync"
+        ]
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped():
+    broker = PriceEventBroker(queue_size=2, replay_size=10, max_subscribers=10)
+    stream = broker.stream(keepalive=1)
+
+    assert await anext(stream) == b"retry: 5000\n\n"
+    for _ in range(3):
+        broker.publish("prices", prices_event(1001, 8741))
+
+    assert (await anext(stream)).startswith(b"event: overflow")
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert broker.subscribers == set()
+
+
+@pytest.mark.asyncio
+async def test_committed_ingestion_reaches_stream(db_session):
+    """NOTIFY is delivered to the LISTEN connection on commit, and never on rollback."""
+    broker = PriceEventBroker(queue_size=8, replay_size=8, max_subscribers=10)
+    subscriber = broker.subscribe(indicator_id=-14)
+    listener = PriceListener(broker)
+    task = asyncio.create_task(listener.run())
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+
+    try:
+        await asyncio.wait_for(listener.connected.wait(), 5)
+
+        await notify_prices(db_session, Series(-14, -100), UpsertResult(1, start, start))
+        await db_session.rollback()
+        await notify_prices(db_session, Series(-14, -101), UpsertResult(24, start, start))
+        await db_session.commit()
+
+        event = await asyncio.wait_for(subscriber.queue.get(), 5)
+        assert event.name == "prices"
+        assert event.data["zone_id"] == -101
+        assert event.data["start"] == start.isoformat()
+        assert json.loads(event.encode().split(b"data: ")[1]) == event.data
+        assert subscriber.queue.empty()
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
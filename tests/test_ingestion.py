@@ -0,0 +1,132 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from esios_ingestor.core.config import settings
+from esios_ingestor.core.metrics import ESIOS_LAST_SUCCESS_TIMESTAMP
+from esios_ingestor.ingestion import service
+from esios_ingestor.ingestion.service import (
+    Window,
+    ingest_windows,
+    iter_windows,
+    upsert_prices,
+    write_prices,
+)
+from esios_ingestor.schemas import Series
+
+pytestmark = pytest.mark.asyncio
+
+TEST_ZONE_ID = -100
+TEST_INDICATOR_ID = 1001
+
+
+def make_rows(count: int, start: datetime | None = None) -> list[tuple[datetime, float, int]]:
+    start = start or datetime(2001, 1, 1, tzinfo=UTC)
+    return [(start + timedelta(hours=i), float(i), TEST_ZONE_ID) for i in range(count)]
+
+
+async def test_write_prices_counts_inserted_and_skipped(db_session, monkeypatch):
+    """Batches are split by INGESTION_BATCH_SIZE and duplicates are reported as skipped."""
+    monkeypatch.setattr(settings, "INGESTION_BATCH_SIZE", 4)
+
+    try:
+        inserted, skipped = await write_prices(db_session, TEST_INDICATOR_ID, make_rows(10))
+        assert (inserted, skipped) == (10, 0)
+
+        inserted, skipped = await write_prices(db_session, TEST_INDICATOR_ID, make_rows(12))
+        assert (inserted, skipped) == (2, 10)
+
+        # The inserted range spans only the new rows, across batches
+        rows = make_rows(20)
+        result = await upsert_prices(db_session, TEST_INDICATOR_ID, rows[5:6] + rows[12:20])
+        assert (result.inserted, result.first, result.last) == (8, rows[12][0], rows[19][0])
+    finally:
+        await db_session.rollback()
+
+
+async def test_write_prices_empty(db_session):
+    assert await write_prices(db_session, TEST_INDICATOR_ID, []) == (0, 0)
+
+
+async def test_iter_windows_covers_range_without_overlap():
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    end = datetime(2020, 3, 15, tzinfo=UTC)
+
+    windows = list(iter_windows(start, end, timedelta(days=31)))
+
+    assert windows[0][0] == start
+    assert windows[-1][1] == end
+    assert len(windows) == 3
+    for (_, prev_end), (next_start, _) in zip(windows, windows[1:], strict=False):
+        assert next_start - prev_end == timedelta(seconds=1)
+
+
+async def test_iter_windows_single_window_for_short_range():
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    end = start + timedelta(days=2)
+
+    assert list(iter_windows(start, end, timedelta(days=31))) == [(start, end)]
+
+
+async def test_ingest_windows_bounds_concurrency():
+    """No more than `concurrency` windows are fetched at the same time."""
+
+    class SlowClient:
+        in_flight = 0
+        peak = 0
+        calls = 0
+
+        async def fetch_price_rows(self, indicator_id, geo_id, start_date, end_date):
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return []
+
+    client = SlowClient()
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    windows = (
+        Window(Series(TEST_INDICATOR_ID, TEST_ZONE_ID), *window)
+        for window in iter_windows(start, start + timedelta(days=20), timedelta(days=1))
+    )
+
+    assert await ingest_windows(client, windows, concurrency=3) == (0, 0)
+    assert client.calls == 21
+    assert client.peak == 3
+
+
+async def test_write_prices_keeps_indicators_apart(db_session):
+    """The same zone and timestamp can be stored once per indicator."""
+    rows = make_rows(3)
+
+    try:
+        assert await write_prices(db_session, 1001, rows) == (3, 0)
+        assert await write_prices(db_session, 600, rows) == (3, 0)
+        assert await write_prices(db_session, 600, rows) == (0, 3)
+    finally:
+        await db_session.rollback()
+
+
+async def test_failed_write_does_not_report_success(monkeypatch):
+    """esios_last_success_timestamp only moves once a window's rows are committed."""
+
+    class OneRowClient:
+        async def fetch_price_rows(self, indicator_id, geo_id, start_date, end_date):
+            return [(start_date, 1.0, geo_id)]
+
+    async def failing_upsert(session, indicator_id, rows):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(service, "upsert_prices", failing_upsert)
+    series = Series(-31, TEST_ZONE_ID)
+    start = datetime(2001, 1, 1, tzinfo=UTC)
+
+    with pytest.raises(RuntimeError):
+        await service.ingest_window(
+            OneRowClient(), Window(series, start, start + timedelta(days=1))
+        )
+
+    gauge = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="-31", zone_id=str(TEST_ZONE_ID))
+    assert gauge._value.get() == 0
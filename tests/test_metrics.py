@@ -1,19 +1,39 @@
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
 import time
+from datetime import datetime
 
+import httpx
 import pytest
+from prometheus_client import CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector
 
 from esios_ingestor.core.metrics import (
     ESIOS_LAST_SUCCESS_TIMESTAMP,
+    ESIOS_REQUEST_RETRIES_TOTAL,
+    INGESTION_DUPLICATES_TOTAL,
+    INGESTION_FETCH_SECONDS,
     INGESTION_RECORDS_TOTAL,
+    compact_dead_process_files,
+    observe_fetch,
+    observe_parse,
+    observe_write,
+    remove_dead_process_files,
+    track_ingestion_run,
     update_last_success_timestamp,
 )
+from esios_ingestor.ingestion.client import EsiosClient
 
 
 def test_update_last_success_timestamp():
     """Test that timestamp gauge is updated correctly."""
-    update_last_success_timestamp(zone_id="8741")
+    update_last_success_timestamp(indicator_id="1001", zone_id="8741")
 
-    metric = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(zone_id="8741")
+    metric = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="1001", zone_id="8741")
     value = metric._value.get()
 
     assert value > time.time() - 5
@@ -22,31 +42,42 @@ def test_update_last_success_timestamp():
 
 def test_update_last_success_timestamp_different_zones():
     """Test timestamp tracking for different zones."""
-    update_last_success_timestamp(zone_id="8741")
-    update_last_success_timestamp(zone_id="8742")
+    update_last_success_timestamp(indicator_id="1001", zone_id="8741")
+    update_last_success_timestamp(indicator_id="1001", zone_id="8742")
 
-    value_1 = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(zone_id="8741")._value.get()
-    value_2 = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(zone_id="8742")._value.get()
+    value_1 = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="1001", zone_id="8741")._value.get()
+    value_2 = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="1001", zone_id="8742")._value.get()
 
     assert value_1 > 0
     assert value_2 > 0
 
 
+def test_update_last_success_timestamp_different_indicators():
+    """Test timestamp tracking is kept per indicator within a zone."""
+    update_last_success_timestamp(indicator_id="1001", zone_id="8741")
+    before = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="600", zone_id="8741")._value.get()
+
+    update_last_success_timestamp(indicator_id="600", zone_id="8741")
+    after = ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id="600", zone_id="8741")._value.get()
+
+    assert before == 0
+    assert after > 0
+
+
 def test_ingestion_records_counter():
-    """Test ingestion counter increments correctly."""
+    """Test written batches count inserted and skipped records."""
     # Store initial values
-    initial_success = INGESTION_RECORDS_TOTAL.labels(status="success")._value.get()
-    initial_failed = INGESTION_RECORDS_TOTAL.labels(status="failed")._value.get()
+    initial_inserted = INGESTION_RECORDS_TOTAL.labels(status="inserted")._value.get()
+    initial_skipped = INGESTION_RECORDS_TOTAL.labels(status="skipped")._value.get()
 
-    INGESTION_RECORDS_TOTAL.labels(status="success").inc(5)
-    INGESTION_RECORDS_TOTAL.labels(status="failed").inc(2)
+    observe_write(1001, 8741, 0.01, inserted=5, skipped=2)
 
     # Check delta
-    final_success = INGESTION_RECORDS_TOTAL.labels(status="success")._value.get()
-    final_failed = INGESTION_RECORDS_TOTAL.labels(status="failed")._value.get()
+    final_inserted = INGESTION_RECORDS_TOTAL.labels(status="inserted")._value.get()
+    final_skipped = INGESTION_RECORDS_TOTAL.labels(status="skipped")._value.get()
 
-    assert final_success - initial_success == 5
-    assert final_failed - initial_failed == 2
+    assert final_inserted - initial_inserted == 5
+    assert final_skipped - initial_skipped == 2
 
 
 @pytest.mark.asyncio
@@ -63,3 +94,172 @@ async def test_metrics_endpoint_available(client):
     content = response.text
     # Should contain Prometheus format metrics
     assert "# HELP" in content or "# TYPE" in content or "http" in content
+
+
+def test_ingestion_run_summary(caplog):
+    """Stage observations feed the histograms and one summary line per run."""
+    fetches = INGESTION_FETCH_SECONDS.labels(indicator_id="1001", zone_id="8741")
+    fetch_count = _histogram_count(fetches)
+    duplicates = INGESTION_DUPLICATES_TOTAL.labels(indicator_id="1001", zone_id="8741")
+    skipped_before = duplicates._value.get()
+
+    with caplog.at_level(logging.INFO, logger="esios_ingestor.core.metrics"):
+        with track_ingestion_run() as stats:
+            observe_fetch(1001, 8741, 0.2, 2048)
+            observe_parse(1001, 8741, 0.01)
+            observe_write(1001, 8741, 0.05, inserted=20, skipped=4)
+
+    assert _histogram_count(fetches) == fetch_count + 1
+    assert duplicates._value.get() - skipped_before == 4
+    assert (stats.requests, stats.payload_bytes, stats.inserted, stats.skipped) == (1, 2048, 20, 4)
+
+    [line] = [r.message for r in caplog.records if r.message.startswith("Ingestion summary")]
+    summary = json.loads(line.removeprefix("Ingestion summary "))
+    assert summary["status"] == "ok"
+    assert summary["fetch_seconds"] == 0.2
+    assert summary["windows"] == 1
+
+
+def test_ingestion_run_summary_marks_failures(caplog):
+    with caplog.at_level(logging.INFO, logger="esios_ingestor.core.metrics"):
+        with pytest.raises(RuntimeError), track_ingestion_run():
+            raise RuntimeError("boom")
+
+    assert '"status": "failed"' in caplog.records[-1].message
+
+
+@pytest.mark.asyncio
+async def test_retries_are_counted_by_exception(monkeypatch):
+    monkeypatch.setattr(EsiosClient.fetch_raw.retry, "sleep", _no_sleep)
+    retries = ESIOS_REQUEST_RETRIES_TOTAL.labels(exception="HTTPStatusError")
+    before = retries._value.get()
+    responses = iter([httpx.Response(503), httpx.Response(200, content=b'{"indicator": {}}')])
+
+    async with EsiosClient(transport=httpx.MockTransport(lambda r: next(responses))) as client:
+        await client.fetch_raw(1001, 8741, datetime(2025, 1, 1), datetime(2025, 1, 2))
+
+    assert retries._value.get() - before == 1
+
+
+def _histogram_count(histogram) -> float:
+    return next(
+        sample.value for sample in histogram.collect()[0].samples if sample.name.endswith("_count")
+    )
+
+
+async def _no_sleep(seconds):
+    return None
+
+
+def test_multiprocess_metrics_add_up_across_processes(tmp_path):
+    """Workers and a separate daemon sharing PROMETHEUS_MULTIPROC_DIR are reported together."""
+    code = (
+        "import sys; from esios_ingestor.core.metrics import "
+        "ESIOS_LAST_SUCCESS_TIMESTAMP, INGESTION_RECORDS_TOTAL, STREAM_SUBSCRIBERS; "
+        "INGESTION_RECORDS_TOTAL.labels(status='inserted').inc(10); "
+        "ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id='1001', zone_id='8741')"
+        ".set(float(sys.argv[1])); "
+        "STREAM_SUBSCRIBERS.set(3)"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for timestamp in ("100", "200"):
+        subprocess.run([sys.executable, "-c", code, timestamp], check=True, env=env)
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(tmp_path))
+
+    assert registry.get_sample_value("esios_ingestion_records_total", {"status": "inserted"}) == 20
+    timestamp = registry.get_sample_value(
+        "esios_last_success_timestamp", {"indicator_id": "1001", "zone_id": "8741"}
+    )
+    assert timestamp == 200
+    # Live gauges leave with their process
+    assert registry.get_sample_value("esios_stream_subscribers") is None
+
+
+def test_remove_dead_process_files(tmp_path):
+    host = socket.gethostname().replace("_", "-")
+    exited = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    dead = tmp_path / f"gauge_livesum_{host}-{exited.stdout.strip()}.db"
+    alive = tmp_path / f"gauge_livesum_{host}-{os.getpid()}.db"
+    other_host = tmp_path / f"gauge_livesum_elsewhere-{exited.stdout.strip()}.db"
+    counter = tmp_path / f"counter_{host}-{exited.stdout.strip()}.db"
+    for file in (dead, alive, other_host, counter):
+        file.touch()
+
+    assert remove_dead_process_files(str(tmp_path)) == 1
+    assert sorted(tmp_path.iterdir()) == sorted([alive, other_host, counter])
+
+
+def test_exiting_process_folds_its_files_into_the_archive(tmp_path):
+    """Cron-driven CLI runs report their counters without leaving a file per run."""
+    code = (
+        "from esios_ingestor.core.metrics import INGESTION_RECORDS_TOTAL, STREAM_SUBSCRIBERS; "
+        "INGESTION_RECORDS_TOTAL.labels(status='inserted').inc(10); "
+        "STREAM_SUBSCRIBERS.set(3)"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(3):
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(tmp_path))
+
+    assert registry.get_sample_value("esios_ingestion_records_total", {"status": "inserted"}) == 30
+    assert registry.get_sample_value("esios_stream_subscribers") is None
+    host = socket.gethostname().replace("_", "-")
+    assert [file.name for file in tmp_path.glob("*.db")] == [f"counter_{host}-archive.db"]
+
+
+def test_compact_dead_process_files_keeps_totals(tmp_path):
+    """Killed processes fold into one file per type instead of adding files forever."""
+    code = (
+        "import os, sys; from esios_ingestor.core.metrics import "
+        "ESIOS_LAST_SUCCESS_TIMESTAMP, INGESTION_FETCH_SECONDS, INGESTION_RECORDS_TOTAL; "
+        "INGESTION_RECORDS_TOTAL.labels(status='inserted').inc(10); "
+        "INGESTION_FETCH_SECONDS.labels(indicator_id='1001', zone_id='8741').observe(0.2); "
+        "ESIOS_LAST_SUCCESS_TIMESTAMP.labels(indicator_id='1001', zone_id='8741')"
+        ".set(float(sys.argv[1])); "
+        "os._exit(0)"  # Killed: atexit never folds its own files
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def collect() -> CollectorRegistry:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, path=str(tmp_path))
+        return registry
+
+    for run, timestamp in enumerate(("100", "300", "200"), start=1):
+        subprocess.run([sys.executable, "-c", code, timestamp], check=True, env=env)
+        compact_dead_process_files(str(tmp_path))
+
+        registry = collect()
+        assert (
+            registry.get_sample_value("esios_ingestion_records_total", {"status": "inserted"})
+            == 10 * run
+        )
+        assert (
+            registry.get_sample_value(
+                "esios_ingestion_fetch_seconds_count", {"indicator_id": "1001", "zone_id": "8741"}
+            )
+            == run
+        )
+
+    assert (
+        registry.get_sample_value(
+            "esios_last_success_timestamp", {"indicator_id": "1001", "zone_id": "8741"}
+        )
+        == 300
+    )
+    host = socket.gethostname().replace("_", "-")
+    # Live gauge files are left to remove_dead_process_files
+    assert sorted(file.name for file in tmp_path.glob("*.db") if "_live" not in file.name) == [
+        f"counter_{host}-archive.db",
+        f"gauge_max_{host}-archive.db",
+        f"histogram_{host}-archive.db",
+    ]
@@ -0,0 +1,103 @@
+from datetime import UTC, date, datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from esios_ingestor.core.partitions import (
+    add_months,
+    apply_retention,
+    ensure_future_partitions,
+    ensure_partitions,
+    list_partitions,
+    month_start,
+)
+from esios_ingestor.ingestion.service import write_prices
+from esios_ingestor.models.version import DataVersion
+
+
+async def _data_version(engine) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(select(DataVersion.version).where(DataVersion.id == 1)) or 0
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2024, 12, 31, 23, 30, tzinfo=UTC)) == date(2024, 12, 1)
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+@pytest.mark.asyncio
+async def test_writes_land_in_monthly_partitions(db_session):
+    """Rows spanning a month boundary are routed to partitions created on demand."""
+    rows = [
+        (datetime(1995, 1, 31, 23, tzinfo=UTC), 1.0, -100),
+        (datetime(1995, 2, 1, 0, tzinfo=UTC), 2.0, -100),
+    ]
+
+    try:
+        assert await write_prices(db_session, -11, rows) == (2, 0)
+
+        result = await db_session.execute(
+            text(
+                "SELECT tableoid::regclass::text FROM electricity_prices "
+                "WHERE indicator_id = -11 ORDER BY timestamp"
+            )
+        )
+        assert result.scalars().all() == [
+            "electricity_prices_p199501",
+            "electricity_prices_p199502",
+        ]
+    finally:
+        await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_future_partitions_and_retention(db_session):
+    """Upcoming months are pre-created and months past retention are detached or dropped."""
+    test_engine = db_session.bind
+    now = datetime(1990, 3, 15, tzinfo=UTC)
+    await ensure_future_partitions(test_engine, 2, now=now)
+    await ensure_partitions(test_engine, [date(1990, 1, 1)])
+
+    async with test_engine.connect() as conn:
+        months = [partition.month for partition in await list_partitions(conn)]
+    assert {date(1990, 1, 1), date(1990, 3, 1), date(1990, 4, 1), date(1990, 5, 1)} <= set(months)
+
+    assert await apply_retention(test_engine, 2, "detach", now=now, dry_run=True) == [
+        "electricity_prices_p199001"
+    ]
+
+    version = await _data_version(test_engine)
+    assert await apply_retention(test_engine, 2, "detach", now=now) == [
+        "electricity_prices_p199001"
+    ]
+    assert await _data_version(test_engine) == version + 1
+    async with test_engine.begin() as conn:
+        months = [partition.month for partition in await list_partitions(conn)]
+        assert date(1990, 1, 1) not in months
+        assert date(1990, 3, 1) in months
+        await conn.execute(text("DROP TABLE electricity_prices_p199001_archived_19900315000000"))
+
+    next_month = datetime(1990, 4, 15, tzinfo=UTC)
+    assert await apply_retention(test_engine, 1, "drop", now=next_month) == [
+        "electricity_prices_p199003"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_past_months_retired_elsewhere_are_recreated(db_session):
+    """Retention in another process does not leave this one writing to a missing partition."""
+    test_engine = db_session.bind
+    rows = [(datetime(1993, 6, 1, tzinfo=UTC), 1.0, -100)]
+
+    try:
+        assert await write_prices(db_session, -12, rows) == (1, 0)
+        await db_session.rollback()
+
+        # What `esios partitions --retention` does, without touching this process's cache
+        async with test_engine.begin() as conn:
+            await conn.execute(text("DROP TABLE electricity_prices_p199306"))
+
+        assert await write_prices(db_session, -12, rows) == (1, 0)
+    finally:
+        await db_session.rollback()